@@ -1,8 +1,15 @@
+import asyncio
 import logging
-from typing import Dict, Any, Optional
-from .providers import OpenAIProvider, DeepSeekProvider
+from typing import Dict, Any, AsyncIterator, List, Optional
+from .providers import OpenAIProvider, DeepSeekProvider, HedgedProvider
+from .providers.base_provider import BaseProvider
 from .utils.response_blender import ResponseBlender
+from .utils.response_cache import ResponseCache
 from .config_manager import ConfigManager
+from shared.query_features import query_features
+
+DEFAULT_TIMEOUT_MS = 8000
+DEFAULT_LATENCY_BUDGET_MS = 10000
 
 class APIOrchestrator:
     def __init__(self):
@@ -10,47 +17,238 @@ class APIOrchestrator:
         self.config = ConfigManager()
         self._init_providers()
         self.blender = ResponseBlender()
+        # None when the cache section is disabled
+        self.cache = ResponseCache.from_config(self.config.get("cache"))
         self.log.info("API Orchestrator initialized")
 
     def _init_providers(self):
         """Initialize providers from config"""
         provider_config = self.config.get("providers", {})
-        self.openai = OpenAIProvider(provider_config.get("openai", {}))
-        self.deepseek = DeepSeekProvider(provider_config.get("deepseek", {}))
+        # Both providers are already queried concurrently, so a slow call
+        # is hedged with a second call to the same provider
+        hedging = self.config.get("routing.hedging")
+        self.openai = HedgedProvider.from_config(
+            OpenAIProvider(self._provider_config("openai")), hedging
+        )
+        self.deepseek = HedgedProvider.from_config(
+            DeepSeekProvider(self._provider_config("deepseek")), hedging
+        )
+        # Seconds; per provider name, capped by the overall latency budget
+        self.timeouts = {
+            name: (provider_config.get(name) or {}).get("timeout_ms", DEFAULT_TIMEOUT_MS) / 1000
+            for name in ("openai", "deepseek")
+        }
+        self.latency_budget = self.config.get(
+            "routing.latency_budget_ms", DEFAULT_LATENCY_BUDGET_MS
+        ) / 1000
+
+    def _provider_config(self, name: str) -> Dict[str, Any]:
+        """Provider section plus its API key from the environment (OPENAI_KEY, ...)"""
+        provider_config = self.config.get("providers", {})
+        config = dict(provider_config.get(name) or {})
+        config.setdefault("api_key", provider_config.get(f"{name}_key"))
+        return config
 
     def route_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Route query to appropriate providers and blend responses"""
+        """Route query to appropriate providers and blend responses
+
+        Blocking entry point for synchronous callers; from a coroutine,
+        await route_query_async() instead. Cache hits skip the event loop.
+        """
+        context = context or {}
+        cached = self._cached(query, context)
+        if cached is not None:
+            return cached
+        return asyncio.run(self._route(query, context))
+
+    async def route_query_async(self, query: str,
+                                context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Query both providers concurrently and blend what answers in time
+
+        Latency follows the slower provider, capped by the latency budget.
+        If only one provider answers in time its response is used as is.
+        """
+        context = context or {}
+        cached = self._cached(query, context)
+        if cached is not None:
+            return cached
+        return await self._route(query, context)
+
+    async def route_query_stream(self, query: str,
+                                 context: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """route_query_async() as it is produced
+
+        The primary provider's chunks are forwarded as
+        ``{"type": "delta", "content", "source"}`` events while the secondary
+        runs concurrently. The last event is ``{"type": "final", "result"}``
+        with what route_query_async() would have returned. A cache hit
+        arrives as a single delta. If the primary fails or times out after
+        streaming part of its answer, the deltas already sent are all there
+        is of it: the result leaves it out and is not cached.
+        """
+        context = context or {}
+        cached = self._cached(query, context)
+        if cached is not None:
+            yield {"type": "delta", "content": cached["response"]["content"], "source": "cache"}
+            yield {"type": "final", "result": cached}
+            return
+
+        primary, secondary = self._select_providers(query, context)
+        other = asyncio.ensure_future(self._answer(secondary, query, context))
+        chunks = self._stream(primary, query, context)
+        events = self.blender.blend_stream(chunks, primary.provider_name, other,
+                                           mode=context.get('mode', 'balanced'))
+        try:
+            async for event in events:
+                if event["type"] == "delta":
+                    yield event
+                    continue
+                if event["response"] is None:
+                    yield {"type": "final", "result": self._no_answer()}
+                    return
+                result = self._result(query, primary, secondary, event["response"], event["answered"])
+                # The streamed primary answer is never a fallback; a truncated
+                # one is not in "answered" and the result is never cached
+                if not event["incomplete"]:
+                    self._remember(query, context, result,
+                                   [other.result()] if len(event["answered"]) == 2 else [])
+                yield {"type": "final", "result": result}
+        finally:
+            # Stops both upstream calls if the consumer went away early
+            other.cancel()
+            await events.aclose()
+            await chunks.aclose()
+
+    async def _route(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            context = context or {}
             # Determine primary provider based on query type
-            primary, secondary = self._select_providers(query)
-            
+            primary, secondary = self._select_providers(query, context)
+
             # Get responses
-            primary_resp = primary.process(query, context)
-            secondary_resp = secondary.process(query, context)
+            primary_resp, secondary_resp = await self._fan_out([primary, secondary], query, context)
+            answered = [r for r in (primary_resp, secondary_resp) if r is not None]
+            if not answered:
+                return self._no_answer()
 
             # Blend responses
             blended = self.blender.blend(
-                responses=[primary_resp, secondary_resp],
+                responses=answered,
                 mode=context.get('mode', 'balanced')
             )
-
-            return {
-                "status": "success",
-                "query": query,
-                "response": blended,
-                "providers": {
-                    "primary": primary.provider_name,
-                    "secondary": secondary.provider_name
-                }
-            }
+            result = self._result(query, primary, secondary, blended,
+                                  [r["source"] for r in answered])
+            self._remember(query, context, result, answered if len(answered) == 2 else [])
+            return result
         except Exception as e:
             self.log.error(f"Routing failed: {e}")
             return {"status": "error", "message": str(e)}
 
-    def _select_providers(self, query: str):
-        """Select providers based on query content"""
-        tech_keywords = ['code', 'algorithm', 'debug', 'function', 'class']
-        if any(keyword in query.lower() for keyword in tech_keywords):
+    def _result(self, query: str, primary: BaseProvider, secondary: BaseProvider,
+                blended: Dict[str, Any], answered: List[str]) -> Dict[str, Any]:
+        return {
+            "status": "success",
+            "query": query,
+            "response": blended,
+            "providers": {
+                "primary": primary.provider_name,
+                "secondary": secondary.provider_name
+            },
+            "answered": answered
+        }
+
+    def _no_answer(self) -> Dict[str, Any]:
+        message = f"no provider answered within {self.latency_budget * 1000:.0f} ms"
+        self.log.error(f"Routing failed: {message}")
+        return {"status": "error", "message": message}
+
+    def _remember(self, query: str, context: Dict[str, Any], result: Dict[str, Any],
+                  responses: List[Dict[str, Any]]):
+        """Cache a result; ``responses`` are the answers to vet, empty if one was missing"""
+        # Partial and fallback answers are not worth keeping around
+        if self.cache is None or not responses or any(r.get("is_fallback") for r in responses):
+            return
+        providers = result["providers"]
+        self.cache.put(query, context.get('mode', 'balanced'),
+                       (providers["primary"], providers["secondary"]), result)
+
+    def _cached(self, query: str, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cached result for this query, mode and provider selection"""
+        if self.cache is None:
+            return None
+        primary, secondary = self._select_providers(query, context)
+        result = self.cache.get(query, context.get('mode', 'balanced'),
+                                (primary.provider_name, secondary.provider_name))
+        if result is None:
+            return None
+        # The cached response is shared; only the envelope is per request
+        return dict(result, query=query, cached=True)
+
+    async def _fan_out(self, providers: List[BaseProvider], query: str,
+                       context: Dict[str, Any]) -> List[Optional[Dict[str, Any]]]:
+        """Call providers concurrently; None for each that fails or runs out of time"""
+        return await asyncio.gather(*(self._answer(provider, query, context)
+                                      for provider in providers))
+
+    async def _answer(self, provider: BaseProvider, query: str,
+                      context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """A provider's response, None if it fails or runs out of time"""
+        try:
+            result = await self._call(provider, query, context)
+        except asyncio.TimeoutError:
+            self.log.warning(f"{provider.provider_name} timed out")
+            return None
+        except Exception as e:
+            self.log.warning(f"{provider.provider_name} failed: {e}")
+            return None
+        if not result or "content" not in result:
+            self.log.warning(f"{provider.provider_name} returned no content")
+            return None
+        result.setdefault("source", provider.provider_name)
+        return result
+
+    async def _call(self, provider: BaseProvider, query: str,
+                    context: Dict[str, Any]) -> Dict[str, Any]:
+        # All calls start together, so capping each one at the budget
+        # bounds the whole fan-out
+        return await asyncio.wait_for(provider.process_async(query, context),
+                                      self._timeout(provider))
+
+    async def _stream(self, provider: BaseProvider, query: str,
+                      context: Dict[str, Any]) -> AsyncIterator[str]:
+        """A provider's chunks; raises if it fails or runs out of time
+        before finishing, so a truncated answer is never taken for a whole one"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._timeout(provider)
+        try:
+            chunks = provider.stream(query, context).__aiter__()
+        except Exception as e:
+            self.log.warning(f"{provider.provider_name} stream failed: {e}")
+            raise
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), deadline - loop.time())
+                except StopAsyncIteration:
+                    return
+                yield chunk
+        except asyncio.TimeoutError:
+            self.log.warning(f"{provider.provider_name} stream timed out")
+            raise
+        except Exception as e:
+            self.log.warning(f"{provider.provider_name} stream failed: {e}")
+            raise
+        finally:
+            await chunks.aclose()
+
+    def _timeout(self, provider: BaseProvider) -> float:
+        return min(self.timeouts.get(provider.provider_name, DEFAULT_TIMEOUT_MS / 1000),
+                   self.latency_budget)
+
+    def _select_providers(self, query: str, context: Optional[Dict[str, Any]] = None):
+        """Select providers based on query content; the engine passes its
+        QueryAnalysis as ``context["query_analysis"]``"""
+        query_analysis = (context or {}).get("query_analysis")
+        features = query_analysis.features if query_analysis else query_features(query)
+        if features.has("routing", "technical"):
             return self.deepseek, self.openai
         return self.openai, self.deepseek
@@ -1,3 +1,8 @@
 from .openai_provider import OpenAIProvider
 from .deepseek_provider import DeepSeekProvider
-__all__ = ['OpenAIProvider', 'DeepSeekProvider']
+from .hedging import HedgedProvider
+from .http_provider import HTTPProvider
+from .latency import LatencyHistogram
+from .transport import ProviderTransport, get_transport
+__all__ = ['OpenAIProvider', 'DeepSeekProvider', 'HedgedProvider', 'HTTPProvider',
+           'LatencyHistogram', 'ProviderTransport', 'get_transport']
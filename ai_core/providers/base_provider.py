@@ -1,11 +1,15 @@
+import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator
+from .latency import LatencyHistogram
 
 class BaseProvider(ABC):
     def __init__(self, provider_name: str):
         self.log = logging.getLogger(f"{provider_name.upper()}Provider")
         self.provider_name = provider_name
+        self.latency = LatencyHistogram()  # recent call latencies, see timed_process_async
         self.log.info(f"Initialized {provider_name} provider")
 
     @abstractmethod
@@ -13,6 +17,40 @@ class BaseProvider(ABC):
         """Main processing method"""
         pass
 
+    async def process_async(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Awaitable process(); runs the blocking call in a worker thread.
+
+        Providers with a native async client should override this. A
+        cancelled call stops waiting, but a thread already running
+        process() finishes in the background and its result is dropped.
+        """
+        return await asyncio.to_thread(self.process, query, context)
+
+    async def stream(self, query: str, context: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """The response content as chunks, as soon as the upstream produces them.
+
+        This default yields the whole answer of process_async() as one
+        chunk. Providers with a streaming API override it. Consumers that
+        stop early should ``aclose()`` the iterator so the upstream
+        request is released.
+        """
+        response = await self.process_async(query, context)
+        if not response or "content" not in response:
+            raise RuntimeError(response.get("error", "no content") if response else "no response")
+        yield response["content"]
+
+    async def timed_process_async(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """process_async() that records its latency in ``self.latency``.
+
+        A cancelled call records the time it had run so far: a lower bound
+        that keeps slow calls which lost a race visible in the tail.
+        """
+        start = time.perf_counter()
+        try:
+            return await self.process_async(query, context)
+        finally:
+            self.latency.record(time.perf_counter() - start)
+
     def validate_response(self, response: Dict[str, Any]) -> bool:
         """Validate API response structure"""
         required = ['content', 'model']
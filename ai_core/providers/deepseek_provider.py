@@ -1,23 +1,51 @@
 import logging
-from typing import Dict, Any
-from .base_provider import BaseProvider
+from typing import Dict, Any, AsyncIterator, Optional
+from .http_provider import HTTPProvider
+from .transport import ProviderTransport
 
-class DeepSeekProvider(BaseProvider):
-    def __init__(self, config: Dict[str, Any] = None):
-        super().__init__("deepseek")
+class DeepSeekProvider(HTTPProvider):
+    def __init__(self, config: Dict[str, Any] = None, transport: Optional[ProviderTransport] = None):
+        super().__init__("deepseek", config, "https://api.deepseek.com/v1", transport)
         self.model = config.get("model", "deepseek-v2") if config else "deepseek-v2"
         self.log.info(f"DeepSeek provider initialized (model: {self.model})")
 
     def process(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Process query using DeepSeek-style response"""
         try:
-            # Mock API call
-            return {
-                "content": f"DeepSeek analysis of: {query}",
-                "style": "technical",
-                "confidence": 0.92,
-                "context_used": context.get('technical_context', []) if context else []
-            }
+            if not self.api_key:
+                return self._format_response(self._mock_content(query), context)
+            data = self.post("/chat/completions", self._payload(query))
+            return self._format_response(data["choices"][0]["message"]["content"], context)
         except Exception as e:
             self.log.error(f"DeepSeek processing failed: {e}")
             return {"error": str(e)}
+
+    async def process_async(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        try:
+            if not self.api_key:
+                return self._format_response(self._mock_content(query), context)
+            data = await self.post_async("/chat/completions", self._payload(query))
+            return self._format_response(data["choices"][0]["message"]["content"], context)
+        except Exception as e:
+            self.log.error(f"DeepSeek processing failed: {e}")
+            return {"error": str(e)}
+
+    def stream(self, query: str, context: Dict[str, Any] = None) -> AsyncIterator[str]:
+        if not self.api_key:
+            return self.offline_stream(self._mock_content(query))
+        return self.stream_chat("/chat/completions", self._payload(query))
+
+    def _payload(self, query: str) -> Dict[str, Any]:
+        return {"model": self.model, "messages": [{"role": "user", "content": query}]}
+
+    def _mock_content(self, query: str) -> str:
+        """Offline answer when no API key is configured"""
+        return f"DeepSeek analysis of: {query}"
+
+    def _format_response(self, content: str, context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "content": content,
+            "style": "technical",
+            "confidence": 0.92,
+            "context_used": context.get('technical_context', []) if context else []
+        }
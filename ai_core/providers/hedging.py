@@ -0,0 +1,106 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional
+from .base_provider import BaseProvider
+
+
+class HedgedProvider(BaseProvider):
+    """Tail-latency hedging in front of a provider.
+
+    The primary is called first. If it has not answered after the
+    ``percentile``-th percentile of its recent latency (its live
+    histogram, clamped to ``min_delay_ms``..``max_delay_ms``), a duplicate
+    request goes to ``backup``, or to the primary again when there is no
+    backup. The first successful answer wins and the other call is
+    cancelled. A failed primary is hedged immediately instead of after
+    the delay. Error retries stay with each provider's own backoff.
+    Providers report most failures as a result rather than an exception
+    (``{"error"}``, or a fallback answer with ``is_fallback``); those
+    count as failures too. When both calls fail, the last failure is
+    returned or raised.
+
+    Hedges are capped at ``max_hedge_ratio`` of requests so a slow
+    upstream does not get twice the load. Until the histogram has
+    ``min_samples`` calls, ``initial_delay_ms`` is used as the delay.
+    """
+
+    def __init__(self, primary: BaseProvider, backup: Optional[BaseProvider] = None,
+                 percentile: float = 95, min_delay_ms: float = 50,
+                 max_delay_ms: float = 10000, initial_delay_ms: float = 2000,
+                 min_samples: int = 20, max_hedge_ratio: float = 0.1):
+        self.primary = primary
+        self.backup = backup or primary
+        self.percentile = percentile
+        self.min_delay = min_delay_ms / 1000
+        self.max_delay = max_delay_ms / 1000
+        self.initial_delay = initial_delay_ms / 1000
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        super().__init__(primary.provider_name)
+
+    @classmethod
+    def from_config(cls, primary: BaseProvider, config: Optional[Dict[str, Any]],
+                    backup: Optional[BaseProvider] = None) -> BaseProvider:
+        """Wrap ``primary`` per the ``routing.hedging`` config section (unwrapped if disabled)"""
+        if not config or not config.get("enabled"):
+            return primary
+        options = {k: v for k, v in config.items() if k != "enabled"}
+        return cls(primary, backup, **options)
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary before hedging"""
+        if self.primary.latency.count < self.min_samples:
+            delay = self.initial_delay
+        else:
+            delay = self.primary.latency.percentile(self.percentile)
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    def process(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Blocking entry point; hedging needs an event loop to race the calls"""
+        return asyncio.run(self.process_async(query, context))
+
+    async def process_async(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        self.requests += 1
+        first = asyncio.ensure_future(self.primary.timed_process_async(query, context))
+        second = None
+        try:
+            done, _ = await asyncio.wait({first}, timeout=self.hedge_delay())
+            if (done and not self._failed(first)) or not self._may_hedge():
+                return await first
+
+            self.hedges += 1
+            second = asyncio.ensure_future(self.backup.timed_process_async(query, context))
+            pending = {second} if done else {first, second}
+            failed = first if done else None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not self._failed(task):
+                        if task is second:
+                            self.hedge_wins += 1
+                        return task.result()
+                    failed = task
+            return failed.result()
+        finally:
+            # The losing call, or both if the caller gave up on us
+            for task in (first, second):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stream(self, query: str, context: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """Streams are not hedged: once chunks flow the answer is committed to one call"""
+        return self.primary.stream(query, context)
+
+    @staticmethod
+    def _failed(task: "asyncio.Future") -> bool:
+        """Whether a finished call raised or returned no usable answer"""
+        if task.exception() is not None:
+            return True
+        result = task.result()
+        return (not isinstance(result, dict) or "content" not in result
+                or "error" in result or bool(result.get("is_fallback")))
+
+    def _may_hedge(self) -> bool:
+        return self.hedges < self.max_hedge_ratio * self.requests
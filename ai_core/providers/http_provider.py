@@ -0,0 +1,96 @@
+import asyncio
+import json
+import re
+from typing import Any, AsyncIterator, Dict, Optional
+import backoff
+import httpx
+from .base_provider import BaseProvider
+from .transport import ProviderTransport, get_transport
+
+DEFAULT_TIMEOUT_MS = 8000
+RETRY_STATUS = {429, 500, 502, 503, 504}
+_WORD_CHUNKS = re.compile(r"\S+\s*")
+
+def _permanent(error: Exception) -> bool:
+    """Only connection errors and overload/5xx answers are worth retrying"""
+    return (isinstance(error, httpx.HTTPStatusError)
+            and error.response.status_code not in RETRY_STATUS)
+
+_retry = backoff.on_exception(backoff.expo, (httpx.TransportError, httpx.HTTPStatusError),
+                              max_tries=3, giveup=_permanent)
+
+
+class HTTPProvider(BaseProvider):
+    """Provider calling an upstream JSON API through the shared transport.
+
+    ``config`` is the provider's section of config/ai_core.yaml plus its
+    ``api_key``. Subclasses only call the upstream when a key is set and
+    answer offline otherwise.
+    """
+
+    def __init__(self, provider_name: str, config: Optional[Dict[str, Any]],
+                 default_base_url: str, transport: Optional[ProviderTransport] = None):
+        super().__init__(provider_name)
+        config = config or {}
+        self.base_url = config.get("base_url", default_base_url)
+        self.api_key = config.get("api_key")
+        self.request_timeout = config.get("timeout_ms", DEFAULT_TIMEOUT_MS) / 1000
+        self.transport = transport or get_transport()
+
+    @_retry
+    def post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST JSON to the upstream over a pooled connection"""
+        response = self.transport.client(self.base_url).post(
+            path, json=payload, headers=self._headers(), timeout=self.request_timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def post_async(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Awaitable post(); native off the server loop's pool, else a worker thread"""
+        client = self.transport.async_client(self.base_url)
+        if client is None:
+            return await asyncio.to_thread(self.post, path, payload)
+        return await self._post_async(client, path, payload)
+
+    @_retry
+    async def _post_async(self, client: httpx.AsyncClient, path: str,
+                          payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = await client.post(path, json=payload, headers=self._headers(),
+                                     timeout=self.request_timeout)
+        response.raise_for_status()
+        return response.json()
+
+    async def stream_chat(self, path: str, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """Content deltas of an OpenAI-compatible chat completion, streamed as server-sent events
+
+        Off the server loop's pool the completion is fetched whole with
+        post() in a worker thread and yielded as one chunk. Streams are
+        not retried; the orchestrator falls back to the other provider.
+        """
+        client = self.transport.async_client(self.base_url)
+        if client is None:
+            data = await asyncio.to_thread(self.post, path, payload)
+            yield data["choices"][0]["message"]["content"]
+            return
+        async with client.stream("POST", path, json=dict(payload, stream=True),
+                                 headers=self._headers(), timeout=self.request_timeout) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
+    async def offline_stream(self, content: str) -> AsyncIterator[str]:
+        """Word-sized chunks of an offline answer, shaped like an upstream stream"""
+        for chunk in _WORD_CHUNKS.findall(content):
+            yield chunk
+            await asyncio.sleep(0)
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"}
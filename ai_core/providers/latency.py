@@ -0,0 +1,60 @@
+import math
+import threading
+from typing import Optional
+
+
+class LatencyHistogram:
+    """Sliding-window latency histogram with log-spaced buckets.
+
+    Buckets grow by ``growth`` from ``min_ms`` to ``max_ms``, so any
+    percentile is accurate to within that factor while recording stays
+    O(1). Two generations of ``window`` samples are kept; once the current
+    one fills up the older one is dropped, so percentiles follow the last
+    ``window``..``2 * window`` calls.
+    """
+
+    def __init__(self, window: int = 500, min_ms: float = 1, max_ms: float = 120000,
+                 growth: float = 1.1):
+        self.window = window
+        self.min_s = min_ms / 1000
+        self._log_growth = math.log(growth)
+        self._bounds = [self.min_s * growth ** i
+                        for i in range(math.ceil(math.log(max_ms / min_ms) / self._log_growth) + 1)]
+        self._current = [0] * len(self._bounds)
+        self._previous = [0] * len(self._bounds)
+        self._current_count = 0
+        self._previous_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return self._current_count + self._previous_count
+
+    def record(self, seconds: float):
+        """Add one observed latency"""
+        with self._lock:
+            self._current[self._bucket(seconds)] += 1
+            self._current_count += 1
+            if self._current_count >= self.window:
+                self._previous, self._current = self._current, [0] * len(self._bounds)
+                self._previous_count, self._current_count = self._current_count, 0
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound (seconds) of the bucket holding the q-th percentile, None if empty"""
+        with self._lock:
+            total = self.count
+            if not total:
+                return None
+            rank = math.ceil(q / 100 * total)
+            seen = 0
+            for i, bound in enumerate(self._bounds):
+                seen += self._current[i] + self._previous[i]
+                if seen >= rank:
+                    return bound
+            return self._bounds[-1]
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= self.min_s:
+            return 0
+        i = math.ceil(math.log(seconds / self.min_s) / self._log_growth)
+        return min(i, len(self._bounds) - 1)
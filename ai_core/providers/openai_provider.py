@@ -1,48 +1,84 @@
 import logging
-from typing import Dict, Any
-import backoff
-from .base_provider import BaseProvider
+from typing import Dict, Any, AsyncIterator, List, Optional
+from .http_provider import HTTPProvider
+from .transport import ProviderTransport
 
-class OpenAIProvider(BaseProvider):
-    def __init__(self, config: Dict[str, Any] = None):
-        super().__init__("openai")
+class OpenAIProvider(HTTPProvider):
+    def __init__(self, config: Dict[str, Any] = None, transport: Optional[ProviderTransport] = None):
+        super().__init__("openai", config, "https://api.openai.com/v1", transport)
         self.model = config.get("model", "gpt-4-turbo") if config else "gpt-4-turbo"
         self.max_tokens = config.get("max_tokens", 2000) if config else 2000
         self.temperature = config.get("temperature", 0.7) if config else 0.7
-        self._init_client()
 
-    def _init_client(self):
-        """Initialize client with retry logic"""
-        self.client = self._mock_client()  # Replace with actual OpenAI client
-
-    @backoff.on_exception(backoff.expo, Exception, max_tries=3)
     def process(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Enhanced processing with:
-        - Rate limit handling
+        - Rate limit handling (retries in HTTPProvider.post)
         - Context-aware prompts
         - Fallback strategies
         """
         try:
-            prompt = self._build_prompt(query, context or {})
-            
-            # Mock response - replace with actual API call
-            response = {
-                "id": "mock_resp_123",
-                "content": f"OpenAI({self.model}): {query}",
-                "usage": {"total_tokens": len(query.split())},
-                "model": self.model
-            }
-            
-            return self._format_response(response, context or {})
-            
+            context = context or {}
+            if not self.api_key:
+                response = self._mock_response(query)
+            else:
+                response = self._parse(self.post("/chat/completions", self._payload(query, context)))
+            return self._format_response(response, context)
         except Exception as e:
             self.log.error(f"OpenAI processing failed: {e}")
             return self._fallback_response(query, e)
 
-    def _build_prompt(self, query: str, context: Dict[str, Any]) -> str:
+    async def process_async(self, query: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        try:
+            context = context or {}
+            if not self.api_key:
+                response = self._mock_response(query)
+            else:
+                response = self._parse(
+                    await self.post_async("/chat/completions", self._payload(query, context))
+                )
+            return self._format_response(response, context)
+        except Exception as e:
+            self.log.error(f"OpenAI processing failed: {e}")
+            return self._fallback_response(query, e)
+
+    def stream(self, query: str, context: Dict[str, Any] = None) -> AsyncIterator[str]:
+        if not self.api_key:
+            return self.offline_stream(self._mock_response(query)["content"])
+        return self.stream_chat("/chat/completions", self._payload(query, context or {}))
+
+    def _payload(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": self._build_messages(query, context),
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature
+        }
+
+    def _build_messages(self, query: str, context: Dict[str, Any]) -> List[Dict[str, str]]:
         """Build context-aware prompt"""
-        base = f"System: You are an AI assistant. Context: {context.get('summary','')}\n"
-        return base + f"User: {query}\nAI:"
+        return [
+            {"role": "system",
+             "content": f"You are an AI assistant. Context: {context.get('summary','')}"},
+            {"role": "user", "content": query}
+        ]
+
+    def _parse(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Chat completions payload -> the fields _format_response needs"""
+        return {
+            "id": data.get("id"),
+            "content": data["choices"][0]["message"]["content"],
+            "usage": data.get("usage") or {"total_tokens": 0},
+            "model": data.get("model", self.model)
+        }
+
+    def _mock_response(self, query: str) -> Dict[str, Any]:
+        """Offline answer when no API key is configured"""
+        return {
+            "id": "mock_resp_123",
+            "content": f"OpenAI({self.model}): {query}",
+            "usage": {"total_tokens": len(query.split())},
+            "model": self.model
+        }
 
     def _format_response(self, response: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         """Standardize response format"""
@@ -50,7 +86,7 @@ class OpenAIProvider(BaseProvider):
             "source": "openai",
             "content": response["content"],
             "model": response["model"],
-            "tokens": response["usage"]["total_tokens"],
+            "tokens": response["usage"].get("total_tokens", 0),
             "context_used": context.get('last_3_interactions', [])
         }
 
@@ -62,10 +98,3 @@ class OpenAIProvider(BaseProvider):
             "error": str(error),
             "is_fallback": True
         }
-
-    def _mock_client(self):
-        """Mock client for testing"""
-        class MockClient:
-            def chat(self, *args, **kwargs):
-                return {"mock": "response"}
-        return MockClient()
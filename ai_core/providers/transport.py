@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional
+import httpx
+
+try:
+    import h2  # noqa: F401  httpx negotiates HTTP/2 only when h2 is installed
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class ProviderTransport:
+    """Long-lived HTTP connection pools shared by the providers.
+
+    There is one client per upstream base URL. Each client keeps its
+    connections and TLS sessions alive between calls, so a call does not
+    pay for a new handshake. HTTP/2 is offered when the h2 package is
+    installed. The server picks it through TLS ALPN; a plain http
+    upstream gets HTTP/1.1. Credentials go on each request, so every
+    provider talking to the same upstream shares one pool.
+
+    Blocking callers share a thread-safe ``httpx.Client``. Async clients
+    are only handed out on the event loop the transport was started on,
+    which is the API server's (see ``start``). On any other loop, such as
+    ``asyncio.run`` in a script, ``async_client`` returns None and the
+    caller uses the blocking client from a worker thread.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry_s: float = 30, connect_timeout_s: float = 5,
+                 timeout_s: float = 30, http2: bool = True):
+        self.log = logging.getLogger(__name__)
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive_connections,
+                                   keepalive_expiry=keepalive_expiry_s)
+        # Callers pass their own per-request timeout; this is the fallback
+        self.timeout = httpx.Timeout(timeout_s, connect=connect_timeout_s)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        if http2 and not HTTP2_AVAILABLE:
+            self.log.warning("h2 is not installed; provider transport falls back to HTTP/1.1")
+        self._lock = threading.Lock()
+        self._clients: Dict[str, httpx.Client] = {}
+        self._async_clients: Dict[str, httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> "ProviderTransport":
+        """Build from the ``transport`` section of config/ai_core.yaml"""
+        return cls(**(config or {}))
+
+    def client(self, base_url: str) -> httpx.Client:
+        """Pooled blocking client for an upstream"""
+        with self._lock:
+            client = self._clients.get(base_url)
+            if client is None:
+                client = httpx.Client(base_url=base_url, limits=self.limits,
+                                      timeout=self.timeout, http2=self.http2)
+                self._clients[base_url] = client
+            return client
+
+    def async_client(self, base_url: str) -> Optional[httpx.AsyncClient]:
+        """Pooled async client for an upstream, None off the transport's event loop"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        with self._lock:
+            if loop is not self._loop:
+                return None
+            client = self._async_clients.get(base_url)
+            if client is None:
+                client = httpx.AsyncClient(base_url=base_url, limits=self.limits,
+                                           timeout=self.timeout, http2=self.http2)
+                self._async_clients[base_url] = client
+            return client
+
+    async def start(self):
+        """Hand out async clients on the running loop (server startup hook)"""
+        with self._lock:
+            if self._loop is not None and self._loop is not asyncio.get_running_loop():
+                raise RuntimeError("provider transport is already started on another event loop")
+            self._loop = asyncio.get_running_loop()
+
+    async def aclose(self):
+        """Close every pool (server shutdown hook); the transport can be started again"""
+        with self._lock:
+            async_clients = list(self._async_clients.values())
+            self._async_clients.clear()
+            self._loop = None
+        for client in async_clients:
+            await client.aclose()
+        self.close()
+
+    def close(self):
+        """Close the blocking clients"""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+_shared: Optional[ProviderTransport] = None
+_shared_lock = threading.Lock()
+
+def get_transport() -> ProviderTransport:
+    """The process-wide transport, configured from config/ai_core.yaml"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            from ..config_manager import ConfigManager
+            _shared = ProviderTransport.from_config(ConfigManager().get("transport"))
+        return _shared
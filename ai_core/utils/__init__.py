@@ -1,2 +1,3 @@
 from .response_blender import ResponseBlender
-__all__ = ['ResponseBlender']
+from .response_cache import ResponseCache
+__all__ = ['ResponseBlender', 'ResponseCache']
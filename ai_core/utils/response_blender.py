@@ -1,12 +1,20 @@
-from typing import Dict, List
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
 
 class ResponseBlender:
     def __init__(self):
-        self.vectorizer = TfidfVectorizer(stop_words='english')
+        self._vectorizer = None
         self._init_blend_rules()
 
+    @property
+    def vectorizer(self):
+        """TF-IDF vectorizer, created (and sklearn imported) on first use"""
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self._vectorizer = TfidfVectorizer(stop_words='english')
+        return self._vectorizer
+
     def _init_blend_rules(self):
         """Dynamic blending rules"""
         self.rules = {
@@ -30,6 +38,8 @@ class ResponseBlender:
         - Conflict resolution
         - Style preservation
         """
+        if len(responses) == 1:
+            return self._single(responses[0])
         rule = self.rules.get(mode, self.rules['balanced'])
         
         if rule['strategy'] == 'semantic_merge':
@@ -37,6 +47,50 @@ class ResponseBlender:
         else:
             return self._weighted_blend(responses, rule['weights'])
 
+    async def blend_stream(self, primary: AsyncIterator[str], source: str,
+                           secondary: "asyncio.Future[Optional[Dict]]",
+                           mode: str = 'balanced') -> AsyncIterator[Dict[str, Any]]:
+        """Stream the primary's chunks while the secondary is still running
+
+        Yields ``{"type": "delta", "content", "source"}`` per primary chunk,
+        then ``{"type": "final", "response", "answered", "incomplete"}``
+        with the blend of both. ``secondary`` resolves to a response dict,
+        or None if that provider had nothing. A primary stream that raises
+        is not an answer, even if it sent chunks first; it is listed under
+        "incomplete" instead of "answered". If the primary produced nothing
+        the secondary's answer is sent as a single delta. If neither
+        answered, the final response is None.
+        """
+        chunks = []
+        incomplete = []
+        try:
+            async for chunk in primary:
+                chunks.append(chunk)
+                yield {"type": "delta", "content": chunk, "source": source}
+        except Exception:
+            incomplete.append(source)
+
+        responses = [{"content": "".join(chunks), "source": source}] if chunks and not incomplete else []
+        other = await secondary
+        if other is not None:
+            if not chunks:
+                yield {"type": "delta", "content": other["content"], "source": other["source"]}
+            responses.append(other)
+        yield {
+            "type": "final",
+            "response": self.blend(responses, mode) if responses else None,
+            "answered": [r["source"] for r in responses],
+            "incomplete": incomplete
+        }
+
+    def _single(self, response: Dict) -> Dict:
+        """Blend-shaped result for a single answer"""
+        return {
+            'content': response['content'],
+            'sources': [response['source']],
+            'confidence': response.get('confidence', 0.0)
+        }
+
     def _weighted_blend(self, responses: List[Dict], weights: Dict) -> Dict:
         """Basic weighted blending"""
         blended = {
@@ -57,7 +111,7 @@ class ResponseBlender:
         """AI-powered semantic merging"""
         texts = [resp['content'] for resp in responses]
         tfidf = self.vectorizer.fit_transform(texts)
-        similarity = (tfidf * tfidf.T).A[0,1]
+        similarity = (tfidf * tfidf.T).toarray()[0,1]
         
         # Merge based on semantic similarity
         if similarity > 0.7:
@@ -0,0 +1,214 @@
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Set, Tuple
+
+_WORDS = re.compile(r"\w+")
+
+Scope = Tuple[str, Tuple[str, ...]]  # (mode, provider selection)
+
+
+class ResponseCache:
+    """LRU + TTL cache of routed responses.
+
+    Entries are keyed on the normalized query (case, punctuation and
+    spacing ignored), the personality mode and the provider selection.
+    An exact hit is a dict lookup. With ``similarity_threshold`` set, an
+    exact miss falls back to the most similar cached query of the same
+    mode and providers, compared by TF-IDF cosine similarity over all
+    of their words. It is a hit when the similarity reaches the
+    threshold.
+
+    At most ``max_entries`` are kept (least recently used go first), each
+    for ``ttl_s`` seconds.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_s: float = 3600,
+                 similarity_threshold: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl_s
+        self.similarity_threshold = similarity_threshold
+        self.clock = clock
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+        # (scope, normalized query) -> (expires at, value); LRU order
+        self._entries: "OrderedDict[Tuple[Scope, str], Tuple[float, Any]]" = OrderedDict()
+        self._indexes: Dict[Scope, "_SimilarityIndex"] = {}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional["ResponseCache"]:
+        """Build from the ``cache`` config section; None if disabled"""
+        if not config or not config.get("enabled"):
+            return None
+        options = {k: v for k, v in config.items() if k != "enabled"}
+        return cls(**options)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(_WORDS.findall(query.lower()))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, query: str, mode: str = "balanced", providers: Sequence[str] = ()) -> Optional[Any]:
+        """Cached value for the query or a near-duplicate of it, None on a miss"""
+        scope = (mode, tuple(providers))
+        text = self.normalize(query)
+        with self._lock:
+            value = self._lookup((scope, text))
+            if value is not None:
+                self.hits += 1
+                return value
+            if self.similarity_threshold and scope in self._indexes:
+                match = self._indexes[scope].nearest(text, self.similarity_threshold)
+                value = self._lookup((scope, match)) if match is not None else None
+                if value is not None:
+                    self.near_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, query: str, mode: str, providers: Sequence[str], value: Any):
+        scope = (mode, tuple(providers))
+        key = (scope, self.normalize(query))
+        with self._lock:
+            if key not in self._entries:
+                self._index(scope).add(key[1])
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, query: Optional[str] = None, mode: Optional[str] = None) -> int:
+        """Drop entries for a query and/or mode (all entries if neither); returns the count"""
+        text = self.normalize(query) if query is not None else None
+        with self._lock:
+            victims = [key for key in self._entries
+                       if (text is None or key[1] == text) and (mode is None or key[0][0] == mode)]
+            for key in victims:
+                self._remove(key)
+            return len(victims)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0
+            }
+
+    def _lookup(self, key: Tuple[Scope, str]) -> Optional[Any]:
+        """Live value for a key, refreshing its LRU position (lock held)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self.clock():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _remove(self, key: Tuple[Scope, str]):
+        del self._entries[key]
+        index = self._indexes.get(key[0])
+        if index is not None:
+            index.discard(key[1])
+            if not index.queries:
+                del self._indexes[key[0]]
+
+    def _index(self, scope: Scope) -> "_SimilarityIndex":
+        index = self._indexes.get(scope)
+        if index is None:
+            index = self._indexes[scope] = _SimilarityIndex()
+        return index
+
+
+class _SimilarityIndex:
+    """TF-IDF vectors of one scope's cached queries, kept incrementally.
+
+    Every word counts, including stop words ("not"), numbers and single
+    characters, so queries that differ only in those are not merged.
+    Term and document frequencies are updated on add and discard, and
+    IDF weights are applied at lookup time, so nothing is ever refit. A
+    lookup only scores the cached queries sharing a word with the query.
+    """
+
+    def __init__(self):
+        self.queries: Dict[str, Counter] = {}  # text -> term counts
+        self._postings: Dict[str, Set[str]] = {}
+        self._df: Counter = Counter()
+
+    def add(self, text: str):
+        if text in self.queries:
+            return
+        counts = self.queries[text] = Counter(text.split())
+        for term in counts:
+            self._postings.setdefault(term, set()).add(text)
+            self._df[term] += 1
+
+    def discard(self, text: str):
+        counts = self.queries.pop(text, None)
+        if counts is None:
+            return
+        for term in counts:
+            self._postings[term].discard(text)
+            if not self._postings[term]:
+                del self._postings[term]
+            self._df[term] -= 1
+            if not self._df[term]:
+                del self._df[term]
+
+    def nearest(self, text: str, threshold: float) -> Optional[str]:
+        """Most similar cached query if its cosine similarity reaches threshold"""
+        counts = Counter(text.split())
+        if not counts or not self.queries:
+            return None
+        log_n = math.log(1 + len(self.queries))
+        idfs: Dict[str, float] = {}
+
+        def idf(term: str) -> float:
+            # Smoothed, as sklearn's TfidfVectorizer does
+            value = idfs.get(term)
+            if value is None:
+                value = idfs[term] = log_n - math.log(1 + self._df.get(term, 0)) + 1
+            return value
+
+        weights = {term: tf * idf(term) for term, tf in counts.items()}
+        dots: Dict[str, float] = {}
+        shared: Dict[str, float] = {}  # squared weight of the query's words in common
+        for term, weight in weights.items():
+            term_idf = idfs[term]
+            for other in self._postings.get(term, ()):
+                dots[other] = dots.get(other, 0.0) + weight * self.queries[other][term] * term_idf
+                shared[other] = shared.get(other, 0.0) + weight * weight
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        # The similarity is at most |shared part of the query| / |query|,
+        # so queries sharing only common words are skipped unscored
+        floor = (threshold * norm) ** 2 - 1e-9
+        best, best_similarity = None, 0.0
+        for other, dot in dots.items():
+            if shared[other] < floor:
+                continue
+            other_norm = math.sqrt(sum((tf * idf(term)) ** 2
+                                       for term, tf in self.queries[other].items()))
+            similarity = dot / (norm * other_norm)
+            if similarity > best_similarity:
+                best, best_similarity = other, similarity
+        return best if best_similarity >= threshold - 1e-9 else None
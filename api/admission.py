@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+OVERLOADED = "Server overloaded, retry later"
+
+class AdaptiveLimiter:
+    """Admission control with an AIMD concurrency limit.
+
+    Up to ``limit`` requests run at once. A few more wait in a bounded
+    queue for up to ``queue_timeout_ms``. Anything beyond that is turned
+    away at once, so a burst costs the rejected callers a fast 429 instead
+    of costing everyone a timeout.
+
+    The limit adapts to how the requests fare. What counts as slow is
+    learned from the traffic itself: the recent average latency (over
+    about ``short_window`` requests) is compared with the long-run
+    average (about ``long_window`` requests). While the recent average
+    stays within ``tolerance`` times the long-run one and the limit is
+    in use, the limit grows by about one per ``limit`` requests (additive
+    increase). Answers that are steadily slow, such as LLM calls taking
+    several seconds, are therefore normal and do not shrink it. Latency
+    that rises past that gradient, a request slower than the hard
+    ``latency_target_ms`` ceiling, or an overload failure shrinks the
+    limit by ``backoff`` (multiplicative decrease). This happens at most
+    once per typical request time, so one burst of slow answers counts
+    once. Meant for use from the server's event loop.
+    """
+
+    def __init__(self, initial_limit: int = 32, min_limit: int = 4, max_limit: int = 256,
+                 latency_target_ms: float = 12000, tolerance: float = 2.0,
+                 short_window: int = 10, long_window: int = 500, backoff: float = 0.9,
+                 max_queue: int = 64, queue_timeout_ms: float = 1000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.log = logging.getLogger(__name__)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.latency_target = latency_target_ms / 1000
+        self.tolerance = tolerance
+        self.short_window = short_window
+        self._short_alpha = 2 / (short_window + 1)
+        self._long_alpha = 2 / (long_window + 1)
+        self.samples = 0
+        self.short_latency: Optional[float] = None  # exponential moving averages, seconds
+        self.long_latency: Optional[float] = None
+        self.backoff = backoff
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout_ms / 1000
+        self.clock = clock
+        self.inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = float("-inf")
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.increases = 0
+        self.decreases = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> Optional["AdaptiveLimiter"]:
+        """Build from the ``admission`` section of config/ai_core.yaml; None when disabled"""
+        if config is None:
+            from ai_core.config_manager import ConfigManager
+            config = ConfigManager().get("admission") or {}
+        config = dict(config)
+        if not config.pop("enabled", True):
+            return None
+        return cls(**config)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if there is room; False when rejected"""
+        if self.inflight < int(self.limit) and not self._waiters:
+            self.inflight += 1
+            self.admitted += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            # _wake() hands the slot over by setting the result
+            return await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # handed a slot just as the caller went away
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, latency_s: Optional[float] = None, overloaded: bool = False):
+        """Free a slot and adapt the limit.
+
+        ``latency_s`` is how long the request took to answer; None frees
+        the slot without a sample (e.g. a stream, which is as long as its
+        answer). ``overloaded`` marks a failure caused by load, such as a
+        provider timeout.
+        """
+        self.inflight -= 1
+        if latency_s is not None:
+            self._observe(latency_s)
+        if overloaded or (latency_s is not None and self._slow(latency_s)):
+            self._decrease()
+        elif latency_s is not None and (self._waiters or self.inflight + 1 >= self.limit / 2):
+            # Only grow a limit that is actually being used
+            self._change(min(self.max_limit, self.limit + 1 / self.limit))
+        self._wake()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "inflight": self.inflight,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "limit_increases": self.increases,
+            "limit_decreases": self.decreases,
+            "latency_recent_ms": round(self.short_latency * 1000, 1) if self.samples else None,
+            "latency_baseline_ms": round(self.long_latency * 1000, 1) if self.samples else None,
+        }
+
+    def _observe(self, latency_s: float):
+        if not self.samples:
+            self.short_latency = self.long_latency = latency_s
+        else:
+            self.short_latency += self._short_alpha * (latency_s - self.short_latency)
+            self.long_latency += self._long_alpha * (latency_s - self.long_latency)
+        self.samples += 1
+
+    def _slow(self, latency_s: float) -> bool:
+        if latency_s > self.latency_target:
+            return True
+        return (self.samples >= self.short_window
+                and self.short_latency > self.tolerance * self.long_latency)
+
+    def _decrease(self):
+        now = self.clock()
+        window = self.latency_target
+        if self.samples:
+            window = min(window, self.long_latency)
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        self._change(max(self.min_limit, self.limit * self.backoff))
+
+    def _change(self, limit: float):
+        before = int(self.limit)
+        self.limit = limit
+        if int(limit) > before:
+            self.increases += 1
+        elif int(limit) < before:
+            self.decreases += 1
+            self.log.info(f"Concurrency limit lowered to {int(limit)} "
+                          f"({self.inflight} in flight, {self.queue_depth} queued)")
+
+    def _wake(self):
+        while self._waiters and self.inflight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():  # timed out or cancelled meanwhile
+                continue
+            self.inflight += 1
+            self.admitted += 1
+            waiter.set_result(True)
+
+
+class AdmissionMiddleware:
+    """Run HTTP requests under ``paths`` through an AdaptiveLimiter.
+
+    Rejected requests get a 429 with Retry-After. A request holds its
+    slot until its response is complete. Its latency sample is the time
+    to the response headers, which for /chat is the whole answer; event
+    streams send their headers first and give no sample. 503/504
+    answers and unhandled errors count as overload.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: AdaptiveLimiter, paths: Tuple[str, ...] = ("/api/v1/chat",),
+                 retry_after_s: int = 1):
+        self.app = app
+        self.limiter = limiter
+        self.paths = paths
+        self.retry_after_s = retry_after_s
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+        if not await self.limiter.acquire():
+            response = JSONResponse({"detail": OVERLOADED}, status_code=429,
+                                    headers={"Retry-After": str(self.retry_after_s)})
+            await response(scope, receive, send)
+            return
+
+        start = time.monotonic()
+        latency: Optional[float] = None
+        status: Optional[int] = None
+
+        async def timed_send(message: Message):
+            nonlocal latency, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = dict(message.get("headers", []))
+                if not headers.get(b"content-type", b"").startswith(b"text/event-stream"):
+                    latency = time.monotonic() - start
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            self.limiter.release(latency, overloaded=status is None or status in (503, 504))
@@ -0,0 +1,17 @@
+from typing import Optional
+from fastapi.requests import HTTPConnection
+from engine import SlickLogicEngine
+from memory import ShardedMemoryBank
+from .admission import AdaptiveLimiter
+
+def get_engine(connection: HTTPConnection) -> SlickLogicEngine:
+    """The application-wide engine created once by APIServer"""
+    return connection.app.state.engine
+
+def get_memory(connection: HTTPConnection) -> ShardedMemoryBank:
+    """The application-wide memory created once by APIServer"""
+    return connection.app.state.memory
+
+def get_limiter(connection: HTTPConnection) -> Optional[AdaptiveLimiter]:
+    """The application-wide admission limiter, None when admission control is off"""
+    return connection.app.state.limiter
@@ -1,29 +1,34 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, Optional
+import json
 import logging
 from engine import SlickLogicEngine
-from memory import MemoryBank
+from ..dependencies import get_engine
 
 router = APIRouter()
 log = logging.getLogger(__name__)
 
 class ChatRequest(BaseModel):
     message: str
-    mode: Optional[str] = "balanced"
+    mode: Optional[str] = None  # None: the system mode (POST /system/mode)
     context: Optional[dict] = None
 
 @router.post("/chat")
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, engine: SlickLogicEngine = Depends(get_engine)):
     """Main chat API endpoint"""
     try:
-        # Get engine instance (would be dependency injected in real app)
-        engine = SlickLogicEngine(MemoryBank())
-        engine.set_personality_mode(request.mode)
-        
-        response = engine.process_query(
+        mode = engine.personality.resolve_mode(request.mode)
+    except ValueError as e:
+        raise HTTPException(400, detail=str(e))
+
+    try:
+        # The mode is passed per request; the shared engine is not mutated
+        response = await engine.process_query_async(
             request.message,
-            request.context or {}
+            request.context or {},
+            mode=mode
         )
         
         if response["status"] == "error":
@@ -34,6 +39,43 @@ async def chat_endpoint(request: ChatRequest):
             "context": response["context"]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         log.error(f"Chat error: {e}")
         raise HTTPException(500, detail=str(e))
+
+@router.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, engine: SlickLogicEngine = Depends(get_engine)):
+    """/chat as server-sent events, for clients that cannot keep a websocket
+
+    Events are named after their type: context, personality, delta (answer
+    chunks) and final (the /chat result with status, or an error).
+    """
+    try:
+        mode = engine.personality.resolve_mode(request.mode)
+    except ValueError as e:
+        raise HTTPException(400, detail=str(e))
+
+    events = engine.process_query_stream(request.message, request.context or {}, mode=mode)
+    return StreamingResponse(
+        _sse(events),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they come
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _sse(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Server-sent event frames of an engine stream
+
+    The stream is pulled one event per frame sent. The server awaits a
+    slow client's socket before asking for the next event, so the engine
+    and the provider streams it reads wait for the client instead of
+    buffering. A client disconnect cancels this generator. Closing the
+    engine stream then cancels the provider calls.
+    """
+    try:
+        async for event in events:
+            yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+    finally:
+        await events.aclose()
@@ -1,7 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 import logging
 from engine import SlickLogicEngine
+from ..dependencies import get_engine, get_limiter
 
 router = APIRouter()
 log = logging.getLogger(__name__)
@@ -10,10 +11,9 @@ class SystemMode(BaseModel):
     mode: str
 
 @router.post("/system/mode")
-async def set_mode(request: SystemMode):
-    """Change system personality mode"""
+async def set_mode(request: SystemMode, engine: SlickLogicEngine = Depends(get_engine)):
+    """Change the default personality mode (for requests that set none)"""
     try:
-        engine = SlickLogicEngine()  # Would be dependency injected
         engine.set_personality_mode(request.mode)
         return {"status": "success", "mode": request.mode}
     except ValueError as e:
@@ -22,6 +22,16 @@ async def set_mode(request: SystemMode):
         log.error(f"Mode change error: {e}")
         raise HTTPException(500, detail="Internal server error")
 
+@router.get("/system/performance")
+async def get_performance(engine: SlickLogicEngine = Depends(get_engine),
+                          limiter=Depends(get_limiter)):
+    """Engine metrics, including requests coalesced into in-flight queries,
+    and the admission limit, queue depth and rejections"""
+    report = engine.get_performance_report()
+    if limiter is not None:
+        report["admission"] = limiter.stats()
+    return report
+
 @router.get("/system/status")
 async def get_status():
     """Get system health status"""
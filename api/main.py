@@ -1,29 +1,57 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from engine import SlickLogicEngine
-from memory import MemoryBank
+from memory import ShardedMemoryBank
+from ai_core.APIOrchestrator import APIOrchestrator
+from ai_core.providers import get_transport
+from .admission import AdaptiveLimiter, AdmissionMiddleware
 
 class APIServer:
-    def __init__(self):
+    def __init__(self, memory: Optional[ShardedMemoryBank] = None,
+                 orchestrator: Optional[APIOrchestrator] = None,
+                 limiter: Optional[AdaptiveLimiter] = None):
         self.app = FastAPI(
             title="Slick AI API",
             version="2.1.0",
             description="API for Slick AI System"
         )
+        # Admission control for chat requests and websocket messages;
+        # None when disabled in config
+        self.limiter = limiter if limiter is not None else AdaptiveLimiter.from_config()
+        self.app.state.limiter = self.limiter
         self._setup_middleware()
         self._setup_routes()
         self.log = logging.getLogger(__name__)
         
-        # Initialize core systems
-        self.memory = MemoryBank()
-        self.engine = SlickLogicEngine(self.memory)
+        # Initialize core systems once; endpoints get them through
+        # the dependencies in api/dependencies.py
+        # Memory is sharded per user/session id (ChatRequest.context)
+        self.memory = memory if memory is not None else ShardedMemoryBank.from_config()
+        # Providers answer through the engine; the websocket can stream them
+        self.orchestrator = orchestrator if orchestrator is not None else APIOrchestrator()
+        self.engine = SlickLogicEngine(self.memory, orchestrator=self.orchestrator)
+        self.app.state.memory = self.memory
+        self.app.state.engine = self.engine
+        # Commit write-behind memory stores before the process exits
+        self.app.add_event_handler("shutdown", self.memory.close)
+        self.app.add_event_handler("shutdown", self.engine.close)
+        # Models load before the first request instead of during it
+        self.app.add_event_handler("startup", self.engine.warm_up)
+        # Provider connection pools live as long as the server: async
+        # clients bind to its event loop and are drained on shutdown
+        self.transport = get_transport()
+        self.app.add_event_handler("startup", self.transport.start)
+        self.app.add_event_handler("shutdown", self.transport.aclose)
         
         self.log.info("API Server initialized")
 
     def _setup_middleware(self):
         """Configure API middleware"""
+        # Added first so that CORS wraps it and 429s carry CORS headers too
+        if self.limiter is not None:
+            self.app.add_middleware(AdmissionMiddleware, limiter=self.limiter)
         self.app.add_middleware(
             CORSMiddleware,
             allow_origins=["*"],
@@ -46,7 +74,8 @@ class APIServer:
         import uvicorn
         uvicorn.run(self.app, host=host, port=port)
 
-app = APIServer().app
+server = APIServer()
+app = server.app
 
 if __name__ == "__main__":
-    APIServer().run()
+    server.run()
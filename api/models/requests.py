@@ -3,7 +3,7 @@ from typing import Optional, Dict, Any
 
 class ChatRequest(BaseModel):
     message: str
-    mode: Optional[str] = "balanced"
+    mode: Optional[str] = None  # None: the system mode
     context: Optional[Dict[str, Any]] = None
 
 class FeedbackRequest(BaseModel):
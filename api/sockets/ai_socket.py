@@ -1,18 +1,17 @@
 import json
-from fastapi import WebSocket
-from typing import Dict, Any
+import time
+from fastapi import Depends, WebSocket, WebSocketDisconnect
+from typing import Dict, Any, Optional
 import logging
 from engine import SlickLogicEngine
-from memory import MemoryBank
-from concurrent.futures import ThreadPoolExecutor
+from ..admission import OVERLOADED, AdaptiveLimiter
+from ..dependencies import get_engine, get_limiter
 
 log = logging.getLogger(__name__)
-executor = ThreadPoolExecutor(max_workers=4)
 
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
-        self.engine = SlickLogicEngine(MemoryBank())
 
     async def connect(self, websocket: WebSocket, client_id: str):
         await websocket.accept()
@@ -24,25 +23,67 @@ class ConnectionManager:
             del self.active_connections[client_id]
             log.info(f"Client {client_id} disconnected")
 
-    async def process_message(self, client_id: str, data: Dict[str, Any]):
-        """Process message in background thread"""
-        def _process():
-            try:
-                response = self.engine.process_query(
-                    data["message"],
-                    data.get("context", {})
-                )
-                return response
-            except Exception as e:
-                log.error(f"Processing error: {e}")
-                return {"error": str(e)}
+    async def process_message(self, client_id: str, data: Dict[str, Any], engine: SlickLogicEngine):
+        """Process message without blocking the event loop"""
+        try:
+            return await engine.process_query_async(
+                data["message"],
+                data.get("context", {}),
+                mode=data.get("mode")
+            )
+        except Exception as e:
+            log.error(f"Processing error: {e}")
+            return {"error": str(e)}
+
+    async def stream_message(self, websocket: WebSocket, data: Dict[str, Any],
+                             engine: SlickLogicEngine):
+        """Forward {"type": "delta"} frames as the answer is produced, then a
+        {"type": "final"} frame with the complete response"""
+        events = engine.process_query_stream(
+            data["message"],
+            data.get("context", {}),
+            mode=data.get("mode")
+        )
+        try:
+            async for event in events:
+                if event["type"] in ("delta", "final"):
+                    await websocket.send_json(event)
+        finally:
+            # A client that went away stops the provider calls too
+            await events.aclose()
+
+    async def admitted_message(self, websocket: WebSocket, client_id: str, message: Dict[str, Any],
+                               engine: SlickLogicEngine, limiter: Optional[AdaptiveLimiter]):
+        """Handle one message under admission control; over the limit the
+        client gets an {"type": "overload"} frame and may retry"""
+        if limiter is None:
+            return await self.handle_message(websocket, client_id, message, engine)
+        if not await limiter.acquire():
+            await websocket.send_json({"type": "overload", "error": OVERLOADED,
+                                       "retry_after_ms": 1000})
+            return
+        start = time.monotonic()
+        latency = None
+        try:
+            await self.handle_message(websocket, client_id, message, engine)
+            # A stream lasts as long as its answer, so it gives no latency sample
+            if not message.get("stream"):
+                latency = time.monotonic() - start
+        finally:
+            limiter.release(latency)
 
-        future = executor.submit(_process)
-        return future.result()
+    async def handle_message(self, websocket: WebSocket, client_id: str, message: Dict[str, Any],
+                             engine: SlickLogicEngine):
+        if message.get("stream"):
+            await self.stream_message(websocket, message, engine)
+            return
+        response = await self.process_message(client_id, message, engine)
+        await websocket.send_json(response)
 
 manager = ConnectionManager()
 
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, engine: SlickLogicEngine = Depends(get_engine),
+                             limiter: Optional[AdaptiveLimiter] = Depends(get_limiter)):
     client_id = f"client_{id(websocket)}"
     await manager.connect(websocket, client_id)
     
@@ -51,10 +92,11 @@ async def websocket_endpoint(websocket: WebSocket):
             data = await websocket.receive_text()
             try:
                 message = json.loads(data)
-                response = await manager.process_message(client_id, message)
-                await websocket.send_json(response)
+                await manager.admitted_message(websocket, client_id, message, engine, limiter)
             except json.JSONDecodeError:
                 await websocket.send_json({"error": "Invalid JSON"})
+            except WebSocketDisconnect:
+                raise
             except Exception as e:
                 log.error(f"WebSocket error: {e}")
                 await websocket.send_json({"error": str(e)})
@@ -1,5 +1,7 @@
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from shared.query_analysis import QueryAnalysis
+from shared.query_features import query_features
 
 class InterestEnhancer:
     def __init__(self):
@@ -10,9 +12,10 @@ class InterestEnhancer:
             "humor": 0.9 if self._is_homer_mode() else 0.4
         }
 
-    def process(self, query: str, context: Dict) -> Dict[str, Any]:
+    def process(self, query: str, context: Dict,
+                query_analysis: Optional[QueryAnalysis] = None) -> Dict[str, Any]:
         """Enhance query based on detected interests"""
-        interest = self._detect_interest(query)
+        interest = self._detect_interest(query, query_analysis)
         return {
             "original_query": query,
             "enhanced_query": f"[{interest}] {query}",
@@ -20,18 +23,10 @@ class InterestEnhancer:
             "context": context
         }
 
-    def _detect_interest(self, query: str) -> str:
+    def _detect_interest(self, query: str, query_analysis: Optional[QueryAnalysis] = None) -> str:
         """Simple interest detection"""
-        query = query.lower()
-        if any(t in query for t in ["code", "tech", "computer"]):
-            return "technology"
-        elif any(s in query for s in ["science", "physics", "math"]):
-            return "science"
-        elif any(a in query for a in ["art", "paint", "music"]):
-            return "art"
-        elif any(h in query for h in ["joke", "funny", "homer"]):
-            return "humor"
-        return "general"
+        features = query_analysis.features if query_analysis else query_features(query)
+        return features.first("interest", "general")
 
     def _is_homer_mode(self) -> bool:
         """Check if in Homer mode (simplified)"""
@@ -11,6 +11,8 @@ class DeepSeekConnector:
         self.endpoint = "https://api.deepseek.ai/v1"
         self.max_retries = 2
         self.timeout = 5
+        # Keep-alive connection pool reused by every sync
+        self.session = requests.Session()
         self.local_backup_dir = Path(settings.PROJECT_ROOT) / "sessions" / "pending_sync"
         self.local_backup_dir.mkdir(parents=True, exist_ok=True)
         self.valid_dns = False
@@ -34,7 +36,7 @@ class DeepSeekConnector:
                 
             backup_path = self._store_locally(session_file)['path']
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.endpoint}/session/sync",
                 json={"session_data": session_content},
                 headers={
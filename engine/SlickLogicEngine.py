@@ -1,14 +1,19 @@
+import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterator, Optional
 from datetime import datetime
+from shared.query_analysis import QueryAnalysis
 from .subsystems import PersonalityEngine, MemoryInterface, LearningEngine
-from .utils import ContextBuilder, PerformanceMonitor
+from .utils import ContextBuilder, PerformanceMonitor, SingleFlight
 
 class SlickLogicEngine:
-    def __init__(self, memory, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, memory, config: Optional[Dict[str, Any]] = None, orchestrator=None):
         self.log = logging.getLogger(__name__)
         self.memory = memory
         self.config = config or {}
+        # ai_core APIOrchestrator; when set, responses carry the providers'
+        # blended answer under "answer"
+        self.orchestrator = orchestrator
         self._init_subsystems()
         self.log.info("Enhanced Logic Engine initialized")
 
@@ -21,46 +26,228 @@ class SlickLogicEngine:
         self.learning_engine = LearningEngine()
         self.context_builder = ContextBuilder()
         self.monitor = PerformanceMonitor()
+        # Identical queries already being answered are joined, not rerun
+        self.inflight = SingleFlight()
 
     @PerformanceMonitor().track
-    def process_query(self, query: str, user_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Enhanced processing pipeline with monitoring"""
+    def process_query(self, query: str, user_context: Optional[Dict[str, Any]] = None,
+                      mode: Optional[str] = None) -> Dict[str, Any]:
+        """Enhanced processing pipeline with monitoring
+
+        ``mode`` applies to this query only, so one engine can serve
+        concurrent requests in different modes; None uses the default
+        set with set_personality_mode().
+
+        The query is analyzed once (QueryAnalysis) and every stage reads
+        that. Each stage's time is in get_performance_report()["stages"].
+        """
         try:
+            mode = self.personality.resolve_mode(mode)
             # Track mode usage
-            self.monitor.record_mode_usage(self.personality.mode)
+            self.monitor.record_mode_usage(mode)
+            with self.monitor.stage("analysis"):
+                query_analysis = QueryAnalysis.of(query)
             
             # Build context
-            context = self.context_builder.build(
-                query=query,
-                memory=self.memory_interface,
-                user_context=user_context or {}
-            )
+            with self.monitor.stage("context"):
+                context = self.context_builder.build(
+                    query=query,
+                    memory=self.memory_interface,
+                    user_context=user_context or {},
+                    query_analysis=query_analysis
+                )
+            query_analysis = self._with_entities(query_analysis, context)
             
             # Process with personality
-            processed = self.personality.process(query, context)
+            with self.monitor.stage("personality"):
+                processed = self.personality.process(query, context, mode, query_analysis)
+            if self.orchestrator is not None:
+                with self.monitor.stage("providers"):
+                    processed = self._with_answer(processed, self.orchestrator.route_query(
+                        query, self._provider_context(context, mode, query_analysis)
+                    ))
             
             # Store interaction
-            self.memory_interface.store_interaction(
-                query=query,
-                response=processed,
-                context=context
-            )
+            with self.monitor.stage("store"):
+                self.memory_interface.store_interaction(
+                    query=query,
+                    response=processed,
+                    context=context
+                )
             
-            return {
-                "status": "success",
-                "timestamp": datetime.now().isoformat(),
-                "query": query,
-                "response": processed,
-                "context": context
-            }
+            return self._success(query, mode, processed, context)
             
         except Exception as e:
-            self.log.error(f"Processing failed: {e}")
-            return {
-                "status": "error",
-                "message": str(e),
-                "timestamp": datetime.now().isoformat()
-            }
+            return self._failure(e)
+
+    @PerformanceMonitor().track
+    async def process_query_async(self, query: str, user_context: Optional[Dict[str, Any]] = None,
+                                  mode: Optional[str] = None) -> Dict[str, Any]:
+        """process_query() for the event loop
+
+        Blocking steps (memory lookup and store, NLP) are awaited in worker
+        threads, so one event loop can serve many concurrent clients.
+
+        A query arriving while the same query is in flight for the same
+        mode and user context waits for that result instead of running
+        again; such responses are marked ``"coalesced": True``. The whole
+        user context is part of the key, not just the memory tenant, so
+        answers never carry another caller's memory or context; anonymous
+        callers share a tenant but not their contexts.
+        """
+        try:
+            mode = self.personality.resolve_mode(mode)
+            self.monitor.record_mode_usage(mode)
+        except Exception as e:
+            return self._failure(e)
+
+        key = (query, mode, self._context_key(user_context))
+        result, shared = await self.inflight.do(key, self._process_async, query,
+                                                user_context or {}, mode)
+        return dict(result, coalesced=True) if shared else result
+
+    async def _process_async(self, query: str, user_context: Dict[str, Any],
+                             mode: str) -> Dict[str, Any]:
+        try:
+            with self.monitor.stage("analysis"):
+                query_analysis = QueryAnalysis.of(query)
+            with self.monitor.stage("context"):
+                context = await self.context_builder.build_async(
+                    query=query,
+                    memory=self.memory_interface,
+                    user_context=user_context,
+                    query_analysis=query_analysis
+                )
+            query_analysis = self._with_entities(query_analysis, context)
+            with self.monitor.stage("personality"):
+                processed = await self.personality.process_async(query, context, mode, query_analysis)
+            if self.orchestrator is not None:
+                with self.monitor.stage("providers"):
+                    processed = self._with_answer(processed, await self.orchestrator.route_query_async(
+                        query, self._provider_context(context, mode, query_analysis)
+                    ))
+            with self.monitor.stage("store"):
+                await self.memory_interface.store_interaction_async(
+                    query=query,
+                    response=processed,
+                    context=context
+                )
+            
+            return self._success(query, mode, processed, context)
+            
+        except Exception as e:
+            return self._failure(e)
+
+    async def process_query_stream(self, query: str, user_context: Optional[Dict[str, Any]] = None,
+                                   mode: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """process_query_async() as a stream of events, each as soon as it is ready
+
+        - ``{"type": "context", "context"}`` once the context is built
+        - ``{"type": "personality", "mode", "response"}`` once the
+          personality is applied
+        - ``{"type": "delta", "content"}`` chunks of the answer: the
+          providers' stream when there is an orchestrator, else the
+          personality response in one piece
+        - ``{"type": "final", ...}`` with the process_query_async() result
+
+        Streams are not coalesced. Closing the stream early cancels the
+        provider calls and nothing is stored.
+        """
+        try:
+            mode = self.personality.resolve_mode(mode)
+            self.monitor.record_mode_usage(mode)
+            with self.monitor.stage("analysis"):
+                query_analysis = QueryAnalysis.of(query)
+            with self.monitor.stage("context"):
+                context = await self.context_builder.build_async(
+                    query=query,
+                    memory=self.memory_interface,
+                    user_context=user_context or {},
+                    query_analysis=query_analysis
+                )
+            query_analysis = self._with_entities(query_analysis, context)
+        except Exception as e:
+            yield {"type": "final", **self._failure(e)}
+            return
+        yield {"type": "context", "context": context}
+
+        try:
+            with self.monitor.stage("personality"):
+                processed = await self.personality.process_async(query, context, mode, query_analysis)
+        except Exception as e:
+            yield {"type": "final", **self._failure(e)}
+            return
+        yield {"type": "personality", "mode": mode, "response": processed}
+
+        if self.orchestrator is None:
+            yield {"type": "delta", "content": processed["content"]}
+        else:
+            events = self.orchestrator.route_query_stream(
+                query, self._provider_context(context, mode, query_analysis))
+            try:
+                async for event in events:
+                    if event["type"] == "delta":
+                        yield {"type": "delta", "content": event["content"], "source": event["source"]}
+                    else:
+                        processed = self._with_answer(processed, event["result"])
+            finally:
+                await events.aclose()
+
+        try:
+            with self.monitor.stage("store"):
+                await self.memory_interface.store_interaction_async(
+                    query=query,
+                    response=processed,
+                    context=context
+                )
+        except Exception as e:
+            yield {"type": "final", **self._failure(e)}
+            return
+        yield {"type": "final", **self._success(query, mode, processed, context)}
+
+    @staticmethod
+    def _context_key(user_context: Optional[Dict[str, Any]]) -> str:
+        """Canonical form of a user context, equal only for equal contexts"""
+        return json.dumps(user_context or {}, sort_keys=True, default=repr)
+
+    def _with_entities(self, query_analysis: QueryAnalysis, context: Dict[str, Any]) -> QueryAnalysis:
+        """The analysis plus the entities the context builder found"""
+        return query_analysis.with_entities(context["linguistic"].get("entities", []))
+
+    def _provider_context(self, context: Dict[str, Any], mode: str,
+                          query_analysis: QueryAnalysis) -> Dict[str, Any]:
+        """What the providers see of a query's context"""
+        return {
+            "mode": mode,
+            "query_analysis": query_analysis,
+            "last_3_interactions": context["memory"]["related_queries"]
+        }
+
+    def _with_answer(self, processed: Dict[str, Any], routed: Dict[str, Any]) -> Dict[str, Any]:
+        """The personality response plus the providers' blended answer"""
+        if routed["status"] != "success":
+            self.log.warning(f"No provider answer: {routed['message']}")
+            return processed
+        return dict(processed, answer=routed["response"])
+
+    def _success(self, query: str, mode: str, processed: Dict[str, Any],
+                 context: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "status": "success",
+            "timestamp": datetime.now().isoformat(),
+            "query": query,
+            "mode": mode,
+            "response": processed,
+            "context": context
+        }
+
+    def _failure(self, e: Exception) -> Dict[str, Any]:
+        self.log.error(f"Processing failed: {e}")
+        return {
+            "status": "error",
+            "message": str(e),
+            "timestamp": datetime.now().isoformat()
+        }
 
     def set_personality_mode(self, mode: str):
         """Change personality mode with validation"""
@@ -69,7 +256,21 @@ class SlickLogicEngine:
 
     def get_performance_report(self) -> Dict[str, Any]:
         """Get system performance metrics"""
-        return self.monitor.get_report()
+        report = self.monitor.get_report()
+        report["coalescing"] = self.inflight.stats()
+        if self.context_builder.analyzer is not None:
+            report["nlp_batching"] = self.context_builder.analyzer.stats()
+        if self.context_builder.cache is not None:
+            report["nlp_cache"] = self.context_builder.cache.stats()
+        return report
+
+    def warm_up(self):
+        """Load the models the engine would otherwise load on its first query"""
+        self.context_builder.warm_up()
+
+    def close(self):
+        """Release the engine's worker threads and processes and persist its caches"""
+        self.context_builder.close()
 
     def provide_feedback(self, feedback: Dict[str, Any]):
         """Learn from user feedback"""
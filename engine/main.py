@@ -15,7 +15,7 @@ class SlickAI(cmd.Cmd):
     def __init__(self):
         super().__init__()
         self._setup_logging()
-        self.memory = MemoryBank()
+        self.memory = MemoryBank.from_config()
         self.engine = SlickLogicEngine(self.memory)
         self.api = APIOrchestrator()
         self.log.info("System initialized")
@@ -51,6 +51,7 @@ class SlickAI(cmd.Cmd):
 
     def do_exit(self, arg):
         """Exit the system"""
+        self.memory.close()
         self.log.info("Shutting down")
         print("Goodbye!")
         return True
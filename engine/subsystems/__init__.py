@@ -1,3 +1,4 @@
 from .personality_engine import PersonalityEngine
 from .memory_interface import MemoryInterface
-__all__ = ['PersonalityEngine', 'MemoryInterface']
+from .learning_engine import LearningEngine
+__all__ = ['PersonalityEngine', 'MemoryInterface', 'LearningEngine']
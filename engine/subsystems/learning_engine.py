@@ -1,14 +1,14 @@
 import logging
 import numpy as np
 from typing import Dict, Any, List
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
 
 class LearningEngine:
     def __init__(self, n_clusters: int = 5):
         self.log = logging.getLogger(__name__)
-        self.vectorizer = TfidfVectorizer(max_features=1000)
-        self.clusterer = KMeans(n_clusters=n_clusters)
+        self.n_clusters = n_clusters
+        # sklearn models, created (and sklearn imported) with the first batch of feedback
+        self.vectorizer = None
+        self.clusterer = None
         self.feedback_history = []
         self.log.info("Learning Engine initialized")
 
@@ -24,6 +24,11 @@ class LearningEngine:
         texts = [fb['query'] + " " + fb['comment'] for fb in self.feedback_history]
         
         try:
+            if self.vectorizer is None:
+                from sklearn.feature_extraction.text import TfidfVectorizer
+                from sklearn.cluster import KMeans
+                self.vectorizer = TfidfVectorizer(max_features=1000)
+                self.clusterer = KMeans(n_clusters=self.n_clusters)
             X = self.vectorizer.fit_transform(texts)
             self.clusterer.fit(X)
             self.log.info("Updated learning models")
@@ -1,5 +1,10 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, Optional
+import asyncio
 import logging
+from memory import ShardedMemoryBank
+
+# Request context keys identifying whose memory an interaction belongs to
+TENANT_KEYS = ("user_id", "session_id")
 
 class MemoryInterface:
     def __init__(self, memory_system):
@@ -9,19 +14,35 @@ class MemoryInterface:
 
     def store_interaction(self, query: str, response: Dict[str, Any], context: Dict[str, Any]):
         """Store a complete interaction in memory"""
+        # Retrieved memories are not stored again with every new interaction
         interaction = {
-            "query": query,
             "response": response,
-            "context": context,
-            "timestamp": self._get_timestamp()
+            "context": {k: v for k, v in context.items() if k != "memory"}
         }
-        self.memory.store(interaction)
+        self.memory.store(query, interaction, **self._scope(context.get("user")))
         self.log.debug(f"Stored interaction: {query[:50]}...")
 
-    def get_context(self, query: str, max_results: int = 3) -> List[Dict[str, Any]]:
-        """Retrieve relevant context for a query"""
-        return self.memory.retrieve(query, max_results)
+    async def store_interaction_async(self, query: str, response: Dict[str, Any],
+                                      context: Dict[str, Any]):
+        """store_interaction() off the event loop (it takes the memory write lock)"""
+        await asyncio.to_thread(self.store_interaction, query, response, context)
+
+    def get_context(self, query: str, max_results: int = 3,
+                    user_context: Optional[Dict[str, Any]] = None,
+                    tokens: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Retrieve relevant context for a query from the user's own history;
+        ``tokens`` are the query's lowercase words (QueryAnalysis.tokens)"""
+        return self.memory.get_context(query, max_results, tokens=tokens,
+                                       **self._scope(user_context))
+
+    def tenant_of(self, user_context: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Memory tenant of a request: its user id, else its session id"""
+        for key in TENANT_KEYS:
+            if user_context and user_context.get(key):
+                return str(user_context[key])
+        return None
 
-    def _get_timestamp(self) -> str:
-        from datetime import datetime
-        return datetime.now().isoformat()
+    def _scope(self, user_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if isinstance(self.memory, ShardedMemoryBank):
+            return {"tenant": self.tenant_of(user_context)}
+        return {}
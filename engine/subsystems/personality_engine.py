@@ -1,5 +1,6 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
+from shared.query_analysis import QueryAnalysis
 
 class PersonalityEngine:
     MODES = {
@@ -14,19 +15,28 @@ class PersonalityEngine:
         self.mode = mode
         self.log.info(f"Personality Engine initialized in {mode} mode")
 
-    def process(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Process query according to personality mode"""
-        mode_params = self.MODES[self.mode]
+    def process(self, query: str, context: Dict[str, Any], mode: Optional[str] = None,
+                query_analysis: Optional[QueryAnalysis] = None) -> Dict[str, Any]:
+        """Process query according to personality mode (default: the current mode)"""
+        mode = self.resolve_mode(mode)
+        mode_params = self.MODES[mode]
         
-        if self.mode == "technical":
+        if mode == "technical":
             return self._technical_process(query, context, mode_params)
-        elif self.mode == "creative":
+        elif mode == "creative":
             return self._creative_process(query, context, mode_params)
-        elif self.mode == "homer":
-            return self._homer_process(query, context, mode_params)
+        elif mode == "homer":
+            return self._homer_process(query, context, mode_params, query_analysis)
         else:
             return self._balanced_process(query, context, mode_params)
 
+    async def process_async(self, query: str, context: Dict[str, Any],
+                            mode: Optional[str] = None,
+                            query_analysis: Optional[QueryAnalysis] = None) -> Dict[str, Any]:
+        """process() for the event loop; it only formats a few strings, which
+        is cheaper than handing it to a thread"""
+        return self.process(query, context, mode, query_analysis)
+
     def _technical_process(self, query: str, context: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
         """Technical precision-focused processing"""
         return {
@@ -53,15 +63,17 @@ class PersonalityEngine:
             ]
         }
 
-    def _homer_process(self, query: str, context: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    def _homer_process(self, query: str, context: Dict[str, Any], params: Dict[str, Any],
+                       query_analysis: Optional[QueryAnalysis] = None) -> Dict[str, Any]:
         """Homer personality processing"""
+        lowered = query_analysis.lowered if query_analysis else query.lower()
         homerisms = ["D'oh!", "Mmm...", "Woo-hoo!", "Why you little..."]
         import random
         return {
             "content": f"{random.choice(homerisms)} {query}",
             "style": "humorous",
             "confidence": params["humor"],
-            "simplified": f"Basically, {query.lower()}"
+            "simplified": f"Basically, {lowered}"
         }
 
     def _balanced_process(self, query: str, context: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
@@ -77,10 +89,16 @@ class PersonalityEngine:
             ]
         }
 
+    def resolve_mode(self, mode: Optional[str] = None) -> str:
+        """Validated mode name; None means the current mode"""
+        if mode is None:
+            return self.mode
+        if mode.lower() in self.MODES:
+            return mode.lower()
+        raise ValueError(f"Invalid mode. Choose from: {list(self.MODES.keys())}")
+
     def set_mode(self, new_mode: str):
         """Change processing mode"""
-        if new_mode.lower() in self.MODES:
-            self.mode = new_mode.lower()
-            self.log.info(f"Changed to {self.mode} mode")
-            return True
-        raise ValueError(f"Invalid mode. Choose from: {list(self.MODES.keys())}")
+        self.mode = self.resolve_mode(new_mode)
+        self.log.info(f"Changed to {self.mode} mode")
+        return True
@@ -1,2 +1,7 @@
+from .analysis_cache import AnalysisCache
 from .context_builder import ContextBuilder
-__all__ = ['ContextBuilder']
+from .model_registry import ModelRegistry, models
+from .nlp_batcher import BatchAnalyzer
+from .performance_monitor import PerformanceMonitor
+from .single_flight import SingleFlight
+__all__ = ['AnalysisCache', 'BatchAnalyzer', 'ContextBuilder', 'ModelRegistry', 'PerformanceMonitor', 'SingleFlight', 'models']
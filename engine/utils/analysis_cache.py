@@ -0,0 +1,104 @@
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+from shared.query_analysis import normalize, text_key
+
+class AnalysisCache:
+    """LRU cache of per-query linguistic analysis.
+
+    Entries are keyed by a hash of the normalized query text: Unicode
+    NFKC, with runs of whitespace collapsed. Case is kept, since the NER
+    model reads it. At most ``max_entries`` are kept, and the least
+    recently used go first.
+
+    With ``path`` set, the entries are loaded from that file on start and
+    written back by ``save``, so a restarted server skips the NLP pass
+    for its hot queries. The file is written to a temporary name and
+    then renamed, so a crash mid-save leaves the previous file intact.
+    """
+
+    def __init__(self, max_entries: int = 10000, path: Optional[str] = None):
+        self.log = logging.getLogger(__name__)
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        if self.path is not None:
+            self._load()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional["AnalysisCache"]:
+        """Build from the ``nlp.cache`` config section; None if disabled"""
+        if not config or not config.get("enabled"):
+            return None
+        options = {k: v for k, v in config.items() if k != "enabled"}
+        return cls(**options)
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return text_key(normalize(text))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, text: str, key: Optional[bytes] = None) -> Optional[Dict[str, Any]]:
+        """``key`` is the text's key when the caller has it (QueryAnalysis.key)"""
+        key = key or self.key(text)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, text: str, value: Dict[str, Any], key: Optional[bytes] = None):
+        key = key or self.key(text)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def save(self):
+        """Write the entries to ``path``, least recently used first"""
+        if self.path is None:
+            return
+        with self._lock:
+            entries = list(self._entries.items())
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            self.log.error(f"Analysis cache save failed: {e}")
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "rb") as f:
+                entries = pickle.load(f)
+        except Exception as e:
+            self.log.warning(f"Analysis cache not loaded from {self.path}: {e}")
+            return
+        self._entries = OrderedDict(entries[max(0, len(entries) - self.max_entries):])
+        self.log.info(f"Loaded {len(self._entries)} cached query analyses")
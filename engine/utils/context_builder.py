@@ -1,58 +1,160 @@
-import spacy
-from typing import Dict, Any, List
+import asyncio
+import threading
+from typing import Dict, Any, List, Optional
 import logging
+from shared.query_analysis import QueryAnalysis
+from .analysis_cache import AnalysisCache
+from .model_registry import models
+from .nlp_batcher import BatchAnalyzer
+
+# Pipeline components whose output is never read here: only entities,
+# POS tags and lemmas are (see linguistic_features)
+UNUSED_COMPONENTS = ("parser", "senter")
+
+def linguistic_features(doc) -> Dict[str, Any]:
+    """The parts of a spaCy Doc that go into the context"""
+    return {
+        "entities": [(ent.text, ent.label_) for ent in doc.ents],
+        "verbs": [token.lemma_ for token in doc if token.pos_ == "VERB"],
+        "sentiment": doc.sentiment
+    }
+
+def nlp_config() -> Dict[str, Any]:
+    """The ``nlp`` section of config/ai_core.yaml"""
+    from ai_core.config_manager import ConfigManager
+    return ConfigManager().get("nlp") or {}
+
+def register_pipeline(config: Optional[Dict[str, Any]] = None) -> str:
+    """Registry key of the configured spaCy pipeline; registering it
+    imports nothing, the model loads on first use"""
+    config = nlp_config() if config is None else config
+    return models.register_spacy(config.get("model", "en_core_web_sm"), UNUSED_COMPONENTS)
 
 class ContextBuilder:
-    def __init__(self):
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """``config`` is the ``nlp`` section of config/ai_core.yaml.
+
+        The spaCy model loads on the first analysis, or on warm_up().
+        """
         self.log = logging.getLogger(__name__)
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-            self.log.info("Loaded NLP model for context building")
-        except:
-            self.nlp = None
-            self.log.warning("SpaCy model not available, using simple mode")
-
-    def build(self, query: str, memory, user_context: Dict) -> Dict[str, Any]:
-        """Enhanced context building with NLP"""
+        self.config = nlp_config() if config is None else config
+        self.model_key = register_pipeline(self.config)
+        self.nlp = None
+        self.analyzer: Optional[BatchAnalyzer] = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        # Repeated queries skip the NLP pass
+        self.cache = AnalysisCache.from_config(self.config.get("cache"))
+
+    def warm_up(self):
+        """Load the NLP model and start the batched analyzer now rather
+        than on the first query"""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                self.nlp = models.get(self.model_key)
+                self.log.info("Loaded NLP model for context building")
+            except Exception:
+                self.nlp = None
+                self.log.warning("SpaCy model not available, using simple mode")
+            # Concurrent queries share nlp.pipe batches
+            self.analyzer = BatchAnalyzer.from_config(
+                self.nlp, linguistic_features, self.config.get("model", "en_core_web_sm"),
+                UNUSED_COMPONENTS, self.config.get("batching")
+            ) if self.nlp else None
+            self._loaded = True
+
+    def build(self, query: str, memory, user_context: Dict,
+              query_analysis: Optional[QueryAnalysis] = None) -> Dict[str, Any]:
+        """Enhanced context building with NLP; ``query_analysis`` is the
+        engine's QueryAnalysis of ``query``, built here when not given"""
+        query_analysis = query_analysis or QueryAnalysis.of(query)
+        analysis = self._analysis(query_analysis)
+        base = {
+            "query": query,
+            "user": user_context,
+            "memory": self._get_memory_context(query_analysis, memory, user_context),
+            "linguistic": self._linguistic(analysis)
+        }
+        return self._add_derived_context(base, analysis["intent"])
+
+    async def build_async(self, query: str, memory, user_context: Dict,
+                          query_analysis: Optional[QueryAnalysis] = None) -> Dict[str, Any]:
+        """build() for the event loop: the memory lookup and the NLP pass
+        block, so they run off the loop. A batched analysis waits for its
+        batch without holding a worker thread."""
+        query_analysis = query_analysis or QueryAnalysis.of(query)
+        cached = self._cached(query_analysis)
+        if not self._loaded and cached is None:
+            await asyncio.to_thread(self.warm_up)
+        if self.analyzer is None and cached is None:
+            return await asyncio.to_thread(self.build, query, memory, user_context, query_analysis)
+        pending = None if cached is not None else asyncio.wrap_future(self.analyzer.submit(query))
+        memory_context = await asyncio.to_thread(self._get_memory_context, query_analysis,
+                                                 memory, user_context)
+        analysis = cached if cached is not None else self._remember(query_analysis, await pending)
         base = {
             "query": query,
             "user": user_context,
-            "memory": self._get_memory_context(query, memory),
-            "linguistic": self._analyze_text(query)
+            "memory": memory_context,
+            "linguistic": self._linguistic(analysis)
+        }
+        return self._add_derived_context(base, analysis["intent"])
+
+    def close(self):
+        """Stop the batched analyzer and its worker processes, then
+        persist the analysis cache"""
+        if self.analyzer is not None:
+            self.analyzer.close()
+        if self.cache is not None:
+            self.cache.save()
+
+    def _analysis(self, query: QueryAnalysis) -> Dict[str, Any]:
+        """Entities, verbs, sentiment and intent of a query, memoized"""
+        cached = self._cached(query)
+        if cached is not None:
+            return cached
+        return self._remember(query, self._analyze_text(query.text))
+
+    def _cached(self, query: QueryAnalysis) -> Optional[Dict[str, Any]]:
+        return self.cache.get(query.text, query.key) if self.cache is not None else None
+
+    def _remember(self, query: QueryAnalysis, linguistic: Dict[str, Any]) -> Dict[str, Any]:
+        analysis = dict(linguistic, intent=query.intent)
+        if self.cache is not None:
+            self.cache.put(query.text, analysis, query.key)
+        return analysis
+
+    def _linguistic(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in analysis.items() if key != "intent"}
+
+    def _get_memory_context(self, query: QueryAnalysis, memory, user_context: Dict) -> Dict[str, Any]:
+        """Related past interactions, from this user's memory only"""
+        related = memory.get_context(query.text, user_context=user_context, tokens=query.tokens)
+        return {
+            "related_queries": [entry["query"] for entry in related]
         }
-        return self._add_derived_context(base)
 
     def _analyze_text(self, text: str) -> Dict[str, Any]:
         """Perform NLP analysis if available"""
+        self.warm_up()
         if not self.nlp:
             return {"entities": [], "verbs": []}
-        
-        doc = self.nlp(text)
-        return {
-            "entities": [(ent.text, ent.label_) for ent in doc.ents],
-            "verbs": [token.lemma_ for token in doc if token.pos_ == "VERB"],
-            "sentiment": doc.sentiment
-        }
+        if self.analyzer is not None:
+            return self.analyzer.analyze(text)
+        return linguistic_features(self.nlp(text))
 
-    def _add_derived_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
+    def _add_derived_context(self, context: Dict[str, Any], intent: str) -> Dict[str, Any]:
         """Infer higher-level context"""
         context["inferred"] = {
-            "likely_intent": self._detect_intent(context["query"]),
+            "likely_intent": intent,
             "knowledge_gaps": self._find_gaps(context)
         }
         return context
 
-    def _detect_intent(self, query: str) -> str:
-        """Improved intent detection"""
-        query = query.lower()
-        if any(q in query for q in ["how to", "tutorial"]):
-            return "instruction"
-        elif any(q in query for q in ["why", "cause of"]):
-            return "explanation"
-        elif any(q in query for q in ["compare", "vs"]):
-            return "comparison"
-        return "information"
-
     def _find_gaps(self, context: Dict[str, Any]) -> List[str]:
         """Identify missing context"""
         gaps = []
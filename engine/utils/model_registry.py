@@ -0,0 +1,103 @@
+import gc
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+class ModelRegistry:
+    """Heavy models, loaded once per process on first use.
+
+    A model is registered under a key with a zero-argument loader. The
+    loader runs on the first ``get`` and only then imports the library
+    it needs, so importing the code that registers a model stays cheap.
+    A loader that fails is not retried: every later ``get`` raises the
+    same error, so a missing model costs one attempt, not one per query.
+
+    ``warm_up`` loads models ahead of traffic. ``preload_for_fork`` does
+    the same in a server's master process before it forks its workers.
+    The workers then share the model's memory pages copy-on-write
+    instead of each loading its own copy (see gunicorn.conf.py).
+    """
+
+    def __init__(self):
+        self.log = logging.getLogger(__name__)
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._load_times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def register(self, key: str, loader: Callable[[], Any]) -> str:
+        """Register a loader unless ``key`` already has one; returns ``key``"""
+        with self._lock:
+            self._loaders.setdefault(key, loader)
+        return key
+
+    def register_spacy(self, model: str, exclude: Sequence[str] = ()) -> str:
+        """Register a spaCy pipeline loaded without the ``exclude``d components"""
+        exclude = tuple(exclude)
+
+        def load():
+            import spacy
+            return spacy.load(model, exclude=list(exclude))
+
+        return self.register(f"spacy:{model}" + (f"-{'-'.join(exclude)}" if exclude else ""), load)
+
+    def get(self, key: str) -> Any:
+        """The model, loading it on first use"""
+        model = self._models.get(key)
+        if model is not None:
+            return model
+        with self._lock:
+            if key in self._models:
+                return self._models[key]
+            if key in self._errors:
+                raise self._errors[key]
+            start = time.perf_counter()
+            try:
+                model = self._models[key] = self._loaders[key]()
+            except Exception as e:
+                self._errors[key] = e
+                raise
+            self._load_times[key] = time.perf_counter() - start
+            self.log.info(f"Loaded {key} in {self._load_times[key]:.2f} s")
+            return model
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._models
+
+    def warm_up(self, keys: Optional[Iterable[str]] = None) -> List[str]:
+        """Load the given (default: all registered) models now; the keys
+        that failed to load are logged and returned"""
+        failed = []
+        for key in list(keys if keys is not None else self._loaders):
+            try:
+                self.get(key)
+            except Exception as e:
+                self.log.warning(f"Warm-up of {key} failed: {e}")
+                failed.append(key)
+        return failed
+
+    def preload_for_fork(self, keys: Optional[Iterable[str]] = None) -> List[str]:
+        """warm_up() in a master process that is about to fork workers.
+
+        The loaded objects are moved out of the garbage collector's view
+        (``gc.freeze``), so collections in the workers do not write to
+        their pages and force private copies.
+        """
+        failed = self.warm_up(keys)
+        gc.collect()
+        gc.freeze()
+        return failed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "registered": sorted(self._loaders),
+            "loaded": {key: round(seconds, 3) for key, seconds in self._load_times.items()},
+            "failed": sorted(self._errors)
+        }
+
+
+# Shared by every engine in the process, so forked workers find the
+# master's preloaded models
+models = ModelRegistry()
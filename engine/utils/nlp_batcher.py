@@ -0,0 +1,160 @@
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+Features = Callable[[Any], Dict[str, Any]]
+
+class BatchAnalyzer:
+    """Micro-batching front for a spaCy pipeline.
+
+    ``submit`` queues a text and returns a future for its features. A
+    batcher thread takes whatever arrived within ``max_wait_ms`` of the
+    first text, up to ``max_batch`` texts, and runs them through one
+    ``nlp.pipe`` call. That pays the per-call overhead once per batch and
+    lets the model work on a whole batch of documents at once.
+
+    With ``processes`` = 0 the batches run in the batcher thread. Otherwise
+    each of that many worker processes loads ``model`` once, without the
+    ``exclude``d components, and batches are spread across them. While
+    all workers are busy, new texts keep queueing into the next batch.
+    ``features`` turns a Doc into the result. In worker processes it must
+    be a module-level function, since it is sent to them by reference.
+    """
+
+    def __init__(self, nlp, features: Features, max_batch: int = 64, max_wait_ms: float = 2,
+                 processes: int = 0, model: Optional[str] = None, exclude: Sequence[str] = ()):
+        self.log = logging.getLogger(__name__)
+        self.nlp = nlp
+        self.features = features
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.processes = processes
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if processes:
+            if model is None:
+                raise ValueError("worker processes need the model name to load")
+            # spawn, not fork: the server process already runs threads
+            self._pool = ProcessPoolExecutor(
+                processes, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_load_worker, initargs=(model, tuple(exclude), features)
+            )
+        # One batch per worker at a time; the rest wait in the queue
+        self._slots = threading.Semaphore(max(1, processes))
+        self._queue: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        self.batches = 0
+        self.docs = 0
+        self._thread = threading.Thread(target=self._run, name="nlp-batcher", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_config(cls, nlp, features: Features, model: str, exclude: Sequence[str],
+                    config: Optional[Dict[str, Any]]) -> Optional["BatchAnalyzer"]:
+        """Build from the ``nlp.batching`` section of config/ai_core.yaml; None when disabled"""
+        config = dict(config or {})
+        if not config.pop("enabled", True):
+            return None
+        return cls(nlp, features, model=model, exclude=exclude, **config)
+
+    def submit(self, text: str) -> Future:
+        """Future for the features of ``text``"""
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        """Features of ``text``, blocking until its batch is done"""
+        return self.submit(text).result()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "docs": self.docs,
+            "mean_batch": round(self.docs / self.batches, 2) if self.batches else 0,
+            "queued": self._queue.qsize(),
+            "processes": self.processes
+        }
+
+    def close(self):
+        """Finish the queued texts, then stop the batcher and the workers"""
+        self._queue.put(None)
+        self._thread.join()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[Tuple[str, Future]]):
+        texts = [text for text, _ in batch]
+        futures = [future for _, future in batch]
+        self.batches += 1
+        self.docs += len(batch)
+        if self._pool is None:
+            try:
+                _resolve(futures, [self.features(doc) for doc in
+                                   self.nlp.pipe(texts, batch_size=len(texts))])
+            except Exception as e:
+                self.log.error(f"NLP batch failed: {e}")
+                _fail(futures, e)
+            return
+        self._slots.acquire()
+        try:
+            job = self._pool.submit(_analyze_batch, texts)
+        except Exception as e:
+            self._slots.release()
+            _fail(futures, e)
+            return
+        job.add_done_callback(lambda done: self._finish(done, futures))
+
+    def _finish(self, job: Future, futures: List[Future]):
+        self._slots.release()
+        try:
+            _resolve(futures, job.result())
+        except Exception as e:
+            self.log.error(f"NLP batch failed: {e}")
+            _fail(futures, e)
+
+
+def _resolve(futures: List[Future], results: List[Dict[str, Any]]):
+    for future, result in zip(futures, results):
+        if not future.done():  # a caller that went away may have cancelled it
+            future.set_result(result)
+
+def _fail(futures: List[Future], error: Exception):
+    for future in futures:
+        if not future.done():
+            future.set_exception(error)
+
+
+# Worker process state, set once by the pool initializer
+_worker_nlp = None
+_worker_features: Optional[Features] = None
+
+def _load_worker(model: str, exclude: Tuple[str, ...], features: Features):
+    global _worker_nlp, _worker_features
+    from .model_registry import models
+    _worker_nlp = models.get(models.register_spacy(model, exclude))
+    _worker_features = features
+
+def _analyze_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    return [_worker_features(doc) for doc in _worker_nlp.pipe(texts, batch_size=len(texts))]
@@ -1,8 +1,10 @@
+import functools
+import inspect
 import time
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, Any
 import logging
-import pandas as pd
 
 class PerformanceMonitor:
     def __init__(self):
@@ -10,32 +12,67 @@ class PerformanceMonitor:
         self.metrics = {
             "response_times": [],
             "error_rates": [],
-            "mode_usage": {}
+            "mode_usage": {},
+            # stage name -> [calls, total seconds, slowest seconds]
+            "stages": {}
         }
         self.log.info("Performance Monitor initialized")
 
     def track(self, func):
-        """Decorator to track function performance"""
+        """Decorator to track function performance (plain or async functions)"""
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.time()
+                result = await func(*args, **kwargs)
+                self._record(func, time.time() - start, result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             start = time.time()
             result = func(*args, **kwargs)
-            duration = time.time() - start
-            
-            self.metrics["response_times"].append({
+            self._record(func, time.time() - start, result)
+            return result
+        return wrapper
+
+    def _record(self, func, duration: float, result):
+        self.metrics["response_times"].append({
+            "timestamp": datetime.now(),
+            "function": func.__name__,
+            "duration": duration
+        })
+        
+        if "error" in result:
+            self.metrics["error_rates"].append({
                 "timestamp": datetime.now(),
                 "function": func.__name__,
-                "duration": duration
+                "error": result["error"]
             })
-            
-            if "error" in result:
-                self.metrics["error_rates"].append({
-                    "timestamp": datetime.now(),
-                    "function": func.__name__,
-                    "error": result["error"]
-                })
-            
-            return result
-        return wrapper
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time one pipeline stage of a query; see get_report()["stages"]"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - start)
+
+    def record_stage(self, name: str, duration: float):
+        totals = self.metrics["stages"].setdefault(name, [0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += duration
+        totals[2] = max(totals[2], duration)
+
+    def stage_report(self) -> Dict[str, Dict[str, float]]:
+        """Calls, mean and slowest time of each stage, in milliseconds"""
+        return {
+            name: {"calls": calls, "avg_ms": round(total / calls * 1000, 3),
+                   "max_ms": round(slowest * 1000, 3)}
+            for name, (calls, total, slowest) in self.metrics["stages"].items()
+        }
 
     def record_mode_usage(self, mode: str):
         """Track personality mode usage"""
@@ -43,9 +80,11 @@ class PerformanceMonitor:
 
     def get_report(self) -> Dict[str, Any]:
         """Generate performance report"""
+        import pandas as pd  # only reports need it; keeps importing the engine cheap
         df_times = pd.DataFrame(self.metrics["response_times"])
         return {
             "avg_response_time": df_times["duration"].mean() if not df_times.empty else 0,
             "error_rate": len(self.metrics["error_rates"]) / max(1, len(self.metrics["response_times"])),
-            "mode_distribution": self.metrics["mode_usage"]
+            "mode_distribution": self.metrics["mode_usage"],
+            "stages": self.stage_report()
         }
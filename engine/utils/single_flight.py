@@ -0,0 +1,43 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one computation.
+
+    The first call for a key starts the work. Calls with the same key
+    that arrive while it is running await that result instead of
+    starting their own. Every caller waits on the shared task through
+    ``asyncio.shield``, so one caller going away does not cancel the
+    others. Results are not kept after the work finishes; that is a
+    cache's job. Meant for use from a single event loop.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]],
+                 *args, **kwargs) -> Tuple[Any, bool]:
+        """Result of ``fn(*args, **kwargs)``, and whether it came from another call"""
+        self.calls += 1
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task), shared
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "inflight": self.inflight}
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
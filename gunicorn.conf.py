@@ -0,0 +1,30 @@
+"""gunicorn -c gunicorn.conf.py api.main:app
+
+Serves the API from forked uvicorn workers. The spaCy pipeline is
+loaded once in the master before the workers fork, so the workers share
+its memory pages copy-on-write instead of each loading a copy
+(``uvicorn --workers`` spawns fresh interpreters and cannot do this).
+The app itself is still imported in each worker, since preload_app
+stays off: it starts threads, such as the memory write-behind and the
+NLP batcher, that do not survive a fork.
+
+Every worker would open the memory store under the same root, and the
+log store has one writer per file: it takes an exclusive lock on each
+store it opens, so a second worker would fail on its first request for
+a shard the first has open. WEB_CONCURRENCY above 1 is refused here
+instead.
+"""
+import os
+
+bind = os.getenv("SLICK_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+if workers > 1:
+    raise RuntimeError(f"WEB_CONCURRENCY={workers}: the memory log store has a single "
+                       f"writer, so only one worker can serve it")
+worker_class = "uvicorn.workers.UvicornWorker"
+
+def on_starting(server):
+    from engine.utils.context_builder import register_pipeline
+    from engine.utils.model_registry import models
+    register_pipeline()
+    models.preload_for_fork()
@@ -20,7 +20,7 @@ class SlickCLI(cmd.Cmd):
     def _init_system(self):
         """Initialize all components"""
         self.logger = self._setup_logging()
-        self.memory = MemoryBank()
+        self.memory = MemoryBank.from_config()
         self.orchestrator = APIOrchestrator()
         self.engine = SlickLogicEngine(self.memory)
         self.logger.info("System initialized")
@@ -63,6 +63,7 @@ class SlickCLI(cmd.Cmd):
 
     def do_exit(self, arg):
         """Exit the system"""
+        self.memory.close()
         self.logger.info("Shutdown initiated")
         print("System shutting down...")
         return True
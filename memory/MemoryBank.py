@@ -1,14 +1,85 @@
-import pickle
+import heapq
+import inspect
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
+from .log_store import LogStore
+from .index import InvertedIndex, tokenize
+from .snapshot import EntryList
+from .eviction import EvictionPolicy
+from .write_behind import WriteBehindLog
+from .locks import RWLock, StripedLock
 
 class MemoryBank:
-    def __init__(self, storage_path: str = "data/memory.db"):
+    """Interaction memory safe to share between threads.
+
+    Lookups run concurrently under the read side of an RWLock; store(),
+    eviction and snapshot swaps take the write side. access_count bumps
+    are made atomic with striped per-entry locks. Disk writes are
+    serialized: one writer thread appends to the log and at most one
+    compaction runs at a time.
+    """
+    RANKINGS = ["overlap", "bm25"]
+
+    def __init__(self, storage_path: str = "data/memory.db",
+                 segment_records: int = 1000, compact_segments: int = 4,
+                 cache_size: int = 1024, eviction: Optional[EvictionPolicy] = None,
+                 write_behind: bool = True, flush_every: int = 64,
+                 flush_interval_ms: float = 50):
         self.storage_path = Path(storage_path)
         self.storage_path.parent.mkdir(exist_ok=True)
-        self.entries: List[Dict] = []
+        self.cache_size = cache_size
+        self.entries = EntryList(cache_size=cache_size)
+        self._index = None  # InvertedIndex, built on first lookup
+        self._ranker = None  # BM25Ranker, built on first ranked lookup
+        self.compact_segments = compact_segments
+        self._lock = RWLock()
+        self._count_locks = StripedLock()
+        self._build_lock = threading.Lock()
+        self._compaction_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        self._closed = False  # set under _compaction_lock; no compaction after it
+        self._log = None
+        self._writer = None
+        if self.storage_path != Path(":memory:"):
+            self._log = LogStore(self.storage_path, segment_records)
+        self.eviction = eviction
+        self._archive = None
+        self._archiver = None
+        if eviction is not None and eviction.archive_path:
+            self._archive = LogStore(Path(eviction.archive_path), segment_records=100000)
+            self._archive.resume()
+            # Evicted entries are archived off the store path as well, with
+            # the same crash window as the log
+            self._archiver = self._archive
+            if write_behind:
+                self._archiver = WriteBehindLog(self._archive, flush_every, flush_interval_ms)
         self._load()
+        if self._log is not None:
+            # Stores are committed in groups off the request path; see
+            # WriteBehindLog for the crash window
+            self._writer = self._log
+            if write_behind:
+                self._writer = WriteBehindLog(
+                    self._log, flush_every, flush_interval_ms, on_sealed=self._maybe_compact
+                )
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> "MemoryBank":
+        """Build from the ``memory`` section of config/ai_core.yaml
+
+        Keys meant for other memory classes (``shards`` for
+        ShardedMemoryBank) are ignored.
+        """
+        if config is None:
+            from ai_core.config_manager import ConfigManager
+            config = ConfigManager().get("memory", {})
+        eviction = EvictionPolicy.from_config(config.get("eviction"))
+        accepted = inspect.signature(cls.__init__).parameters
+        options = {k: v for k, v in config.items() if k in accepted and k != "eviction"}
+        return cls(eviction=eviction, **options)
 
     def store(self, query: str, result: Dict) -> str:
         """Store interaction with timestamp"""
@@ -18,48 +89,202 @@ class MemoryBank:
             "result": result,
             "access_count": 0
         }
-        self.entries.append(entry)
-        self._save()
+        with self._lock.write():
+            self.entries.append(entry)
+            if self._index is not None:
+                self._index.add(query)
+            if self._ranker is not None:
+                self._ranker.add(query)
+            sealed = self._append(entry)
+            if self.eviction is not None:
+                sealed = self._evict() or sealed
+        if sealed:
+            self._maybe_compact()
         return entry["timestamp"]
 
-    def get_context(self, query: str, limit: int = 3) -> List[Dict]:
-        """Retrieve relevant context for query"""
-        relevant = sorted(
-            [e for e in self.entries if self._is_relevant(e, query)],
-            key=lambda x: x["access_count"],
-            reverse=True
-        )[:limit]
-        
-        # Update access counts
-        for entry in relevant:
-            entry["access_count"] += 1
-            
-        return relevant
-
-    def _is_relevant(self, entry: Dict, query: str) -> bool:
+    def get_context(self, query: str, limit: int = 3, ranking: str = "overlap",
+                    tokens: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Retrieve relevant context for query
+
+        ranking="overlap" returns the most accessed entries sharing a word
+        with the query; ranking="bm25" orders by BM25 relevance instead.
+        ``tokens`` are the query's ``lower().split()`` words, when the
+        caller has them already.
+        """
+        tokens = tuple(tokens) if tokens is not None else tuple(query.lower().split())
+        if ranking not in self.RANKINGS:
+            raise ValueError(f"Invalid ranking. Choose from: {self.RANKINGS}")
+        with self._lock.read():
+            if ranking == "bm25":
+                ids = [i for i, _ in self._bm25().top(query, limit, tokens)]
+            else:
+                ids = self._top_accessed(tokens, limit)
+
+            # Update access counts; only the selected entries get decoded
+            for i in ids:
+                with self._count_locks(i):
+                    self.entries.touch(i)
+
+            # Detached copies: callers may keep or serialize them freely
+            return [dict(self.entries[i]) for i in ids]
+
+    def flush(self):
+        """Block until every stored interaction (and archived eviction) is on disk"""
+        if self._writer is not None:
+            self._writer.flush()
+        if self._archiver is not None:
+            self._archiver.flush()
+
+    def compact(self, wait: bool = True):
+        """Merge sealed segments into the snapshot (persists access counts)
+
+        With wait=True the snapshot is written in the calling thread, after
+        any background compaction, so it reflects every access so far.
+        """
+        if self._log is None or self._closed:
+            return
+        if wait:
+            self._save()
+        else:
+            self._start_compaction()
+
+    def close(self):
+        """Flush pending writes, persist access counts and release files"""
+        self.flush()
+        # A background compaction must not run on the files released below
+        with self._compaction_lock:
+            self._closed = True
+            compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        self._save()
+        if self._writer is not None:
+            self._writer.close()
+        if self._log is not None:
+            self._log.close()
+        if self._archiver is not None:
+            self._archiver.close()
+        if self._archive is not None:
+            self._archive.close()
+        if self.entries.snapshot is not None:
+            self.entries.snapshot.close()
+
+    def _top_accessed(self, tokens: Iterable[str], limit: int) -> List[int]:
+        """Ids of the most accessed entries sharing a word with the query"""
+        # Only entries on the query terms' posting lists are considered;
+        # ties on access_count keep insertion order like a stable sort
+        candidates = self._inverted_index().candidates(set(tokens))
+        access_count = self.entries.access_count
+        return heapq.nlargest(
+            limit, candidates,
+            key=lambda i: (access_count(i), -i)
+        )
+
+    def _inverted_index(self) -> InvertedIndex:
+        """Token index, built from stored queries on first lookup (read lock held)"""
+        if self._index is None:
+            with self._build_lock:
+                if self._index is None:
+                    index = InvertedIndex()
+                    index.rebuild(self.entries.query(i) for i in range(len(self.entries)))
+                    self._index = index
+        return self._index
+
+    def _bm25(self):
+        """BM25 ranker, built from history on first ranked lookup (read lock held)"""
+        if self._ranker is None:
+            from .ranking import BM25Ranker
+            with self._build_lock:
+                if self._ranker is None:
+                    ranker = BM25Ranker.from_texts(
+                        self.entries.query(i) for i in range(len(self.entries))
+                    )
+                    for i in range(len(self.entries)):
+                        if self.entries.is_deleted(i):
+                            ranker.remove(i, "")
+                    self._ranker = ranker
+        return self._ranker
+
+    def _is_relevant(self, entry: Dict, query: str,
+                     tokens: Optional[Iterable[str]] = None) -> bool:
         """Basic relevance detection"""
-        q_words = set(query.lower().split())
-        e_words = set(entry["query"].lower().split())
-        return len(q_words & e_words) > 0
+        tokens = tokenize(query) if tokens is None else tokens
+        return not tokenize(entry["query"]).isdisjoint(tokens)
 
     def _load(self):
-        """Load memory from disk"""
+        """Map the snapshot and replay newer segments; nothing is decoded yet"""
+        if self._log is None:
+            return
         try:
-            if self.storage_path.exists():
-                with open(self.storage_path, "rb") as f:
-                    self.entries = pickle.load(f)
+            snapshot, records, _ = self._log.load()
+            evicted = [i for r in records if "evict" in r for i in r["evict"]]
+            entries = [r for r in records if "evict" not in r]
+            self.entries = EntryList(snapshot, entries, self.cache_size)
+            for i in evicted:
+                self.entries.delete(i)
         except Exception as e:
             print(f"Memory load error: {e}")
 
-    def _save(self):
-        """Atomic memory save"""
-        if self.storage_path == Path(":memory:"):
-            return
-            
-        temp_path = self.storage_path.with_suffix(".tmp")
+    def _append(self, entry: Dict) -> bool:
+        """Append one framed record to the active segment: O(1) per store"""
+        if self._writer is None:
+            return False
         try:
-            with open(temp_path, "wb") as f:
-                pickle.dump(self.entries, f)
-            temp_path.replace(self.storage_path)
+            return self._writer.append(entry)
         except Exception as e:
-            print(f"Memory save error: {e}")
+            print(f"Memory append error: {e}")
+            return False
+
+    def _evict(self) -> bool:
+        """Apply the eviction policy; evicted ids are logged as one record"""
+        victims = self.eviction.select(self.entries)
+        if not victims:
+            return False
+        for i in victims:
+            entry = self.entries[i]
+            if self._archiver is not None:
+                try:
+                    self._archiver.append(dict(entry))
+                except Exception as e:
+                    print(f"Memory archive error: {e}")
+            if self._index is not None:
+                self._index.remove(i)
+            if self._ranker is not None:
+                self._ranker.remove(i, entry["query"])
+            self.entries.delete(i)
+        return self._append({"evict": victims})
+
+    def _maybe_compact(self):
+        if len(self._log.segments()) >= self.compact_segments:
+            self._start_compaction()
+
+    def _start_compaction(self):
+        # Not self._lock: the writer thread calls this and flush() is
+        # waited on while self._lock is held
+        with self._compaction_lock:
+            if self._closed or (self._compactor is not None and self._compactor.is_alive()):
+                return
+            self._compactor = threading.Thread(
+                target=self._save, name="memory-compaction", daemon=True
+            )
+            self._compactor.start()
+
+    def _save(self):
+        """Atomic memory save: merge segments into a fresh snapshot"""
+        if self._log is None:
+            return
+        # One save at a time; a later save sees every access made before it
+        with self._save_lock:
+            with self._lock.write():
+                # Entries appended after this point land in the next segment
+                self._writer.flush()
+                sealed = self._writer.rotate()
+                count = len(self.entries)
+            try:
+                self._log.write_snapshot(self.entries.records(count), sealed)
+                self._log.drop_segments(sealed)
+                snapshot = self._log.open_snapshot()
+                with self._lock.write():
+                    self.entries.rebase(snapshot)
+            except Exception as e:
+                print(f"Memory save error: {e}")
@@ -1,2 +1,4 @@
 from .MemoryBank import MemoryBank
-__all__ = ['MemoryBank']
+from .sharded import ShardedMemoryBank
+from .sqlite_bank import SQLiteMemoryBank
+__all__ = ['MemoryBank', 'ShardedMemoryBank', 'SQLiteMemoryBank']
@@ -0,0 +1,183 @@
+import pickle
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+KEYS = ("timestamp", "query", "result", "access_count")
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_DELETED = object()
+
+
+def to_epoch_us(timestamp: str) -> Tuple[int, bool]:
+    """ISO timestamp -> (int64 microseconds, exact).
+
+    exact is False when formatting the value back would not reproduce the
+    string (timezone offsets, non-canonical forms); callers keep the
+    original text for those.
+    """
+    try:
+        dt = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return 0, False
+    if dt.tzinfo is not None:
+        return (dt.astimezone().replace(tzinfo=None) - _EPOCH) // _MICROSECOND, False
+    return (dt - _EPOCH) // _MICROSECOND, dt.isoformat() == timestamp
+
+
+def from_epoch_us(us: int) -> str:
+    return (_EPOCH + timedelta(microseconds=int(us))).isoformat()
+
+
+class _Column:
+    """Append-only NumPy column with amortized O(1) growth"""
+
+    def __init__(self, dtype, capacity: int = 64):
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.size = 0
+
+    def append(self, value):
+        if self.size == len(self.data):
+            grown = np.zeros(2 * len(self.data), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+    def drop(self, count: int):
+        """Discard the first ``count`` values"""
+        rest = self.data[count:self.size]
+        self.data = np.zeros(max(64, 2 * len(rest)), dtype=self.data.dtype)
+        self.data[:len(rest)] = rest
+        self.size = len(rest)
+
+
+class EntryColumns:
+    """Column-oriented storage for in-memory entries.
+
+    Per entry this keeps an int64 epoch-microsecond timestamp, an int32
+    access count and an offset into a shared UTF-8 arena of query text;
+    only ``result`` stays a Python object. Rows are addressed by position
+    and are never reordered except by drop(), which removes a prefix.
+    """
+
+    def __init__(self, entries: Iterable[Optional[Dict[str, Any]]] = ()):
+        self.timestamps = _Column(np.int64)
+        self.access_counts = _Column(np.int32)
+        self._offsets = _Column(np.int64)
+        self._offsets.append(0)
+        self._arena = bytearray()
+        self._results = []
+        self._raw_timestamps: Dict[int, str] = {}  # rows whose text is not canonical
+        for entry in entries:
+            self.append(entry)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def append(self, entry: Optional[Dict[str, Any]]):
+        """Add a row; None appends an already deleted row"""
+        if entry is None:
+            self.timestamps.append(0)
+            self.access_counts.append(0)
+            self._offsets.append(len(self._arena))
+            self._results.append(_DELETED)
+            return
+        us, exact = to_epoch_us(entry["timestamp"])
+        if not exact:
+            self._raw_timestamps[len(self._results)] = entry["timestamp"]
+        self.timestamps.append(us)
+        self.access_counts.append(entry["access_count"])
+        self._arena += entry["query"].encode("utf-8")
+        self._offsets.append(len(self._arena))
+        self._results.append(entry["result"])
+
+    def is_deleted(self, row: int) -> bool:
+        return self._results[row] is _DELETED
+
+    def query_bytes(self, row: int) -> bytes:
+        offsets = self._offsets.data
+        return bytes(self._arena[offsets[row]:offsets[row + 1]])
+
+    def query(self, row: int) -> str:
+        return "" if self.is_deleted(row) else self.query_bytes(row).decode("utf-8")
+
+    def timestamp(self, row: int) -> str:
+        raw = self._raw_timestamps.get(row)
+        return raw if raw is not None else from_epoch_us(self.timestamps.data[row])
+
+    def field(self, row: int, key: str) -> Any:
+        if self.is_deleted(row):
+            raise KeyError(key)
+        if key == "query":
+            return self.query(row)
+        if key == "result":
+            return self._results[row]
+        if key == "access_count":
+            return int(self.access_counts.data[row])
+        if key == "timestamp":
+            return self.timestamp(row)
+        raise KeyError(key)
+
+    def payload(self, row: int) -> bytes:
+        """Pickled (timestamp, result), as stored in snapshots"""
+        return pickle.dumps((self.timestamp(row), self._results[row]),
+                            protocol=pickle.HIGHEST_PROTOCOL)
+
+    def delete(self, row: int):
+        """Release the result; the query bytes stay in the arena until drop()"""
+        self._results[row] = _DELETED
+        self.access_counts.data[row] = 0
+        self._raw_timestamps.pop(row, None)
+
+    def drop(self, count: int):
+        """Remove the first ``count`` rows (they moved into a snapshot)"""
+        if count <= 0:
+            return
+        start = int(self._offsets.data[count])
+        self._arena = self._arena[start:]
+        self._offsets.drop(count)
+        self._offsets.data[:self._offsets.size] -= start
+        self.timestamps.drop(count)
+        self.access_counts.drop(count)
+        del self._results[:count]
+        self._raw_timestamps = {row - count: text for row, text in self._raw_timestamps.items()
+                                if row >= count}
+
+
+class EntryView(Mapping):
+    """Read-through dict view of one MemoryBank entry.
+
+    Values are fetched from the backing EntryList on access, so the view
+    always reflects the current access count. Only ``access_count`` can
+    be assigned. Use dict(view) for a detached copy.
+    """
+
+    __slots__ = ("_entries", "_id")
+
+    def __init__(self, entries, entry_id: int):
+        self._entries = entries
+        self._id = entry_id
+
+    def __getitem__(self, key: str) -> Any:
+        return self._entries.field(self._id, key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key != "access_count":
+            raise TypeError("memory entries are read-only except for access_count")
+        self._entries.set_access_count(self._id, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(KEYS)
+
+    def __len__(self) -> int:
+        return len(KEYS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
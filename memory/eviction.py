@@ -0,0 +1,157 @@
+import heapq
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+
+class OldestFirst:
+    """Victim order: lowest (oldest) live id first"""
+
+    def __init__(self):
+        self._cursor = 0
+
+    def add(self, entry_id: int, access_count: int = 0):
+        pass
+
+    def peek(self, entries) -> Optional[int]:
+        while self._cursor < len(entries):
+            if not entries.is_deleted(self._cursor):
+                return self._cursor
+            self._cursor += 1
+        return None
+
+    def pop(self, entries) -> Optional[int]:
+        entry_id = self.peek(entries)
+        if entry_id is not None:
+            self._cursor += 1
+        return entry_id
+
+
+class LeastAccessed:
+    """Victim order: lowest access_count first, oldest on ties.
+
+    Heap keys go stale when entries are touched; since access counts only
+    grow, a popped key that no longer matches is pushed back with the
+    current count and the next candidate is tried.
+    """
+
+    def __init__(self):
+        self._heap = []
+
+    def add(self, entry_id: int, access_count: int = 0):
+        heapq.heappush(self._heap, (access_count, entry_id))
+
+    def pop(self, entries) -> Optional[int]:
+        while self._heap:
+            count, entry_id = heapq.heappop(self._heap)
+            if entry_id >= len(entries) or entries.is_deleted(entry_id):
+                continue
+            current = entries.access_count(entry_id)
+            if current != count:
+                heapq.heappush(self._heap, (current, entry_id))
+                continue
+            return entry_id
+        return None
+
+
+ORDERS = {
+    "oldest": OldestFirst,
+    "least_accessed": LeastAccessed
+}
+
+
+class EvictionPolicy:
+    """Bounds a MemoryBank; consulted after every store.
+
+    Limits (any may be None/0 to disable):
+    - max_entries: live entry count
+    - max_bytes: stored bytes of live entries (query + serialized result)
+    - ttl_seconds: age, from the entry's ISO ``timestamp``
+    ``order`` picks victims once a size limit is exceeded (see ORDERS).
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None, order: str = "oldest",
+                 archive_path: Optional[str] = None):
+        if order not in ORDERS:
+            raise ValueError(f"Invalid eviction order. Choose from: {list(ORDERS)}")
+        self.max_entries = max_entries or None
+        self.max_bytes = max_bytes or None
+        self.ttl = timedelta(seconds=ttl_seconds) if ttl_seconds else None
+        self.order = order
+        self.archive_path = archive_path
+        self._victims = ORDERS[order]()
+        self._expiry = OldestFirst()
+        self._sizes: Optional[array] = None
+        self._live = 0
+        self._bytes = 0
+        self._tracked = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional["EvictionPolicy"]:
+        """Build from the ``memory.eviction`` section of config/ai_core.yaml"""
+        if not config:
+            return None
+        ttl_days = config.get("ttl_days")
+        return cls(
+            max_entries=config.get("max_entries"),
+            max_bytes=config.get("max_bytes"),
+            ttl_seconds=ttl_days * 86400 if ttl_days else config.get("ttl_seconds"),
+            order=config.get("order", "oldest"),
+            archive_path=config.get("archive_path")
+        )
+
+    def select(self, entries) -> List[int]:
+        """Ids to evict so the bank is back within its limits"""
+        self._track(entries)
+        victims = {}
+        if self.ttl is not None:
+            # Ids are assigned in store order, so expired entries form a prefix
+            cutoff = datetime.now() - self.ttl
+            while True:
+                entry_id = self._expiry.peek(entries)
+                if entry_id is None:
+                    break
+                if datetime.fromisoformat(entries[entry_id]["timestamp"]) >= cutoff:
+                    break
+                self._expiry.pop(entries)
+                self._forget(entry_id)
+                victims[entry_id] = None
+
+        while self._over_limit():
+            entry_id = self._victims.pop(entries)
+            if entry_id is None:
+                break
+            if entry_id in victims:
+                continue
+            self._forget(entry_id)
+            victims[entry_id] = None
+        return list(victims)
+
+    def _track(self, entries):
+        """Account for entries stored since the last call"""
+        if self.max_bytes and self._sizes is None:
+            self._sizes = array("Q")
+        for entry_id in range(self._tracked, len(entries)):
+            if entries.is_deleted(entry_id):
+                if self._sizes is not None:
+                    self._sizes.append(0)
+                continue
+            self._live += 1
+            self._victims.add(entry_id, entries.access_count(entry_id))
+            if self._sizes is not None:
+                size = entries.size(entry_id)
+                self._sizes.append(size)
+                self._bytes += size
+        self._tracked = len(entries)
+
+    def _forget(self, entry_id: int):
+        self._live -= 1
+        if self._sizes is not None:
+            self._bytes -= self._sizes[entry_id]
+            self._sizes[entry_id] = 0
+
+    def _over_limit(self) -> bool:
+        if self.max_entries is not None and self._live > self.max_entries:
+            return True
+        return self.max_bytes is not None and self._bytes > self.max_bytes
@@ -0,0 +1,55 @@
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """Normalized token set used for relevance matching"""
+    return frozenset(text.lower().split())
+
+
+class InvertedIndex:
+    """Token -> entry id postings, maintained incrementally.
+
+    Entry ids are positions in ``MemoryBank.entries``; the normalized
+    token set of every entry is cached so it is computed once per store.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Set[int]] = {}
+        self.tokens: List[FrozenSet[str]] = []
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def add(self, text: str) -> int:
+        """Index the next entry, returns its id"""
+        entry_id = len(self.tokens)
+        tokens = tokenize(text)
+        self.tokens.append(tokens)
+        for token in tokens:
+            self.postings.setdefault(token, set()).add(entry_id)
+        return entry_id
+
+    def remove(self, entry_id: int):
+        """Unindex an evicted entry (its id is not reused)"""
+        for token in self.tokens[entry_id]:
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.discard(entry_id)
+                if not posting:
+                    del self.postings[token]
+        self.tokens[entry_id] = frozenset()
+
+    def rebuild(self, texts: Iterable[str]):
+        self.postings = {}
+        self.tokens = []
+        for text in texts:
+            self.add(text)
+
+    def candidates(self, tokens: Iterable[str]) -> Set[int]:
+        """Ids of entries sharing at least one token"""
+        found: Set[int] = set()
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting:
+                found |= posting
+        return found
@@ -0,0 +1,55 @@
+import threading
+from contextlib import contextmanager
+
+
+class RWLock:
+    """Many concurrent readers or a single writer.
+
+    Writer-preferring: once a writer is waiting no new readers get in, so a
+    steady stream of lookups cannot starve store(). Not reentrant.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class StripedLock:
+    """Fixed pool of mutexes picked by key, for cheap per-entry atomicity"""
+
+    def __init__(self, stripes: int = 64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def __call__(self, key: int) -> threading.Lock:
+        return self._locks[key % len(self._locks)]
@@ -0,0 +1,223 @@
+import logging
+import os
+import pickle
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .snapshot import MappedSnapshot, Record, is_snapshot, write_snapshot
+
+try:
+    import fcntl
+    LOCKING_AVAILABLE = True
+except ImportError:
+    LOCKING_AVAILABLE = False  # Windows: no inter-process lock
+
+# Frame header: payload length, crc32 of payload
+_FRAME = struct.Struct(">II")
+
+# Store locks this process holds: lock path -> [pid, fd, stores using it]
+_held: Dict[str, list] = {}
+_held_lock = threading.Lock()
+
+
+class StoreLockedError(RuntimeError):
+    """Another process has the log store open"""
+
+
+def _acquire(path: Path):
+    """Exclusive flock on ``path``, shared by the stores of this process"""
+    key = str(path.resolve())
+    with _held_lock:
+        held = _held.get(key)
+        if held is not None and held[0] == os.getpid():
+            held[2] += 1
+            return
+        # An entry from before a fork belongs to the parent
+        fd = os.open(key, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise StoreLockedError(f"{path} is held by another process; the log store "
+                                   f"has one writer, so run a single worker") from None
+        _held[key] = [os.getpid(), fd, 1]
+
+
+def _release(path: Path):
+    key = str(path.resolve())
+    with _held_lock:
+        held = _held.get(key)
+        if held is None or held[0] != os.getpid():
+            return
+        held[2] -= 1
+        if held[2] == 0:
+            del _held[key]
+            os.close(held[1])
+
+
+class LogStore:
+    """Append-only segment log next to a compacted snapshot.
+
+    Every record is appended as one framed pickle to the active segment
+    (``memory.db.00000001.seg``, ...). The snapshot file holds everything
+    up to the last compacted segment and is only ever written through an
+    atomic replace, so a crash leaves either the old or the new snapshot.
+    Snapshots are memory-mapped on load rather than unpickled.
+
+    Segments have a single writer, so ``load()`` and ``resume()`` take an
+    exclusive lock on ``memory.db.lock`` until ``close()``, and raise
+    StoreLockedError if another process has the store open. Stores in
+    the same process share the lock.
+    """
+
+    def __init__(self, snapshot_path: Path, segment_records: int = 1000):
+        self.log = logging.getLogger(__name__)
+        self.snapshot_path = Path(snapshot_path)
+        self.segment_records = segment_records
+        self._active = None
+        self._active_seq = 0
+        self._active_count = 0
+        self._lock_path: Optional[Path] = None
+
+    def load(self) -> Tuple[Optional[MappedSnapshot], List[Dict[str, Any]], int]:
+        """Map the snapshot and replay newer segments.
+
+        Returns (snapshot or None, records not in the snapshot, snapshot segment).
+        """
+        self._lock()
+        snapshot, records, compacted = None, [], 0
+        if self.snapshot_path.exists():
+            if is_snapshot(self.snapshot_path):
+                snapshot = self.open_snapshot()
+                compacted = snapshot.segment
+            else:
+                records, compacted = self._read_pickle()
+        for seq, path in self.segments():
+            if seq <= compacted:
+                # Left over from a compaction that died before cleanup
+                self._unlink(path)
+                continue
+            records.extend(self._read_segment(path))
+        last = max([compacted] + [seq for seq, _ in self.segments()])
+        self._active_seq = last + 1
+        return snapshot, records, compacted
+
+    def resume(self):
+        """Append after the newest segment without replaying anything"""
+        self._lock()
+        segments = self.segments()
+        self._active_seq = segments[-1][0] + 1 if segments else 1
+
+    def append(self, record: Dict[str, Any]) -> bool:
+        """Append one record, returns True when a segment was sealed"""
+        return self.append_many([record])
+
+    def append_many(self, records: List[Dict[str, Any]]) -> bool:
+        """Append records with a single fsync, returns True when a segment was sealed"""
+        sealed = False
+        for record in records:
+            if self._active is None:
+                self._open_active()
+            payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+            self._active.write(_FRAME.pack(len(payload), zlib.crc32(payload)) + payload)
+            self._active_count += 1
+            if self._active_count >= self.segment_records:
+                self._sync()
+                self.rotate()
+                sealed = True
+        if self._active is not None:
+            self._sync()
+        return sealed
+
+    def flush(self):
+        """Appends are synchronous; nothing is buffered here"""
+
+    def rotate(self) -> int:
+        """Seal the active segment, returns the last sealed sequence number"""
+        sealed = self._active_seq if self._active is not None else self._active_seq - 1
+        if self._active is not None:
+            self._active.close()
+            self._active = None
+            self._active_seq += 1
+            self._active_count = 0
+        return sealed
+
+    def write_snapshot(self, records: Iterable[Record], segment: int):
+        """Atomically replace the snapshot with records covering <= segment"""
+        write_snapshot(self.snapshot_path, records, segment)
+
+    def open_snapshot(self) -> MappedSnapshot:
+        return MappedSnapshot(self.snapshot_path)
+
+    def drop_segments(self, upto: int):
+        """Remove segments already merged into the snapshot"""
+        for seq, path in self.segments():
+            if seq <= upto:
+                self._unlink(path)
+
+    def segments(self) -> List[Tuple[int, Path]]:
+        """Segment files sorted by sequence number"""
+        found = []
+        prefix = self.snapshot_path.name + "."
+        for path in self.snapshot_path.parent.glob(prefix + "*.seg"):
+            seq = path.name[len(prefix):-len(".seg")]
+            if seq.isdigit():
+                found.append((int(seq), path))
+        return sorted(found)
+
+    def close(self):
+        if self._active is not None:
+            self._active.close()
+            self._active = None
+        if self._lock_path is not None:
+            _release(self._lock_path)
+            self._lock_path = None
+
+    def _lock(self):
+        if LOCKING_AVAILABLE and self._lock_path is None:
+            lock_path = self.snapshot_path.with_name(self.snapshot_path.name + ".lock")
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            _acquire(lock_path)
+            self._lock_path = lock_path
+
+    def _segment_path(self, seq: int) -> Path:
+        return self.snapshot_path.with_name(f"{self.snapshot_path.name}.{seq:08d}.seg")
+
+    def _sync(self):
+        self._active.flush()
+        os.fsync(self._active.fileno())
+
+    def _open_active(self):
+        self._active = open(self._segment_path(self._active_seq), "ab")
+        self._active_count = 0
+
+    def _read_pickle(self) -> Tuple[List[Dict[str, Any]], int]:
+        """Pickled snapshots written before the mapped format"""
+        with open(self.snapshot_path, "rb") as f:
+            data = pickle.load(f)
+        if isinstance(data, list):
+            # Legacy format: the whole history pickled as a list
+            return data, 0
+        return data["entries"], data["segment"]
+
+    def _read_segment(self, path: Path) -> List[Dict[str, Any]]:
+        records = []
+        data = path.read_bytes()
+        pos = 0
+        while pos + _FRAME.size <= len(data):
+            length, crc = _FRAME.unpack_from(data, pos)
+            payload = data[pos + _FRAME.size:pos + _FRAME.size + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                self.log.warning(f"Ignoring torn record at {path.name}:{pos}")
+                break
+            records.append(pickle.loads(payload))
+            pos += _FRAME.size + length
+        return records
+
+    def _unlink(self, path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
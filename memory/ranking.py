@@ -0,0 +1,145 @@
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+
+
+class BM25Ranker:
+    """Okapi BM25 over an incrementally grown sparse term-document matrix.
+
+    Rows are entry ids, columns are vocabulary terms, values are raw term
+    frequencies. New documents land in a small pending block that is
+    folded into the CSC base matrix once it grows past ``merge_ratio`` of
+    the base, so adding a document is amortized O(1).
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75,
+                 merge_ratio: float = 0.1, min_merge: int = 1024):
+        self.k1 = k1
+        self.b = b
+        self.merge_ratio = merge_ratio
+        self.min_merge = min_merge
+        self.vocabulary: Dict[str, int] = {}
+        self._df = array("i")
+        self._doc_len = array("f")
+        self._alive = bytearray()
+        self._n_alive = 0
+        self._total_len = 0.0
+        self._base = sparse.csc_matrix((0, 0), dtype=np.float32)
+        self._pending_rows = array("i")
+        self._pending_cols = array("i")
+        self._pending_tf = array("f")
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str], **kwargs) -> "BM25Ranker":
+        ranker = cls(**kwargs)
+        for text in texts:
+            ranker.add(text)
+        ranker._merge()
+        return ranker
+
+    def add(self, text: str) -> int:
+        """Index the next document, returns its id"""
+        doc_id = len(self._doc_len)
+        counts = Counter(text.lower().split())
+        for term, tf in counts.items():
+            col = self.vocabulary.get(term)
+            if col is None:
+                col = self.vocabulary[term] = len(self.vocabulary)
+                self._df.append(0)
+            self._df[col] += 1
+            self._pending_rows.append(doc_id)
+            self._pending_cols.append(col)
+            self._pending_tf.append(tf)
+        self._doc_len.append(sum(counts.values()))
+        self._alive.append(1)
+        self._n_alive += 1
+        self._total_len += self._doc_len[doc_id]
+        if len(self._pending_rows) > max(self.min_merge, self.merge_ratio * self._base.nnz):
+            self._merge()
+        return doc_id
+
+    def remove(self, doc_id: int, text: str):
+        """Exclude an evicted document and drop it from the corpus statistics"""
+        if not self._alive[doc_id]:
+            return
+        self._alive[doc_id] = 0
+        self._n_alive -= 1
+        self._total_len -= self._doc_len[doc_id]
+        for term in set(text.lower().split()):
+            self._df[self.vocabulary[term]] -= 1
+
+    def top(self, query: str, limit: int,
+            terms: Optional[Iterable[str]] = None) -> List[Tuple[int, float]]:
+        """Best ``limit`` (doc id, score) pairs, newest first on ties;
+        ``terms`` are the query's terms when already split"""
+        terms = query.lower().split() if terms is None else terms
+        cols = sorted({self.vocabulary[t] for t in terms if t in self.vocabulary})
+        if not cols or limit <= 0:
+            return []
+
+        n_docs = self._n_alive
+        doc_len = np.frombuffer(self._doc_len, dtype=np.float32)
+        alive = np.frombuffer(self._alive, dtype=np.uint8)
+        df = np.frombuffer(self._df, dtype=np.int32)[cols]
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avg_len = self._total_len / max(n_docs, 1)
+        norm = self.k1 * (1 - self.b + self.b * doc_len / max(avg_len, 1e-9))
+
+        ids, scores = [], []
+        for block, offset in ((self._base, 0), (self._pending(), self._base.shape[0])):
+            block_cols = [i for i, c in enumerate(cols) if c < block.shape[1]]
+            if not block.nnz or not block_cols:
+                continue
+            sub = block[:, [cols[i] for i in block_cols]]
+            if not sub.nnz:
+                continue
+            tf = sub.data
+            sub.data = tf * (self.k1 + 1) / (tf + norm[sub.indices + offset])
+            block_scores = sub @ idf[block_cols]
+            hit = np.flatnonzero(block_scores)
+            hit = hit[alive[hit + offset] == 1]
+            ids.append(hit + offset)
+            scores.append(block_scores[hit].astype(np.float32))
+
+        if not ids:
+            return []
+        ids = np.concatenate(ids)
+        scores = np.concatenate(scores)
+        if len(ids) > limit:
+            # Partial selection; ties at the cut-off go to the newest ids
+            kth = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            above = np.flatnonzero(scores > kth)
+            tied = np.flatnonzero(scores == kth)
+            tied = tied[np.argsort(-ids[tied], kind="stable")[:limit - len(above)]]
+            keep = np.concatenate([above, tied])
+            ids, scores = ids[keep], scores[keep]
+        order = np.lexsort((-ids, -scores))
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+    def _pending(self) -> sparse.csc_matrix:
+        n_rows = len(self._doc_len) - self._base.shape[0]
+        rows = np.frombuffer(self._pending_rows, dtype=np.int32) - self._base.shape[0]
+        return sparse.csc_matrix(
+            (np.frombuffer(self._pending_tf, dtype=np.float32),
+             (rows, np.frombuffer(self._pending_cols, dtype=np.int32))),
+            shape=(n_rows, len(self.vocabulary))
+        )
+
+    def _merge(self):
+        """Fold the pending block into the base matrix"""
+        base = self._base
+        if base.shape[1] < len(self.vocabulary):
+            base = sparse.csc_matrix(
+                (base.data, base.indices, base.indptr),
+                shape=(base.shape[0], base.shape[1])
+            )
+            base.resize((base.shape[0], len(self.vocabulary)))
+        self._base = sparse.vstack([base, self._pending()], format="csc", dtype=np.float32)
+        self._pending_rows = array("i")
+        self._pending_cols = array("i")
+        self._pending_tf = array("f")
@@ -0,0 +1,230 @@
+import hashlib
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .MemoryBank import MemoryBank
+from .eviction import EvictionPolicy
+from .log_store import LogStore
+
+DEFAULT_TENANT = "default"
+_SAFE_NAME = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+class ShardedMemoryBank:
+    """One MemoryBank per tenant (user or session id).
+
+    Each shard has its own log, snapshot and indexes under
+    ``root/<tenant>/``, so a lookup only searches that tenant's history
+    and a large tenant cannot slow down small ones. At most ``max_open``
+    shards stay open; when more are needed the least recently used idle
+    shard is closed (flushed and compacted) and reopened on demand.
+    Requests pin their shard while they use it, so a shard is never
+    closed under a running lookup. With root ":memory:" shards live in
+    memory and are never closed.
+
+    ``bank_options`` are passed to every shard's MemoryBank; ``eviction``
+    is the ``memory.eviction`` config section, applied per shard.
+
+    ``legacy_path`` is an unsharded MemoryBank store (``storage_path``
+    in config). When the ``default`` shard is first created its files are
+    copied into it, so history written before sharding stays retrievable
+    for requests without a user or session id. The legacy store itself is
+    left alone; the CLIs keep using it.
+    """
+
+    def __init__(self, root: str = "data/memory", max_open: int = 64,
+                 eviction: Optional[Dict[str, Any]] = None,
+                 legacy_path: Optional[str] = None, **bank_options):
+        self.root = Path(root)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.max_open = max_open
+        self.eviction = eviction
+        self.bank_options = bank_options
+        self._in_memory = self.root == Path(":memory:")
+        self._lock = threading.Lock()
+        self._shards: "OrderedDict[str, MemoryBank]" = OrderedDict()  # LRU order
+        self._pins: Dict[str, int] = {}
+        self._closing: Dict[str, threading.Event] = {}
+        self._closed = False
+        # The legacy import runs under its own lock, not self._lock, so
+        # only requests for the default shard wait for the copy
+        self._import_lock = threading.Lock()
+        self._imported = self._in_memory or self.legacy_path is None
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> "ShardedMemoryBank":
+        """Build from the ``memory`` section of config/ai_core.yaml"""
+        if config is None:
+            from ai_core.config_manager import ConfigManager
+            config = ConfigManager().get("memory", {})
+        config = dict(config)
+        legacy_path = config.pop("storage_path", None)
+        shards = config.pop("shards", None) or {}
+        return cls(root=shards.get("root", "data/memory"),
+                   max_open=shards.get("max_open", 64), legacy_path=legacy_path, **config)
+
+    @staticmethod
+    def shard_name(tenant: Optional[str]) -> str:
+        """Directory name of a tenant's shard; ids that are not plain names are hashed"""
+        tenant = DEFAULT_TENANT if tenant is None else str(tenant)
+        if _SAFE_NAME.fullmatch(tenant):
+            return tenant
+        return "t-" + hashlib.sha256(tenant.encode("utf-8")).hexdigest()[:32]
+
+    @property
+    def open_shards(self) -> List[str]:
+        """Names of open shards, least recently used first"""
+        with self._lock:
+            return list(self._shards)
+
+    def store(self, query: str, result: Dict, tenant: Optional[str] = None) -> str:
+        """Store interaction in the tenant's shard"""
+        with self.shard(tenant) as bank:
+            return bank.store(query, result)
+
+    def get_context(self, query: str, limit: int = 3, ranking: str = "overlap",
+                    tenant: Optional[str] = None,
+                    tokens: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Retrieve relevant context from the tenant's own history"""
+        with self.shard(tenant) as bank:
+            return bank.get_context(query, limit, ranking, tokens)
+
+    @contextmanager
+    def shard(self, tenant: Optional[str] = None) -> Iterator[MemoryBank]:
+        """Pin a tenant's shard open for the duration of the block"""
+        name = self.shard_name(tenant)
+        bank = self._acquire(name)
+        try:
+            yield bank
+        finally:
+            self._release(name)
+
+    def flush(self):
+        """Block until every open shard's stores are on disk"""
+        with self._lock:
+            names = list(self._shards)
+            for name in names:
+                self._pins[name] = self._pins.get(name, 0) + 1
+            banks = [self._shards[name] for name in names]
+        try:
+            for bank in banks:
+                bank.flush()
+        finally:
+            for name in names:
+                self._release(name)
+
+    def close(self):
+        """Close every open shard"""
+        with self._lock:
+            self._closed = True
+            victims = list(self._shards.items())
+            self._shards.clear()
+            for name, _ in victims:
+                self._closing[name] = threading.Event()
+        self._close_all(victims)
+        # Shards another thread started closing must be on disk as well
+        with self._lock:
+            pending = list(self._closing.values())
+        for closing in pending:
+            closing.wait()
+
+    def _acquire(self, name: str) -> MemoryBank:
+        if name == DEFAULT_TENANT and not self._imported:
+            self._import_legacy()
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("sharded memory bank is closed")
+                closing = self._closing.get(name)
+                if closing is None:
+                    bank = self._shards.get(name)
+                    if bank is None:
+                        bank = self._open(name)
+                        self._shards[name] = bank
+                    self._shards.move_to_end(name)
+                    self._pins[name] = self._pins.get(name, 0) + 1
+                    victims = self._detach_idle()
+                    break
+            # The shard is still being written out; reopen it afterwards
+            closing.wait()
+        self._close_all(victims)
+        return bank
+
+    def _release(self, name: str):
+        with self._lock:
+            self._pins[name] -= 1
+            if not self._pins[name]:
+                del self._pins[name]
+            victims = self._detach_idle()
+        self._close_all(victims)
+
+    def _open(self, name: str) -> MemoryBank:
+        """Open a tenant's MemoryBank (lock held; loading maps, it does not decode)"""
+        if self._in_memory:
+            return MemoryBank(":memory:", **self.bank_options)
+        path = self.root / name / "memory.db"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        eviction = None
+        if self.eviction:
+            config = dict(self.eviction)
+            if config.get("archive_path"):
+                config["archive_path"] = str(path.parent / Path(config["archive_path"]).name)
+            eviction = EvictionPolicy.from_config(config)
+        return MemoryBank(str(path), eviction=eviction, **self.bank_options)
+
+    def _import_legacy(self):
+        """Create the default shard from the legacy store's snapshot and
+        segments, once, before it is first opened"""
+        with self._import_lock:
+            if self._imported:
+                return
+            shard_dir = self.root / DEFAULT_TENANT
+            if not shard_dir.exists():
+                self._copy_legacy(shard_dir)
+            self._imported = True
+
+    def _copy_legacy(self, shard_dir: Path):
+        segments = LogStore(self.legacy_path).segments()
+        if not self.legacy_path.exists() and not segments:
+            return
+        # Copied next to the shard, then renamed into place, so a crash
+        # mid-copy leaves no half-imported shard
+        staging = self.root / f".{shard_dir.name}.import"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        for seq, segment in segments:
+            shutil.copy2(segment, staging / f"memory.db.{seq:08d}.seg")
+        if self.legacy_path.exists():
+            shutil.copy2(self.legacy_path, staging / "memory.db")
+        staging.replace(shard_dir)
+
+    def _detach_idle(self) -> List[Tuple[str, MemoryBank]]:
+        """Take idle shards beyond max_open out of the LRU (lock held)"""
+        if self._in_memory:
+            return []
+        victims = []
+        excess = len(self._shards) - self.max_open
+        for name in list(self._shards):
+            if excess <= 0:
+                break
+            if name in self._pins:
+                continue
+            victims.append((name, self._shards.pop(name)))
+            self._closing[name] = threading.Event()
+            excess -= 1
+        return victims
+
+    def _close_all(self, victims: List[Tuple[str, MemoryBank]]):
+        """Close detached shards outside the lock; compaction may take a while"""
+        for name, bank in victims:
+            try:
+                bank.close()
+            except Exception as e:
+                print(f"Memory shard close error: {e}")
+            finally:
+                with self._lock:
+                    self._closing.pop(name).set()
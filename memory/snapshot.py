@@ -0,0 +1,288 @@
+import mmap
+import os
+import pickle
+import struct
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .columnar import EntryColumns, EntryView
+
+MAGIC = b"SLKMEM02"
+# magic, entry count, last compacted segment, offset of the row index
+_HEADER = struct.Struct("<8sQQQ")
+# Fixed-size index row: record offset, query bytes, payload bytes, access_count
+_ROW = struct.Struct("<QIII")
+_ROW_DTYPE = np.dtype([("offset", "<u8"), ("q_len", "<u4"), ("p_len", "<u4"), ("count", "<u4")])
+
+Record = Tuple[bytes, bytes, int]
+# Evicted entries keep their row (so ids stay stable) with an empty payload
+TOMBSTONE: Record = (b"", b"", 0)
+
+
+def is_snapshot(path: Path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_snapshot(path: Path, records: Iterable[Record], segment: int):
+    """Write records + row index to a temp file, then atomically replace path"""
+    temp_path = path.with_suffix(".tmp")
+    rows = []
+    with open(temp_path, "wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        offset = _HEADER.size
+        for query, payload, access_count in records:
+            f.write(query)
+            f.write(payload)
+            rows.append(_ROW.pack(offset, len(query), len(payload), access_count))
+            offset += len(query) + len(payload)
+        f.write(b"".join(rows))
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, len(rows), segment, offset))
+        f.flush()
+        os.fsync(f.fileno())
+    temp_path.replace(path)
+
+
+class MappedSnapshot:
+    """Read-only, memory-mapped view of a snapshot file.
+
+    Opening only parses the header; entries are decoded from the mapping
+    on demand, so startup cost does not depend on history size and forked
+    workers share the pages through the OS page cache.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.segment, self._index = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a memory snapshot")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def raw(self, i: int) -> Tuple[bytes, bytes]:
+        offset, q_len, p_len, _ = _ROW.unpack_from(self._mm, self._index + i * _ROW.size)
+        return self._mm[offset:offset + q_len], self._mm[offset + q_len:offset + q_len + p_len]
+
+    def query(self, i: int) -> str:
+        offset, q_len, _, _ = _ROW.unpack_from(self._mm, self._index + i * _ROW.size)
+        return self._mm[offset:offset + q_len].decode("utf-8")
+
+    def access_count(self, i: int) -> int:
+        return _ROW.unpack_from(self._mm, self._index + i * _ROW.size)[3]
+
+    def access_counts(self) -> np.ndarray:
+        """Copy of every row's access_count as an int32 array"""
+        rows = np.frombuffer(self._mm, dtype=_ROW_DTYPE, count=self.count, offset=self._index)
+        return rows["count"].astype(np.int32)
+
+    def size(self, i: int) -> int:
+        """Stored bytes of an entry, 0 for tombstones"""
+        _, q_len, p_len, _ = _ROW.unpack_from(self._mm, self._index + i * _ROW.size)
+        return q_len + p_len
+
+    def is_deleted(self, i: int) -> bool:
+        return _ROW.unpack_from(self._mm, self._index + i * _ROW.size)[2] == 0
+
+    def entry(self, i: int) -> Optional[Dict[str, Any]]:
+        query, payload = self.raw(i)
+        if not payload:
+            return None
+        timestamp, result = pickle.loads(payload)
+        return {
+            "timestamp": timestamp,
+            "query": query.decode("utf-8"),
+            "result": result,
+            "access_count": self.access_count(i)
+        }
+
+    def close(self):
+        self._mm.close()
+
+
+class EntryList(Sequence):
+    """MemoryBank entries: a mapped snapshot head plus an in-memory tail.
+
+    Snapshot entries are decoded on first access and kept in an LRU of
+    ``cache_size`` dicts; the tail is held column-wise (EntryColumns) and
+    read through EntryView. Access counts of snapshot rows are overlaid by
+    an int32 array, so bump them with ``touch()`` rather than by mutating
+    a decoded dict. Deleted (evicted) entries keep their id and read back
+    as None. Reads may run concurrently; touch() callers serialize per
+    entry and structural changes (append, delete, rebase) need exclusive
+    access.
+    """
+
+    def __init__(self, snapshot: Optional[MappedSnapshot] = None,
+                 tail: Optional[List[Dict]] = None, cache_size: int = 1024):
+        self.snapshot = snapshot
+        self.tail = EntryColumns(tail or ())
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, Dict]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._counts: Optional[np.ndarray] = None  # created on the first snapshot touch
+        self._deleted = set()  # snapshot rows deleted since it was written
+
+    @property
+    def head(self) -> int:
+        return len(self.snapshot) if self.snapshot is not None else 0
+
+    def __len__(self) -> int:
+        return self.head + len(self.tail)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        head = self.head
+        if i >= head:
+            if i - head >= len(self.tail):
+                raise IndexError(i)
+            return None if self.tail.is_deleted(i - head) else EntryView(self, i)
+        if i in self._deleted:
+            return None
+        with self._cache_lock:
+            entry = self._cache.get(i)
+            if entry is not None:
+                self._cache.move_to_end(i)
+                return entry
+        # Decode outside the lock; concurrent readers may race to insert
+        entry = self.snapshot.entry(i)
+        if entry is None:
+            return None
+        with self._cache_lock:
+            cached = self._cache.get(i)
+            if cached is not None:
+                return cached
+            entry["access_count"] = self.access_count(i)
+            self._cache[i] = entry
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+    def field(self, i: int, key: str) -> Any:
+        """One value of an entry, without materializing the others"""
+        head = self.head
+        if i >= head:
+            return self.tail.field(i - head, key)
+        if key == "query":
+            return self.query(i)
+        if key == "access_count":
+            return self.access_count(i)
+        entry = self[i]
+        if entry is None:
+            raise KeyError(key)
+        return entry[key]
+
+    def append(self, entry: Dict):
+        self.tail.append(entry)
+
+    def query(self, i: int) -> str:
+        """Query text without decoding the rest of the entry ("" once deleted)"""
+        head = self.head
+        if i >= head:
+            return self.tail.query(i - head)
+        return "" if i in self._deleted else self.snapshot.query(i)
+
+    def access_count(self, i: int) -> int:
+        head = self.head
+        if i >= head:
+            return int(self.tail.access_counts.data[i - head])
+        if self._counts is not None:
+            return int(self._counts[i])
+        return self.snapshot.access_count(i)
+
+    def touch(self, i: int):
+        """Increment an entry's access_count"""
+        self.set_access_count(i, self.access_count(i) + 1)
+
+    def set_access_count(self, i: int, count: int):
+        head = self.head
+        if i >= head:
+            self.tail.access_counts.data[i - head] = count
+            return
+        if self._counts is None:
+            with self._cache_lock:
+                if self._counts is None:
+                    self._counts = self.snapshot.access_counts()
+        self._counts[i] = count
+        with self._cache_lock:
+            cached = self._cache.get(i)
+            if cached is not None:
+                cached["access_count"] = count
+
+    def is_deleted(self, i: int) -> bool:
+        head = self.head
+        if i >= head:
+            return self.tail.is_deleted(i - head)
+        return i in self._deleted or self.snapshot.is_deleted(i)
+
+    def size(self, i: int) -> int:
+        """Approximate stored bytes of an entry"""
+        head = self.head
+        if i >= head:
+            row = i - head
+            if self.tail.is_deleted(row):
+                return 0
+            return len(self.tail.query_bytes(row)) + len(self.tail.payload(row))
+        return 0 if i in self._deleted else self.snapshot.size(i)
+
+    def delete(self, i: int):
+        """Drop an entry's data but keep its id"""
+        head = self.head
+        if i >= head:
+            self.tail.delete(i - head)
+            return
+        self._deleted.add(i)
+        if self._counts is not None:
+            self._counts[i] = 0
+        with self._cache_lock:
+            self._cache.pop(i, None)
+
+    def records(self, count: int) -> Iterator[Record]:
+        """Encoded records for the first ``count`` entries (snapshot rows are copied raw)"""
+        head = self.head
+        for i in range(count):
+            if i < head:
+                if i in self._deleted:
+                    yield TOMBSTONE
+                    continue
+                query, payload = self.snapshot.raw(i)
+                yield query, payload, self.access_count(i)
+            else:
+                row = i - head
+                if self.tail.is_deleted(row):
+                    yield TOMBSTONE
+                else:
+                    yield (self.tail.query_bytes(row), self.tail.payload(row),
+                           int(self.tail.access_counts.data[row]))
+
+    def rebase(self, snapshot: MappedSnapshot):
+        """Swap in a newer snapshot covering a prefix of these entries"""
+        old_head, new_head = self.head, len(snapshot)
+        moved = new_head - old_head
+        # Current counts are authoritative; keep an overlay only where the
+        # new snapshot has not caught up with them
+        written = snapshot.access_counts()
+        current = self._counts if self._counts is not None else written[:old_head]
+        current = np.concatenate([current, self.tail.access_counts.view()[:moved]])
+        deleted = {i for i in self._deleted if not snapshot.is_deleted(i)}
+        for row in range(moved):
+            if self.tail.is_deleted(row) and not snapshot.is_deleted(old_head + row):
+                deleted.add(old_head + row)
+        old = self.snapshot
+        self.snapshot = snapshot
+        self.tail.drop(moved)
+        self._counts = current if (current != written).any() else None
+        self._deleted = deleted
+        if old is not None:
+            old.close()
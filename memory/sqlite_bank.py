@@ -0,0 +1,170 @@
+import heapq
+import pickle
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    query TEXT NOT NULL,
+    result_text TEXT NOT NULL,
+    result BLOB NOT NULL,
+    access_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+    query, result_text, content='memories', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+    INSERT INTO memories_fts(rowid, query, result_text)
+    VALUES (new.id, new.query, new.result_text);
+END;
+CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+    INSERT INTO memories_fts(memories_fts, rowid, query, result_text)
+    VALUES ('delete', old.id, old.query, old.result_text);
+END;
+"""
+
+
+class SQLiteMemoryBank:
+    """MemoryBank backed by a shared SQLite database.
+
+    Same store/get_context surface as MemoryBank, but nothing is loaded
+    into RAM: relevance comes from an FTS5 index over queries and results
+    (bm25 ranking) and the database runs in WAL mode so several API
+    workers can read and write one store concurrently. access_count
+    increments are buffered and applied as batched UPDATEs.
+    """
+    RANKINGS = ["overlap", "bm25"]
+
+    def __init__(self, storage_path: str = "data/memory.sqlite", batch_size: int = 64,
+                 query_weight: float = 2.0, result_weight: float = 1.0):
+        self.storage_path = Path(storage_path)
+        self.batch_size = batch_size
+        self.weights = (query_weight, result_weight)
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+        if str(self.storage_path) != ":memory:":
+            self.storage_path.parent.mkdir(exist_ok=True)
+        self.conn = sqlite3.connect(str(self.storage_path), timeout=30,
+                                    check_same_thread=False)
+        self._init_db()
+
+    def store(self, query: str, result: Dict) -> str:
+        """Store interaction with timestamp"""
+        timestamp = datetime.now().isoformat()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO memories (timestamp, query, result_text, result) VALUES (?, ?, ?, ?)",
+                (timestamp, query, self._result_text(result),
+                 pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+            )
+        return timestamp
+
+    def get_context(self, query: str, limit: int = 3, ranking: str = "bm25",
+                    tokens: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Retrieve relevant context for query
+
+        ranking="bm25" (the default here) returns the best FTS matches
+        first; ranking="overlap" returns the most accessed entries sharing
+        a word with the query, as MemoryBank does.
+        """
+        if ranking not in self.RANKINGS:
+            raise ValueError(f"Invalid ranking. Choose from: {self.RANKINGS}")
+        match = self._match_expression(query, tokens)
+        if not match:
+            return []
+        with self._lock:
+            if ranking == "bm25":
+                rows = self.conn.execute(
+                    """
+                    SELECT m.id, m.timestamp, m.query, m.result, m.access_count
+                    FROM memories_fts JOIN memories m ON m.id = memories_fts.rowid
+                    WHERE memories_fts MATCH ?
+                    ORDER BY bm25(memories_fts, ?, ?)
+                    LIMIT ?
+                    """,
+                    (match, *self.weights, limit)
+                ).fetchall()
+            else:
+                rows = self._most_accessed(match, limit)
+
+            relevant = []
+            for row_id, timestamp, text, result, access_count in rows:
+                self._pending[row_id] += 1
+                relevant.append({
+                    "timestamp": timestamp,
+                    "query": text,
+                    "result": pickle.loads(result),
+                    "access_count": access_count + self._pending[row_id]
+                })
+            if sum(self._pending.values()) >= self.batch_size:
+                self._flush_access_counts()
+        return relevant
+
+    def flush(self):
+        """Apply buffered access_count increments"""
+        with self._lock:
+            self._flush_access_counts()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def _init_db(self):
+        """Initialize schema; WAL lets readers and one writer run concurrently"""
+        if str(self.storage_path) != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def _most_accessed(self, match: str, limit: int) -> List[tuple]:
+        """Matching rows by access count, buffered increments included;
+        ties keep insertion order"""
+        candidates = self.conn.execute(
+            """
+            SELECT m.id, m.access_count
+            FROM memories_fts JOIN memories m ON m.id = memories_fts.rowid
+            WHERE memories_fts MATCH ?
+            """,
+            (match,)
+        ).fetchall()
+        top = heapq.nlargest(limit, candidates,
+                             key=lambda row: (row[1] + self._pending[row[0]], -row[0]))
+        ids = [row_id for row_id, _ in top]
+        rows = {row[0]: row for row in self.conn.execute(
+            f"SELECT id, timestamp, query, result, access_count FROM memories "
+            f"WHERE id IN ({','.join('?' * len(ids))})",
+            ids
+        )}
+        return [rows[row_id] for row_id in ids]
+
+    def _flush_access_counts(self):
+        if not self._pending:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE memories SET access_count = access_count + ? WHERE id = ?",
+                [(count, row_id) for row_id, count in self._pending.items()]
+            )
+        self._pending.clear()
+
+    def _match_expression(self, query: str, tokens: Optional[Iterable[str]] = None) -> str:
+        """OR of quoted query words, so any shared word is a match"""
+        tokens = query.lower().split() if tokens is None else tokens
+        words = {w.replace('"', '""') for w in tokens}
+        return " OR ".join(f'"{w}"' for w in sorted(words) if w.strip('"'))
+
+    def _result_text(self, result: Any) -> str:
+        """Flatten the string values of a result for full-text indexing"""
+        if isinstance(result, str):
+            return result
+        if isinstance(result, dict):
+            return " ".join(self._result_text(v) for v in result.values())
+        if isinstance(result, (list, tuple)):
+            return " ".join(self._result_text(v) for v in result)
+        return ""
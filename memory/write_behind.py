@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from .log_store import LogStore
+
+
+class WriteBehindLog:
+    """Group-commit queue in front of a LogStore.
+
+    append() only enqueues; a single writer thread frames the queued
+    records, writes them in one go and fsyncs once per batch. A batch is
+    committed as soon as ``flush_every`` records are queued or the oldest
+    queued record is ``flush_interval_ms`` old, whichever comes first.
+
+    Crash window: records not yet committed are lost, i.e. at most
+    ``flush_interval_ms`` worth of stores or ``flush_every`` records
+    (``max_pending`` if the disk falls behind). flush() and close() commit
+    everything queued so far before returning.
+    """
+
+    def __init__(self, log: LogStore, flush_every: int = 64, flush_interval_ms: float = 50,
+                 max_pending: int = 4096, on_sealed: Optional[Callable[[], None]] = None):
+        self.log = log
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self.on_sealed = on_sealed
+        self._log = logging.getLogger(__name__)
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pending: List[Dict[str, Any]] = []
+        self._first_at = 0.0
+        self._queued = 0
+        self._committed = 0
+        self._flush_wanted = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, record: Dict[str, Any]) -> bool:
+        """Queue a record; blocks only when max_pending records are waiting"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write-behind log is closed")
+            while len(self._pending) >= self.max_pending:
+                self._cond.wait()
+            if not self._pending:
+                self._first_at = time.monotonic()
+            self._pending.append(record)
+            self._queued += 1
+            if len(self._pending) >= self.flush_every:
+                self._cond.notify_all()
+        # Sealed segments are reported through on_sealed by the writer
+        return False
+
+    def flush(self):
+        """Block until everything queued so far is on disk"""
+        with self._cond:
+            target = self._queued
+            if self._committed < target:
+                self._flush_wanted = True
+                self._cond.notify_all()
+            while self._committed < target:
+                self._cond.wait()
+
+    def rotate(self) -> int:
+        with self._io_lock:
+            return self.log.rotate()
+
+    def close(self):
+        """Commit queued records and stop the writer thread"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not (self._closed or self._flush_wanted
+                           or len(self._pending) >= self.flush_every):
+                    if self._pending:
+                        remaining = self._first_at + self.flush_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                batch, self._pending = self._pending, []
+                self._flush_wanted = False
+                closing = self._closed
+                self._cond.notify_all()
+
+            sealed = False
+            if batch:
+                with self._io_lock:
+                    try:
+                        sealed = self.log.append_many(batch)
+                    except Exception as e:
+                        self._log.error(f"Group commit of {len(batch)} records failed: {e}")
+
+            with self._cond:
+                self._committed += len(batch)
+                self._cond.notify_all()
+            if sealed and self.on_sealed is not None:
+                self.on_sealed()
+            if closing and not batch:
+                return
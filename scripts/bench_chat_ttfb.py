@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-byte of POST /api/v1/chat against its SSE variant
+/api/v1/chat/stream.
+
+Usage: python scripts/bench_chat_ttfb.py [--requests 20] [--tokens 40]
+                                         [--token-ms 25]
+
+Runs a real uvicorn server in-process against a local stand-in for an
+OpenAI-compatible upstream. The stand-in generates --tokens tokens at
+--token-ms each and streams them as server-sent events when asked to.
+Both providers are the real OpenAIProvider/DeepSeekProvider, pointed at
+the stand-in through the pooled transport. For /chat the first byte is
+the whole response. For the stream, the first event (context) and the
+first answer token are timed separately.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+
+from ai_core.APIOrchestrator import APIOrchestrator
+from ai_core.providers import DeepSeekProvider, OpenAIProvider
+from api.main import APIServer
+from memory import ShardedMemoryBank
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class Upstream(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    tokens = 40
+    token_s = 0.025
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        words = [f"token{i} " for i in range(self.tokens)]
+        if not body.get("stream"):
+            time.sleep(self.tokens * self.token_s)
+            reply = json.dumps({"model": body["model"],
+                                "choices": [{"message": {"content": "".join(words)}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for word in words + [None]:
+            time.sleep(self.token_s if word else 0)
+            data = "[DONE]" if word is None else json.dumps({"choices": [{"delta": {"content": word}}]})
+            event = f"data: {data}\n\n".encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+def start_api(upstream_url: str, root: str, port: int) -> Tuple[uvicorn.Server, threading.Thread]:
+    orchestrator = APIOrchestrator()
+    orchestrator.cache = None  # every request goes upstream
+    config = {"api_key": "bench", "base_url": upstream_url}
+    orchestrator.openai = OpenAIProvider(config)
+    orchestrator.deepseek = DeepSeekProvider(config)
+    server = uvicorn.Server(uvicorn.Config(
+        APIServer(memory=ShardedMemoryBank(root), orchestrator=orchestrator).app,
+        host="127.0.0.1", port=port, log_level="warning"
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread
+
+def time_chat(client: httpx.Client, base: str, message: str) -> float:
+    start = time.perf_counter()
+    client.post(f"{base}/api/v1/chat", json={"message": message}).raise_for_status()
+    return time.perf_counter() - start
+
+def time_stream(client: httpx.Client, base: str, message: str):
+    """(first byte, first answer token, complete) in seconds"""
+    start = time.perf_counter()
+    first_byte = first_token = None
+    with client.stream("POST", f"{base}/api/v1/chat/stream", json={"message": message}) as response:
+        for line in response.iter_lines():
+            now = time.perf_counter() - start
+            if first_byte is None:
+                first_byte = now
+            if first_token is None and line == "event: delta":
+                first_token = now
+    return first_byte, first_token, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--token-ms", type=float, default=25)
+    args = parser.parse_args()
+    Upstream.tokens, Upstream.token_s = args.tokens, args.token_ms / 1000
+
+    upstream = ThreadingHTTPServer(("127.0.0.1", 0), Upstream)
+    upstream.daemon_threads = True
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    upstream_url = f"http://127.0.0.1:{upstream.server_address[1]}/v1"
+
+    with tempfile.TemporaryDirectory() as root:
+        port = free_port()
+        server, thread = start_api(upstream_url, root, port)
+        base = f"http://127.0.0.1:{port}"
+        with httpx.Client(timeout=60) as client:
+            chat = [time_chat(client, base, f"question {i}") for i in range(args.requests)]
+            stream = [time_stream(client, base, f"question {i}") for i in range(args.requests)]
+        server.should_exit = True
+        thread.join()  # shutdown hooks flush memory into the directory
+    upstream.shutdown()
+
+    ms = lambda values: statistics.median(values) * 1000
+    print(f"{args.requests} requests, upstream generates {args.tokens} tokens "
+          f"x {args.token_ms:g} ms; medians")
+    print(f"  /chat         first byte: {ms(chat):8.1f} ms (= complete)")
+    print(f"  /chat/stream  first byte: {ms([s[0] for s in stream]):8.1f} ms")
+    print(f"  /chat/stream  first token:{ms([s[1] for s in stream]):8.1f} ms")
+    print(f"  /chat/stream  complete:   {ms([s[2] for s in stream]):8.1f} ms")
+
+if __name__ == "__main__":
+    main()
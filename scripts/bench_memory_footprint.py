@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory footprint of in-memory MemoryBank entries: the
+previous list of dicts vs the columnar EntryColumns store.
+
+Usage: python scripts/bench_memory_footprint.py [--sizes 100000,500000]
+
+Allocations are measured with tracemalloc. Result payloads are the same
+objects in both layouts, so they are excluded: the numbers are the
+per-entry overhead the columnar layout removes.
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory.columnar import EntryColumns
+
+WORDS = ["what", "is", "how", "do", "i", "the", "explain", "python", "quantum",
+         "weather", "best", "way", "to", "learn", "decorators", "physics"]
+
+def make_entries(size: int, rng: random.Random):
+    start = datetime(2024, 1, 1)
+    return [{
+        "timestamp": (start + timedelta(seconds=i, microseconds=rng.randrange(10 ** 6))).isoformat(),
+        "query": " ".join(rng.choices(WORDS, k=rng.randrange(4, 10))),
+        "result": {"content": f"answer {i}"},
+        "access_count": rng.randrange(50)
+    } for i in range(size)]
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, used
+
+def run(size: int):
+    rng = random.Random(size)
+    # Prebuild the source values so only the container layout is measured
+    source = make_entries(size, rng)
+    texts = [(e["timestamp"], e["query"]) for e in source]
+    results = [e["result"] for e in source]
+    counts = [e["access_count"] for e in source]
+    del source
+
+    def as_dicts():
+        # Fresh strings per entry, as when decoded from the log
+        return [{"timestamp": ts.encode().decode(), "query": q.encode().decode(),
+                 "result": r, "access_count": c}
+                for (ts, q), r, c in zip(texts, results, counts)]
+
+    dicts, dict_bytes = measure(as_dicts)
+    columns, column_bytes = measure(lambda: EntryColumns(dicts))
+    print(f"\n{size:,} entries (result objects excluded, they are shared)")
+    for name, used in (("dicts", dict_bytes), ("columnar", column_bytes)):
+        print(f"  {name:<9} {used / 2 ** 20:>8.1f} MB {used / size:>6.0f} B/entry")
+    print(f"  reduction: {dict_bytes / column_bytes:.1f}x")
+    del dicts, columns
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="100000,500000")
+    args = parser.parse_args()
+    for size in map(int, args.sizes.split(",")):
+        run(size)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark MemoryBank retrieval: legacy _is_relevant scan vs the
+inverted index ("overlap") vs BM25 ranking ("bm25").
+
+Usage: python scripts/bench_memory_retrieval.py [--sizes 10000,100000,1000000]
+
+Synthetic history: every entry is about one topic (topic words) padded
+with generic question words. An entry is relevant to a query when it is
+about the query's topic; recall@k = relevant hits in top-k / k.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory.MemoryBank import MemoryBank
+
+GENERIC = ["what", "is", "how", "do", "i", "the", "a", "explain", "why", "does",
+           "to", "in", "of", "and", "best", "way", "use", "can", "you", "me"]
+
+def build_bank(size: int, topics: int, rng: random.Random):
+    bank = MemoryBank(":memory:")
+    labels = []
+    for _ in range(size):
+        topic = rng.randrange(topics)
+        words = rng.sample(GENERIC, 4) + [f"t{topic}w{rng.randrange(8)}" for _ in range(2)]
+        rng.shuffle(words)
+        bank.store(" ".join(words), {"topic": topic})
+        labels.append(topic)
+    # Popular-but-stale entries: what the access_count ordering favours
+    for i in rng.sample(range(size), min(size, 500)):
+        bank.entries[i]["access_count"] = rng.randrange(1, 50)
+    return bank, labels
+
+def legacy_scan(bank: MemoryBank, query: str, limit: int):
+    """The pre-index get_context: filter everything, full sort"""
+    return sorted(
+        [e for e in bank.entries if bank._is_relevant(e, query)],
+        key=lambda x: x["access_count"],
+        reverse=True
+    )[:limit]
+
+def run(size: int, queries: int, limit: int, scan_queries: int):
+    rng = random.Random(size)
+    topics = max(10, size // 1000)
+    start = time.perf_counter()
+    bank, labels = build_bank(size, topics, rng)
+    print(f"\n{size:,} entries ({topics} topics), built in {time.perf_counter() - start:.1f}s")
+
+    workload = []
+    for _ in range(queries):
+        topic = rng.randrange(topics)
+        words = rng.sample(GENERIC, 3) + [f"t{topic}w{rng.randrange(8)}"]
+        workload.append((" ".join(words), topic))
+
+    start = time.perf_counter()
+    bank.get_context("warm up", ranking="bm25")
+    print(f"  bm25 matrix build: {time.perf_counter() - start:.2f}s")
+
+    methods = {
+        "legacy scan": (lambda q: legacy_scan(bank, q, limit), workload[:scan_queries]),
+        "overlap index": (lambda q: bank.get_context(q, limit), workload),
+        "bm25": (lambda q: bank.get_context(q, limit, ranking="bm25"), workload),
+    }
+    print(f"  {'method':<14} {'recall@' + str(limit):>10} {'ms/query':>10}")
+    for name, (fn, batch) in methods.items():
+        hits = 0
+        start = time.perf_counter()
+        for query, topic in batch:
+            hits += sum(1 for e in fn(query) if e["result"]["topic"] == topic)
+        elapsed = (time.perf_counter() - start) / len(batch) * 1000
+        print(f"  {name:<14} {hits / (limit * len(batch)):>10.3f} {elapsed:>10.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=5,
+                        help="queries for the (slow) legacy scan")
+    parser.add_argument("--limit", type=int, default=3)
+    args = parser.parse_args()
+    for size in map(int, args.sizes.split(",")):
+        run(size, args.queries, args.limit, args.scan_queries)
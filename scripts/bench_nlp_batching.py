@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Throughput of the query NLP pass: one nlp() call per query against
+micro-batched nlp.pipe calls (engine.utils.BatchAnalyzer).
+
+Usage: python scripts/bench_nlp_batching.py [--queries 2000] [--clients 64]
+                                            [--processes N] [--model NAME]
+
+--clients concurrent callers each analyze one query after another, like
+requests reaching ContextBuilder.build_async. The unbatched rows run
+nlp(text) in the default thread pool, which is what the engine did
+before batching. The batched rows go through BatchAnalyzer in the
+server process and in --processes worker processes (default: one per
+CPU). The model is en_core_web_sm when it is installed. Otherwise it is
+an untrained pipeline with the same components (tok2vec, tagger, parser,
+ner); it does the same amount of work per token.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import spacy
+
+from engine.utils import BatchAnalyzer
+from engine.utils.context_builder import UNUSED_COMPONENTS, linguistic_features
+
+def stand_in_model(path: str) -> str:
+    nlp = spacy.blank("en")
+    for name in ("tok2vec", "tagger", "parser", "ner"):
+        nlp.add_pipe(name)
+    for label in ("NN", "VB", "JJ"):
+        nlp.get_pipe("tagger").add_label(label)
+    nlp.get_pipe("parser").add_label("nsubj")
+    nlp.get_pipe("ner").add_label("ORG")
+    nlp.initialize()
+    nlp.to_disk(path)
+    return path
+
+async def run(analyze, texts, clients: int):
+    """(docs/s, median latency in seconds) of ``clients`` callers sharing ``texts``"""
+    pending = list(texts)
+    latencies = []
+
+    async def caller():
+        while pending:
+            text = pending.pop()
+            start = time.perf_counter()
+            await analyze(text)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(clients)))
+    return len(texts) / (time.perf_counter() - start), statistics.median(latencies)
+
+def unbatched(nlp):
+    async def analyze(text):
+        return await asyncio.to_thread(lambda: linguistic_features(nlp(text)))
+    return analyze
+
+def batched(analyzer: BatchAnalyzer):
+    async def analyze(text):
+        return await asyncio.wrap_future(analyzer.submit(text))
+    return analyze
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--model", default="en_core_web_sm")
+    args = parser.parse_args()
+
+    texts = [f"how do I write a python decorator that caches results, take {i}"
+             for i in range(args.queries)]
+    with tempfile.TemporaryDirectory() as tmp:
+        model = args.model
+        try:
+            spacy.load(model)
+        except OSError:
+            model = stand_in_model(tmp)
+            print(f"{args.model} is not installed; using an untrained stand-in pipeline")
+
+        rows = []
+        full = spacy.load(model)
+        rows.append(("unbatched, full pipeline", asyncio.run(run(unbatched(full), texts, args.clients))))
+        nlp = spacy.load(model, exclude=list(UNUSED_COMPONENTS))
+        rows.append(("unbatched, unused excluded", asyncio.run(run(unbatched(nlp), texts, args.clients))))
+        for processes in (0, args.processes):
+            analyzer = BatchAnalyzer(nlp, linguistic_features, processes=processes,
+                                     model=model, exclude=UNUSED_COMPONENTS)
+            if processes:
+                analyzer.analyze("warm up the workers")
+            result = asyncio.run(run(batched(analyzer), texts, args.clients))
+            stats = analyzer.stats()
+            analyzer.close()
+            where = f"{processes} worker process{'es' if processes > 1 else ''}" if processes else "in process"
+            rows.append((f"batched, {where} (mean batch {stats['mean_batch']:g})", result))
+
+    print(f"{args.queries} queries, {args.clients} concurrent callers, {os.cpu_count()} CPUs")
+    for name, (rate, latency) in rows:
+        print(f"  {name:44s} {rate:8.0f} docs/s   p50 {latency * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Per-query cost of keyword classification: the per-stage substring scans
+against one shared KeywordMatcher pass (shared/query_features.py).
+
+Usage: python scripts/bench_query_features.py [--queries 2000] [--groups 0 8 32 128]
+
+The first table is the work one engine query does. Before, the intent,
+interest and routing stages each lowercased the query and ran their own
+`any(k in query for k in ...)` loops, and routing ran twice (cache lookup
+and route). After, the query is scanned once and each stage reads the
+result. The second table adds --groups synthetic keyword groups of four
+labels and three keywords each, to show how both costs grow as
+categories are added. "scan" is the matcher pass alone; "scan + reads"
+adds one first() lookup per group, as the stages do.
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.query_features import KEYWORD_TABLES, KeywordMatcher
+
+WORDS = ("how to debug a python function that compares two classes vs dicts "
+         "why does my computer music app paint the screen at random tell me a "
+         "funny joke about physics and math explain the algorithm for sorting "
+         "what is the weather like today in the city").split()
+
+def queries(count: int, rng: random.Random) -> list:
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 20))).capitalize() + "?"
+            for _ in range(count)]
+
+def substring_classifier(tables):
+    """The old per-stage loops: lowercase, then scan each table in order"""
+    def classify(query: str) -> dict:
+        labels = {}
+        for group, table in tables.items():
+            lowered = query.lower()
+            labels[group] = next((label for label, keywords in table.items()
+                                  if any(k in lowered for k in keywords)), None)
+        return labels
+    return classify
+
+def matcher_classifier(tables):
+    matcher = KeywordMatcher(tables)
+
+    def classify(query: str) -> dict:
+        features = matcher.scan(query)
+        return {group: features.first(group) for group in tables}
+    return classify
+
+def with_routing_twice(tables):
+    """The stages one engine query ran: routing is checked on the cache
+    lookup and again on the route"""
+    return dict(tables, routing_again=tables["routing"])
+
+def synthetic_tables(groups: int, rng: random.Random) -> dict:
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+    return {f"synthetic{g}": {f"label{l}": tuple(word() for _ in range(3)) for l in range(4)}
+            for g in range(groups)}
+
+def per_query_us(classify, texts: list) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        classify(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--groups", type=int, nargs="+", default=[0, 8, 32, 128])
+    args = parser.parse_args()
+    rng = random.Random(0)
+    texts = queries(args.queries, rng)
+
+    stages = {group: KEYWORD_TABLES[group] for group in ("intent", "interest", "routing")}
+    before = substring_classifier(with_routing_twice(stages))
+    after = matcher_classifier(KEYWORD_TABLES)
+    assert all(before(t)[g] == after(t)[g] for t in texts for g in stages)
+    print(f"one engine query, {args.queries} queries")
+    print(f"  per-stage substring scans {per_query_us(before, texts):7.2f} us")
+    print(f"  one shared scan           {per_query_us(after, texts):7.2f} us")
+
+    print("classification cost as keyword groups are added")
+    print(f"  {'groups':>6s} {'keywords':>8s} {'substring':>10s} {'scan':>10s} {'scan + reads':>12s}")
+    for extra in args.groups:
+        tables = dict(KEYWORD_TABLES, **synthetic_tables(extra, rng))
+        keywords = sum(len(k) for table in tables.values() for k in table.values())
+        naive = per_query_us(substring_classifier(tables), texts)
+        scan = per_query_us(KeywordMatcher(tables).scan, texts)
+        reads = per_query_us(matcher_classifier(tables), texts)
+        print(f"  {len(tables):6d} {keywords:8d} {naive:8.2f}us {scan:8.2f}us {reads:10.2f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Import time and memory of the entry points, and what pre-fork model
+loading saves each forked worker.
+
+Usage: python scripts/bench_startup.py [--repeat 3] [--workers 2] [--model NAME]
+
+Each entry point is imported in a fresh interpreter: main.py (the CLI),
+api/main.py (which builds the server at import), and the engine
+package. The script reports the median import time, the peak RSS, and
+which heavy libraries the import pulled in.
+
+The pre-fork part forks --workers processes that each need the spaCy
+pipeline. In the first setup every worker loads its own copy. In the
+second, the parent preloads it through the model registry, as
+gunicorn.conf.py does. For each worker it reports how long getting the
+model took and its private (unshared) memory, from
+/proc/self/smaps_rollup. The model is en_core_web_sm when installed,
+otherwise the untrained stand-in from bench_nlp_batching.py.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+HEAVY = ("pandas", "sklearn", "spacy", "scipy", "fastapi", "uvicorn")
+
+PROBE = """
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(json.dumps({
+    "ms": (time.perf_counter() - start) * 1000,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy": [name for name in %r if name in sys.modules]
+}))
+""" % (HEAVY,)
+
+def probe(module: str) -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE, module], cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def private_mb() -> float:
+    with open("/proc/self/smaps_rollup") as f:
+        fields = dict(line.split(":", 1) for line in f if ":" in line)
+    kb = sum(int(fields[name].split()[0]) for name in ("Private_Clean", "Private_Dirty"))
+    return kb / 1024
+
+def fork_workers(workers: int, get_model) -> list:
+    """(seconds to get the model, private MB) of each forked worker"""
+    results = []
+    for _ in range(workers):
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            start = time.perf_counter()
+            nlp = get_model()
+            nlp("warm the model up")
+            os.write(write, json.dumps([time.perf_counter() - start, private_mb()]).encode())
+            os._exit(0)
+        os.close(write)
+        with os.fdopen(read) as f:
+            results.append(json.loads(f.read()))
+        os.waitpid(pid, 0)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--model", default="en_core_web_sm")
+    args = parser.parse_args()
+
+    print(f"import, median of {args.repeat} fresh interpreters")
+    for name, module in (("main.py (CLI)", "main"), ("api/main.py", "api.main"), ("engine", "engine")):
+        runs = [probe(module) for _ in range(args.repeat)]
+        ms = statistics.median(run["ms"] for run in runs)
+        rss = statistics.median(run["rss_mb"] for run in runs)
+        heavy = ", ".join(runs[0]["heavy"]) or "-"
+        print(f"  {name:15s} {ms:7.0f} ms  {rss:6.0f} MB peak RSS  heavy: {heavy}")
+
+    # Import the model libraries before forking in both setups, so the
+    # difference is the model alone
+    import spacy  # noqa: F401
+    from engine.utils.context_builder import UNUSED_COMPONENTS
+    from engine.utils.model_registry import ModelRegistry
+    with tempfile.TemporaryDirectory() as tmp:
+        model = args.model
+        try:
+            spacy.load(model)
+        except OSError:
+            from bench_nlp_batching import stand_in_model
+            model = stand_in_model(tmp)
+        own = ModelRegistry()
+        key = own.register_spacy(model, UNUSED_COMPONENTS)
+        loading = fork_workers(args.workers, lambda: own.get(key))
+
+        shared = ModelRegistry()
+        key = shared.register_spacy(model, UNUSED_COMPONENTS)
+        shared.preload_for_fork()
+        preloaded = fork_workers(args.workers, lambda: shared.get(key))
+
+    print(f"{args.workers} forked workers, {'stand-in' if model != args.model else model} pipeline")
+    for name, results in (("each loads its own", loading), ("preloaded in parent", preloaded)):
+        seconds = statistics.mean(r[0] for r in results) * 1000
+        private = statistics.mean(r[1] for r in results)
+        print(f"  {name:20s} model ready in {seconds:7.1f} ms, {private:6.1f} MB private per worker")
+
+if __name__ == "__main__":
+    main()
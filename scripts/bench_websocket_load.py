@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Load test for the /ws/ai websocket endpoint: many concurrent clients,
+each sending messages one after another and waiting for every reply.
+
+Usage: python scripts/bench_websocket_load.py [--clients 50] [--messages 20]
+                                              [--blocking-ms 20] [--identical]
+
+Runs a real uvicorn server (one worker) in-process on a free port with a
+throwaway memory directory. --blocking-ms adds a blocking sleep to every
+linguistic analysis as a stand-in for the spaCy parse (the model is
+optional), which is what exposes head-of-line blocking: a handler that
+blocks the event loop serializes every client behind it. --identical
+has every client send the same anonymous messages, as in a spike on a
+popular question; in-flight duplicates are coalesced by the engine.
+Messages turned away by admission control (overload frames) are retried
+after the advertised delay; latency includes the retries.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+import websockets
+
+from api.main import APIServer
+from engine.utils.context_builder import ContextBuilder
+from memory import ShardedMemoryBank
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(api: APIServer, port: int) -> Tuple[uvicorn.Server, threading.Thread]:
+    server = uvicorn.Server(uvicorn.Config(
+        api.app,
+        host="127.0.0.1", port=port, log_level="warning"
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread
+
+async def client(url: str, n: int, messages: int, latencies: list, identical: bool):
+    async with websockets.connect(url) as ws:
+        for i in range(messages):
+            start = time.perf_counter()
+            if identical:
+                message = {"message": f"question {i}"}
+            else:
+                message = {"message": f"question {i} from client {n}",
+                           "context": {"user_id": f"user{n % 10}"}}
+            await ws.send(json.dumps(message))
+            reply = json.loads(await ws.recv())
+            while reply.get("type") == "overload":
+                await asyncio.sleep(reply["retry_after_ms"] / 1000)
+                await ws.send(json.dumps(message))
+                reply = json.loads(await ws.recv())
+            if reply.get("status") != "success":
+                raise RuntimeError(f"request failed: {reply}")
+            latencies.append(time.perf_counter() - start)
+
+async def load(url: str, clients: int, messages: int, identical: bool):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(url, n, messages, latencies, identical)
+                           for n in range(clients)))
+    return time.perf_counter() - start, sorted(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--blocking-ms", type=float, default=20)
+    parser.add_argument("--identical", action="store_true",
+                        help="all clients send the same messages")
+    args = parser.parse_args()
+
+    if args.blocking_ms:
+        analyze = ContextBuilder._analyze_text
+        def slow_analyze(self, text):
+            time.sleep(args.blocking_ms / 1000)
+            return analyze(self, text)
+        ContextBuilder._analyze_text = slow_analyze
+
+    with tempfile.TemporaryDirectory() as root:
+        port = free_port()
+        api = APIServer(memory=ShardedMemoryBank(root))
+        server, thread = start_server(api, port)
+        elapsed, latencies = asyncio.run(
+            load(f"ws://127.0.0.1:{port}/ws/ai", args.clients, args.messages, args.identical)
+        )
+        server.should_exit = True
+        thread.join()  # shutdown hooks flush memory into the directory
+        coalesced = api.engine.inflight.coalesced
+        admission = api.limiter.stats() if api.limiter else None
+
+    total = len(latencies)
+    print(f"{args.clients} clients x {args.messages} messages, "
+          f"{args.blocking_ms:g} ms blocking work per query"
+          f"{', identical messages' if args.identical else ''}")
+    print(f"  throughput: {total / elapsed:8.1f} msg/s")
+    print(f"  latency p50: {statistics.median(latencies) * 1000:8.1f} ms")
+    print(f"  latency p99: {latencies[int(0.99 * (total - 1))] * 1000:8.1f} ms")
+    print(f"  coalesced:   {coalesced:8d} of {total} requests")
+    if admission:
+        print(f"  admission:   limit {admission['limit']}, {admission['queued']} queued, "
+              f"{admission['rejected']} rejected and retried")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import hashlib
+import unicodedata
+from typing import Any, Optional, Sequence, Tuple
+from .query_features import QueryFeatures, query_features
+
+
+def normalize(text: str) -> str:
+    """Unicode NFKC with runs of whitespace collapsed; case is kept"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def text_key(normalized: str) -> bytes:
+    """Hash of normalized text, used as a cache key"""
+    return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+
+
+class QueryAnalysis:
+    """Everything derived from a query's text, computed once per request.
+
+    SlickLogicEngine builds one with ``QueryAnalysis.of(query)`` before
+    its first stage. Each stage then reads the tokens, cache key or
+    keyword features from it instead of lowercasing, splitting or
+    hashing the query again. Instances are immutable. The entities come
+    from the context builder's NLP pass, so ``with_entities`` returns a
+    copy that has them.
+    """
+    __slots__ = ("text", "normalized", "lowered", "tokens", "key", "features", "intent", "entities")
+
+    def __init__(self, text: str, normalized: str, lowered: str, tokens: Tuple[str, ...],
+                 key: bytes, features: QueryFeatures, intent: str,
+                 entities: Tuple[Tuple[str, str], ...] = ()):
+        for name, value in zip(self.__slots__, (text, normalized, lowered, tokens, key,
+                                                features, intent, entities)):
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def of(cls, text: str, features: Optional[QueryFeatures] = None) -> "QueryAnalysis":
+        normalized = normalize(text)
+        features = features or query_features(text)
+        # Same tokens as the memory banks' lower().split()
+        return cls(text, normalized, features.lowered, tuple(features.lowered.split()),
+                   text_key(normalized), features, features.first("intent", "information"))
+
+    def with_entities(self, entities: Sequence[Sequence[str]]) -> "QueryAnalysis":
+        """A copy carrying the (text, label) named entities of the query"""
+        return QueryAnalysis(self.text, self.normalized, self.lowered, self.tokens, self.key,
+                             self.features, self.intent,
+                             tuple((text, label) for text, label in entities))
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"QueryAnalysis is immutable; cannot set {name!r}")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"QueryAnalysis is immutable; cannot delete {name!r}")
+
+    def __repr__(self) -> str:
+        return f"QueryAnalysis({self.text!r}, intent={self.intent!r}, tokens={len(self.tokens)})"
@@ -0,0 +1,149 @@
+import re
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+Tables = Mapping[str, Mapping[str, Sequence[str]]]
+
+# Every keyword classification of a query, as group -> label -> keywords.
+# Labels are listed in priority order: QueryFeatures.first() returns the
+# first one with a keyword in the query. Matching is by lowercase
+# substring, as the stages did with `any(k in query.lower() ...)`.
+KEYWORD_TABLES: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    # ContextBuilder: likely intent of the query
+    "intent": {
+        "instruction": ("how to", "tutorial"),
+        "explanation": ("why", "cause of"),
+        "comparison": ("compare", "vs"),
+    },
+    # InterestEnhancer: topic the query is tagged with
+    "interest": {
+        "technology": ("code", "tech", "computer"),
+        "science": ("science", "physics", "math"),
+        "art": ("art", "paint", "music"),
+        "humor": ("joke", "funny", "homer"),
+    },
+    # APIOrchestrator: technical queries go to DeepSeek first
+    "routing": {
+        "technical": ("code", "algorithm", "debug", "function", "class"),
+    },
+    # AIConnector (update/): hybrid requests pick the coding model
+    "code_request": {
+        "code": ("code", "debug", "syntax", "algorithm"),
+    },
+}
+
+
+class QueryFeatures:
+    """The keyword labels found in one query.
+
+    Built once per query by KeywordMatcher.scan(), then read by each
+    stage in place of its own keyword scan.
+    """
+    __slots__ = ("text", "lowered", "keywords", "_labels", "_tables")
+
+    def __init__(self, text: str, lowered: str, keywords: FrozenSet[str],
+                 labels: FrozenSet[Tuple[str, str]], tables: Tables):
+        self.text = text
+        self.lowered = lowered
+        self.keywords = keywords
+        self._labels = labels  # (group, label) pairs
+        self._tables = tables
+
+    def has(self, group: str, label: str) -> bool:
+        return (group, label) in self._labels
+
+    def labels(self, group: str) -> Tuple[str, ...]:
+        """Labels of ``group`` found in the query, in priority order"""
+        return tuple(label for label in self._tables[group] if (group, label) in self._labels)
+
+    def first(self, group: str, default: Optional[str] = None) -> Optional[str]:
+        """Highest-priority label of ``group`` found, else ``default``"""
+        for label in self._tables[group]:
+            if (group, label) in self._labels:
+                return label
+        return default
+
+    def __repr__(self) -> str:
+        return f"QueryFeatures({self.text!r}, {sorted(self._labels)!r})"
+
+
+class KeywordMatcher:
+    """All keywords of all tables, found in one pass over the text.
+
+    The keywords are compiled into a single regex, factored as a trie, so
+    the scan cost grows with the length of the query and not with the
+    number of keywords or groups. A regex scan does not report
+    overlapping matches, so each matched keyword also counts the
+    keywords it contains. Where a keyword could overlap the start of a
+    longer one (say "tech" and "homer" in "techomer"), the regex is
+    matched again only at those offsets.
+    """
+
+    def __init__(self, tables: Tables = KEYWORD_TABLES):
+        self.tables = tables
+        labels: Dict[str, Set[Tuple[str, str]]] = {}
+        for group, table in tables.items():
+            for label, keywords in table.items():
+                for keyword in keywords:
+                    labels.setdefault(keyword.lower(), set()).add((group, label))
+        keywords = sorted(labels)
+        self._regex = re.compile(_trie_pattern(keywords))
+        # What a match of each keyword implies, counting the keywords inside it
+        self._contained = {k: frozenset(o for o in keywords if o in k) for k in keywords}
+        self._labels = {k: frozenset().union(*(labels[o] for o in self._contained[k]))
+                        for k in keywords}
+        # Offsets inside each keyword where a longer match could start
+        self._overlaps = {k: _overlap_offsets(k, keywords) for k in keywords}
+
+    def scan(self, text: str) -> QueryFeatures:
+        lowered = text.lower()
+        keywords: Set[str] = set()
+        labels: Set[Tuple[str, str]] = set()
+        for match in self._regex.finditer(lowered):
+            found = [match.group()]
+            for offset in self._overlaps[found[0]]:
+                inner = self._regex.match(lowered, match.start() + offset)
+                if inner is not None and inner.end() > match.end():
+                    found.append(inner.group())
+            for keyword in found:
+                keywords |= self._contained[keyword]
+                labels |= self._labels[keyword]
+        return QueryFeatures(text, lowered, frozenset(keywords), frozenset(labels), self.tables)
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex matching the longest of ``keywords`` at a position"""
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def pattern(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + pattern(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:  # a keyword ends here; longer ones are tried first
+            return ("(?:" + body + ")?") if len(branches) == 1 else body + "?"
+        return body
+
+    return pattern(trie)
+
+
+def _overlap_offsets(keyword: str, keywords: Sequence[str]) -> List[int]:
+    """Offsets in ``keyword`` where another keyword could start and run past its end"""
+    return [i for i in range(1, len(keyword))
+            if any(other.startswith(keyword[i:]) and len(other) > len(keyword) - i
+                   for other in keywords)]
+
+
+_matcher: Optional[KeywordMatcher] = None
+
+
+def query_features(text: str) -> QueryFeatures:
+    """QueryFeatures of ``text`` against KEYWORD_TABLES"""
+    global _matcher
+    if _matcher is None:
+        _matcher = KeywordMatcher()
+    return _matcher.scan(text)
@@ -0,0 +1,116 @@
+import asyncio
+import unittest
+from api.admission import AdaptiveLimiter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def limiter(self, **config):
+        config = {"initial_limit": 4, "min_limit": 2, "latency_target_ms": 100,
+                  "max_queue": 2, "queue_timeout_ms": 50, **config}
+        return AdaptiveLimiter(clock=self.clock, **config)
+
+    def test_fast_answers_grow_a_busy_limit(self):
+        limiter = self.limiter()
+
+        async def run():
+            for _ in range(40):
+                await asyncio.gather(*(limiter.acquire() for _ in range(4)))
+                for _ in range(4):
+                    limiter.release(0.01)
+
+        asyncio.run(run())
+        self.assertGreater(limiter.stats()["limit"], 4)
+        self.assertGreater(limiter.increases, 0)
+
+        # An idle limit stays where it is
+        idle = self.limiter()
+        asyncio.run(idle.acquire())
+        idle.release(0.01)
+        self.assertEqual(idle.limit, 4)
+
+    def test_slow_answers_shrink_the_limit_once_per_window(self):
+        limiter = self.limiter(initial_limit=10, backoff=0.5)
+
+        async def run():
+            for _ in range(3):
+                await limiter.acquire()
+            for _ in range(3):
+                limiter.release(0.5)  # over the 100 ms target
+            self.assertEqual(limiter.limit, 5)
+            self.clock.now += 0.2
+            await limiter.acquire()
+            limiter.release(overloaded=True)
+            for _ in range(3):
+                self.clock.now += 0.2
+                await limiter.acquire()
+                limiter.release(0.5)
+
+        asyncio.run(run())
+        self.assertEqual(limiter.limit, 2)  # 10 -> 5 -> 2.5 -> min_limit
+        self.assertEqual(limiter.decreases, 2)  # whole-slot changes
+
+    def test_steadily_slow_answers_are_the_baseline(self):
+        # LLM answers of about 4 s, with the repo's admission config
+        from ai_core.config_manager import ConfigManager
+        config = dict(ConfigManager().get("admission"), initial_limit=8, clock=self.clock)
+        limiter = AdaptiveLimiter.from_config(config)
+
+        async def run():
+            for i in range(200):
+                await asyncio.gather(*(limiter.acquire() for _ in range(8)))
+                for j in range(8):
+                    self.clock.now += 0.5
+                    limiter.release(3.5 + (i + j) % 3 * 0.5)
+
+        asyncio.run(run())
+        self.assertEqual(limiter.decreases, 0)
+        self.assertGreater(limiter.limit, 8)
+        self.assertAlmostEqual(limiter.stats()["latency_baseline_ms"], 4000, delta=200)
+
+    def test_latency_climbing_past_the_baseline_shrinks_the_limit(self):
+        limiter = self.limiter(initial_limit=20, latency_target_ms=12000, short_window=5)
+
+        async def run():
+            for latency in [1.0] * 100 + [3.0] * 10:
+                self.clock.now += 1
+                await limiter.acquire()
+                limiter.release(latency)
+
+        asyncio.run(run())
+        self.assertGreater(limiter.decreases, 0)
+        self.assertLess(limiter.limit, 20)
+
+    def test_over_the_limit_requests_queue_then_get_rejected(self):
+        limiter = self.limiter(initial_limit=2)
+
+        async def run():
+            self.assertTrue(await limiter.acquire())
+            self.assertTrue(await limiter.acquire())
+            queued = [asyncio.ensure_future(limiter.acquire()) for _ in range(2)]
+            await asyncio.sleep(0)
+            self.assertEqual(limiter.queue_depth, 2)
+            self.assertFalse(await limiter.acquire())  # queue full
+            limiter.release(0.01)  # hands its slot to the first in the queue
+            self.assertTrue(await queued[0])
+            self.assertFalse(await queued[1])  # queue timeout
+            return limiter.stats()
+
+        stats = asyncio.run(run())
+        self.assertEqual((stats["inflight"], stats["queue_depth"]), (2, 0))
+        self.assertEqual((stats["admitted"], stats["queued"], stats["rejected"]), (3, 2, 2))
+
+    def test_disabled_in_config(self):
+        self.assertIsNone(AdaptiveLimiter.from_config({"enabled": False}))
+        self.assertEqual(AdaptiveLimiter.from_config({"initial_limit": 8}).stats()["limit"], 8)
+
+if __name__ == "__main__":
+    unittest.main()
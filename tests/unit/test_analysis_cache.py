@@ -0,0 +1,49 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from engine.subsystems import MemoryInterface
+from engine.utils import AnalysisCache, ContextBuilder
+from memory import MemoryBank
+
+class TestAnalysisCache(unittest.TestCase):
+    def test_lru_keyed_by_normalized_text(self):
+        cache = AnalysisCache(max_entries=2)
+        cache.put("how to  use\tPython", {"intent": "instruction"})
+        self.assertEqual(cache.get(" how to use Python "), {"intent": "instruction"})
+        self.assertIsNone(cache.get("how to use python"))  # case matters to NER
+        cache.put("b", {})
+        cache.get("how to use Python")
+        cache.put("c", {})  # evicts b, the least recently used
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats(), {"entries": 2, "hits": 2, "misses": 2, "hit_rate": 0.5})
+
+    def test_entries_survive_a_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "nlp", "cache.pkl")
+            cache = AnalysisCache(path=path)
+            cache.put("why is the sky blue", {"entities": [], "intent": "explanation"})
+            cache.save()
+            self.assertEqual(AnalysisCache(path=path).get("why is the sky blue")["intent"], "explanation")
+            self.assertEqual(len(AnalysisCache(max_entries=0, path=path)), 0)
+
+    def test_repeated_queries_skip_the_analysis(self):
+        builder = ContextBuilder({"model": "not-installed", "cache": {"enabled": True}})
+        calls = []
+        analyze = builder._analyze_text
+        builder._analyze_text = lambda text: calls.append(text) or analyze(text)
+        bank = MemoryBank(":memory:")
+        memory = MemoryInterface(bank)
+        try:
+            first = builder.build("how to sort a list", memory, {})
+            second = asyncio.run(builder.build_async("how to  sort a list", memory, {}))
+        finally:
+            bank.close()
+        self.assertEqual(calls, ["how to sort a list"])
+        self.assertEqual(first["linguistic"], second["linguistic"])
+        self.assertEqual(second["inferred"]["likely_intent"], "instruction")
+        self.assertNotIn("intent", second["linguistic"])
+        self.assertEqual(builder.cache.stats()["hits"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+import unittest
+import httpx
+import uvicorn
+from fastapi.testclient import TestClient
+from ai_core.APIOrchestrator import APIOrchestrator
+from ai_core.providers.base_provider import BaseProvider
+from api.admission import AdaptiveLimiter
+from api.main import APIServer
+from memory import ShardedMemoryBank
+
+def sse_events(lines):
+    """(event name, payload) pairs of a server-sent event stream"""
+    name = None
+    for line in lines:
+        if line.startswith("event: "):
+            name = line[len("event: "):]
+        elif line.startswith("data: "):
+            yield name, json.loads(line[len("data: "):])
+
+class SlowStream(BaseProvider):
+    """Upstream generating one word per ``delay`` seconds"""
+
+    def __init__(self, name: str, delay: float):
+        super().__init__(name)
+        self.delay = delay
+        self.closed = False
+        self.cancelled = False
+
+    def process(self, query, context=None):
+        raise NotImplementedError
+
+    async def process_async(self, query, context=None):
+        try:
+            await asyncio.sleep(self.delay * 100)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"content": query}
+
+    async def stream(self, query, context=None):
+        try:
+            for i in range(100):
+                await asyncio.sleep(self.delay)
+                yield f"word{i} "
+        finally:
+            await asyncio.sleep(0.01)  # like closing an upstream response
+            self.closed = True
+
+class TestChatAPI(unittest.TestCase):
+    def setUp(self):
+        self.server = APIServer(memory=ShardedMemoryBank(":memory:"))
+        self.client = TestClient(self.server.app)
+
+    def chat(self, message, **fields):
+        return self.client.post("/api/v1/chat", json={"message": message, **fields})
+
+    def test_engine_is_shared_and_mode_is_per_request(self):
+        first = self.chat("python decorators", mode="technical",
+                          context={"user_id": "alice"})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()["response"]["style"], "structured")
+        self.assertEqual(self.server.engine.personality.mode, "balanced")
+
+        # Same engine and memory: alice's first query is remembered
+        second = self.chat("python generators", context={"user_id": "alice"})
+        self.assertEqual(second.json()["response"]["style"], "neutral")
+        self.assertEqual(second.json()["context"]["memory"]["related_queries"],
+                         ["python decorators"])
+        other = self.chat("python generators", context={"user_id": "bob"})
+        self.assertEqual(other.json()["context"]["memory"]["related_queries"], [])
+
+    def test_invalid_mode_is_rejected(self):
+        self.assertEqual(self.chat("hello", mode="sarcastic").status_code, 400)
+
+    def test_system_mode_sets_the_default(self):
+        response = self.client.post("/api/v1/system/mode", json={"mode": "creative"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.chat("hello").json()["response"]["style"], "expressive")
+        self.assertEqual(self.chat("hello", mode="balanced").json()["response"]["style"],
+                         "neutral")
+
+    def test_websocket_streams_deltas_then_a_final_frame(self):
+        with self.client.websocket_connect("/ws/ai") as ws:
+            ws.send_json({"message": "hello there", "stream": True,
+                          "context": {"user_id": "alice"}})
+            frames = []
+            while not frames or frames[-1]["type"] != "final":
+                frames.append(ws.receive_json())
+        deltas = frames[:-1]
+        self.assertTrue(deltas and all(f["type"] == "delta" for f in deltas))
+        final = frames[-1]
+        self.assertEqual(final["status"], "success")
+        self.assertEqual("".join(f["content"] for f in deltas if f["source"] == "openai"),
+                         "OpenAI(gpt-4-turbo): hello there")
+        self.assertIn("openai", final["response"]["answer"]["sources"])
+
+    def test_sse_streams_each_stage(self):
+        with self.client.stream("POST", "/api/v1/chat/stream",
+                                json={"message": "hello there", "mode": "technical"}) as response:
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+            events = list(sse_events(response.iter_lines()))
+        names = [name for name, _ in events]
+        self.assertEqual(names[:2], ["context", "personality"])
+        self.assertEqual(set(names[2:-1]), {"delta"})
+        self.assertEqual(names[-1], "final")
+        self.assertEqual(events[1][1]["response"]["style"], "structured")
+        self.assertEqual(events[-1][1]["status"], "success")
+        self.assertEqual(self.chat("hi", mode="sarcastic").status_code, 400)
+
+    def test_sse_disconnect_stops_the_providers(self):
+        orchestrator = APIOrchestrator()
+        orchestrator.openai, orchestrator.deepseek = SlowStream("openai", 0.02), SlowStream("deepseek", 0.02)
+        orchestrator.cache = None
+        app = APIServer(memory=ShardedMemoryBank(":memory:"), orchestrator=orchestrator).app
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+        try:
+            while not server.started:
+                time.sleep(0.01)
+            with httpx.stream("POST", f"http://127.0.0.1:{port}/api/v1/chat/stream",
+                              json={"message": "hello"}) as response:
+                for name, _ in sse_events(response.iter_lines()):
+                    if name == "delta":
+                        break
+            primary, secondary = orchestrator.openai, orchestrator.deepseek
+            deadline = time.time() + 2
+            while not (primary.closed and secondary.cancelled) and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(primary.closed)
+            self.assertTrue(secondary.cancelled)
+        finally:
+            server.should_exit = True
+
+    def test_performance_reports_coalescing(self):
+        self.chat("hello")
+        report = self.client.get("/api/v1/system/performance").json()
+        self.assertEqual(report["coalescing"], {"calls": 1, "coalesced": 0, "inflight": 0})
+        self.assertEqual(report["admission"]["admitted"], 1)
+
+    def test_requests_over_the_limit_are_turned_away(self):
+        orchestrator = APIOrchestrator()
+        orchestrator.openai, orchestrator.deepseek = SlowStream("openai", 0.005), SlowStream("deepseek", 0.005)
+        orchestrator.cache = None
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1, max_queue=0)
+        server = APIServer(memory=ShardedMemoryBank(":memory:"), orchestrator=orchestrator,
+                           limiter=limiter)
+        with TestClient(server.app) as client, client.websocket_connect("/ws/ai") as busy:
+            busy.send_json({"message": "hello", "stream": True})
+            self.assertEqual(busy.receive_json()["type"], "delta")  # holds the only slot
+
+            response = client.post("/api/v1/chat", json={"message": "hi"})
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response.headers["retry-after"], "1")
+            with client.websocket_connect("/ws/ai") as other:
+                other.send_json({"message": "hi"})
+                self.assertEqual(other.receive_json()["type"], "overload")
+
+            while busy.receive_json()["type"] != "final":
+                pass
+            self.assertEqual(client.post("/api/v1/chat", json={"message": "hi"}).status_code, 200)
+        self.assertEqual(limiter.stats()["rejected"], 2)
+        self.assertEqual(limiter.stats()["inflight"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import time
+import unittest
+from engine import SlickLogicEngine
+from memory import MemoryBank
+
+class SlowMemory(MemoryBank):
+    """Blocking lookups, like a large history or a cold page cache"""
+
+    def get_context(self, query, limit=3, ranking="overlap", tokens=None):
+        time.sleep(0.1)
+        return super().get_context(query, limit, ranking, tokens)
+
+class TestAsyncEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = SlickLogicEngine(SlowMemory(":memory:"))
+        # Trying to load the NLP model is not what the timings measure
+        self.engine.warm_up()
+
+    def test_concurrent_queries_do_not_block_the_loop(self):
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticking = asyncio.create_task(ticker())
+            start = time.perf_counter()
+            results = await asyncio.gather(*(
+                self.engine.process_query_async(f"question {i}", mode="technical")
+                for i in range(4)
+            ))
+            elapsed = time.perf_counter() - start
+            ticking.cancel()
+            return results, elapsed, ticks
+
+        results, elapsed, ticks = asyncio.run(run())
+        self.assertEqual([r["status"] for r in results], ["success"] * 4)
+        self.assertEqual(results[0]["response"]["style"], "structured")
+        # Lookups overlap instead of running back to back (4 x 0.1s)
+        self.assertLess(elapsed, 0.3)
+        self.assertGreater(ticks, 5)
+        self.assertEqual(len(self.engine.memory.entries), 4)
+
+    def test_identical_inflight_queries_are_coalesced(self):
+        async def run():
+            return await asyncio.gather(
+                *(self.engine.process_query_async("what is a monad", {"user_id": "alice"})
+                  for _ in range(5)),
+                self.engine.process_query_async("what is a monad", {"user_id": "bob"}),
+                self.engine.process_query_async("what is a monad", {"user_id": "alice"},
+                                                mode="technical")
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual([r.get("coalesced", False) for r in results],
+                         [False, True, True, True, True, False, False])
+        self.assertEqual(results[1]["response"], results[0]["response"])
+        # One computation, so one stored interaction per distinct request
+        self.assertEqual(len(self.engine.memory.entries), 3)
+        self.assertEqual(self.engine.get_performance_report()["coalescing"],
+                         {"calls": 7, "coalesced": 4, "inflight": 0})
+
+        # Finished queries are not replayed
+        again = asyncio.run(self.engine.process_query_async("what is a monad", {"user_id": "alice"}))
+        self.assertNotIn("coalesced", again)
+
+    def test_different_anonymous_contexts_are_not_coalesced(self):
+        async def run():
+            return await asyncio.gather(
+                self.engine.process_query_async("what is a monad", {"name": "first client"}),
+                self.engine.process_query_async("what is a monad", {"name": "second client"}),
+                self.engine.process_query_async("what is a monad", {"name": "second client"})
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual([r.get("coalesced", False) for r in results], [False, False, True])
+        self.assertEqual([r["context"]["user"]["name"] for r in results],
+                         ["first client", "second client", "second client"])
+
+    def test_errors_are_reported_like_process_query(self):
+        result = asyncio.run(self.engine.process_query_async("hello", mode="sarcastic"))
+        self.assertEqual(result["status"], "error")
+        self.assertIn("Invalid mode", result["message"])
+
+if __name__ == "__main__":
+    unittest.main()
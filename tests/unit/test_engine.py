@@ -8,15 +8,23 @@ class TestEngine(unittest.TestCase):
         self.engine = SlickLogicEngine(self.memory)
 
     def test_mode_switching(self):
-        self.assertTrue(self.engine.set_mode("technical"))
-        self.assertEqual(self.engine.mode, "technical")
+        self.engine.set_personality_mode("technical")
+        self.assertEqual(self.engine.personality.mode, "technical")
         with self.assertRaises(ValueError):
-            self.engine.set_mode("invalid_mode")
+            self.engine.set_personality_mode("invalid_mode")
+        self.assertEqual(self.engine.personality.mode, "technical")
 
     def test_processing(self):
-        result = self.engine.process("test query")
+        result = self.engine.process_query("test query")
         self.assertEqual(result["status"], "success")
-        self.assertIn("test query", result["response"])
+        self.assertEqual(result["mode"], "balanced")
+        self.assertIn("test query", result["response"]["content"])
+
+    def test_per_query_mode_leaves_the_default(self):
+        result = self.engine.process_query("test query", mode="technical")
+        self.assertEqual(result["mode"], "technical")
+        self.assertEqual(self.engine.personality.mode, "balanced")
+        self.assertEqual(self.engine.process_query("test query", mode="invalid_mode")["status"], "error")
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,522 @@
+import io
+import pickle
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from memory.MemoryBank import MemoryBank
+from memory.columnar import EntryColumns
+from memory.eviction import EvictionPolicy
+from memory.sharded import ShardedMemoryBank
+from memory.sqlite_bank import SQLiteMemoryBank
+
+class TestMemoryBank(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "memory.db"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_store_appends_segments_and_replays(self):
+        memory = MemoryBank(str(self.path), segment_records=2, compact_segments=100)
+        for i in range(5):
+            memory.store(f"question {i}", {"content": i})
+        memory.flush()
+        memory._log.close()
+
+        self.assertFalse(self.path.exists())
+        self.assertEqual(len(memory._log.segments()), 3)
+        reloaded = MemoryBank(str(self.path))
+        self.assertEqual([e["result"]["content"] for e in reloaded.entries], list(range(5)))
+
+    def test_compaction_persists_access_counts(self):
+        memory = MemoryBank(str(self.path), segment_records=2, compact_segments=100)
+        memory.store("python decorators", {"content": "a"})
+        memory.store("quantum physics", {"content": "b"})
+        memory.get_context("python")
+        memory.close()
+
+        self.assertEqual(memory._log.segments(), [])
+        reloaded = MemoryBank(str(self.path))
+        self.assertEqual(reloaded.entries[0]["access_count"], 1)
+
+    def test_close_waits_for_background_compaction(self):
+        memory = MemoryBank(str(self.path), segment_records=1, compact_segments=100)
+        for i in range(3):
+            memory.store(f"question {i}", {})
+        output = io.StringIO()
+        with redirect_stdout(output):
+            with memory._save_lock:
+                closer = threading.Thread(target=memory.close)
+                closer.start()
+                time.sleep(0.05)
+                # Asked for while close() waits to save, as the writer
+                # thread does when it seals a segment
+                memory.compact(wait=False)
+                time.sleep(0.05)
+            closer.join(5)
+            if memory._compactor is not None:
+                memory._compactor.join(5)
+
+        self.assertNotIn("Memory save error", output.getvalue())
+        self.assertTrue(memory.entries.snapshot._mm.closed)
+        self.assertEqual(memory._log.segments(), [])
+        self.assertEqual(len(MemoryBank(str(self.path)).entries), 3)
+
+    def test_store_is_locked_against_other_processes(self):
+        opener = ("import sys; from memory.log_store import LogStore, StoreLockedError\n"
+                  "try:\n    LogStore(sys.argv[1]).load()\n"
+                  "except StoreLockedError:\n    sys.exit(3)")
+
+        def open_elsewhere():
+            return subprocess.run([sys.executable, "-c", opener, str(self.path)],
+                                  cwd=Path(__file__).resolve().parents[2]).returncode
+
+        memory = MemoryBank(str(self.path))
+        memory.store("question", {})
+        memory.flush()
+        # Other stores in this process share the lock
+        reader = MemoryBank(str(self.path), write_behind=False)
+        self.assertEqual(len(reader.entries), 1)
+        self.assertEqual(open_elsewhere(), 3)
+        memory.close()
+        self.assertEqual(open_elsewhere(), 3)
+        reader.close()
+        self.assertEqual(open_elsewhere(), 0)
+
+    def test_write_behind_group_commit(self):
+        memory = MemoryBank(str(self.path), flush_every=3, flush_interval_ms=60000)
+        memory.store("first", {})
+        memory.store("second", {})
+        self.assertEqual(len(MemoryBank(str(self.path), write_behind=False).entries), 0)
+        memory.store("third", {})  # reaches flush_every
+        memory.store("fourth", {})
+        memory.flush()
+        reloaded = MemoryBank(str(self.path), write_behind=False)
+        self.assertEqual([e["query"] for e in reloaded.entries],
+                         ["first", "second", "third", "fourth"])
+        memory.store("fifth", {})
+        memory.close()
+        self.assertEqual(len(MemoryBank(str(self.path)).entries), 5)
+
+    def test_snapshot_is_mapped_and_decoded_lazily(self):
+        memory = MemoryBank(str(self.path), segment_records=3, compact_segments=100)
+        for i in range(10):
+            memory.store(f"topic{i % 3} question {i}", {"content": i})
+        memory.get_context("topic1", limit=1)
+        memory.compact()
+        # Still usable after the snapshot is swapped in underneath
+        memory.store("topic1 late", {"content": 10})
+        self.assertEqual(memory.entries.head, 10)
+        self.assertEqual(memory.get_context("late")[0]["result"], {"content": 10})
+        memory.close()
+
+        reloaded = MemoryBank(str(self.path), cache_size=2)
+        self.assertEqual(len(reloaded.entries), 11)
+        self.assertEqual(len(reloaded.entries._cache), 0)
+        top = reloaded.get_context("topic1", limit=1)[0]
+        self.assertEqual((top["query"], top["access_count"]), ("topic1 question 1", 2))
+        self.assertEqual(len(reloaded.entries._cache), 1)
+        for i in range(10):
+            reloaded.entries[i]
+        self.assertEqual(len(reloaded.entries._cache), 2)
+        self.assertEqual(reloaded.entries.access_count(1), 2)
+
+    def test_torn_tail_record_is_ignored(self):
+        memory = MemoryBank(str(self.path), compact_segments=100)
+        memory.store("first", {})
+        memory.store("second", {})
+        memory.flush()
+        memory._log.close()
+        _, segment = memory._log.segments()[-1]
+        segment.write_bytes(segment.read_bytes()[:-3])
+
+        reloaded = MemoryBank(str(self.path))
+        self.assertEqual([e["query"] for e in reloaded.entries], ["first"])
+        reloaded.store("third", {})
+        reloaded.flush()
+        reloaded._log.close()
+        self.assertEqual([e["query"] for e in MemoryBank(str(self.path)).entries],
+                         ["first", "third"])
+
+    def test_loads_legacy_pickle(self):
+        legacy = [{"timestamp": "2025-06-18T16:01:44", "query": "what is AI?",
+                   "result": "D'oh!", "access_count": 1}]
+        with open(self.path, "wb") as f:
+            pickle.dump(legacy, f)
+        self.assertEqual(list(MemoryBank(str(self.path)).entries), legacy)
+
+    def test_index_matches_full_scan(self):
+        memory = MemoryBank(":memory:")
+        words = ["python", "code", "quantum", "physics", "art", "music"]
+        for i in range(60):
+            memory.store(f"{words[i % 6]} {words[(i * 5) % 6]} q{i}", {})
+        for query in ["python art", "Physics", "music code", "unknown"]:
+            expected = sorted(
+                [e for e in memory.entries if memory._is_relevant(e, query)],
+                key=lambda x: x["access_count"], reverse=True
+            )[:4]
+            self.assertEqual(memory.get_context(query, limit=4), expected)
+
+    def test_index_rebuilt_on_load(self):
+        memory = MemoryBank(str(self.path))
+        memory.store("Explain Python decorators", {})
+        memory.flush()
+        memory._log.close()
+        reloaded = MemoryBank(str(self.path))
+        self.assertEqual(len(reloaded.get_context("python")), 1)
+
+    def test_bm25_ranking_prefers_relevant_over_popular(self):
+        memory = MemoryBank(":memory:")
+        memory.store("what is the weather", {})
+        memory.store("what is quantum entanglement", {})
+        memory.entries[0]["access_count"] = 10
+        self.assertEqual(memory.get_context("what is entanglement", limit=1)[0]["query"],
+                         "what is the weather")
+        ranked = memory.get_context("what is entanglement", limit=1, ranking="bm25")
+        self.assertEqual(ranked[0]["query"], "what is quantum entanglement")
+        # Entries stored after the ranker exists are indexed incrementally
+        memory.store("entanglement entanglement swapping", {})
+        ranked = memory.get_context("entanglement swapping", limit=2, ranking="bm25")
+        self.assertEqual(ranked[0]["query"], "entanglement entanglement swapping")
+        with self.assertRaises(ValueError):
+            memory.get_context("what", ranking="popular")
+
+    def test_max_entries_evicts_least_accessed(self):
+        archive = Path(self.tmp.name) / "memory.archive"
+        policy = EvictionPolicy(max_entries=3, order="least_accessed", archive_path=str(archive))
+        memory = MemoryBank(str(self.path), eviction=policy)
+        for word in ["alpha", "beta", "gamma"]:
+            memory.store(f"{word} question", {})
+        memory.get_context("alpha")
+        memory.get_context("gamma")
+        memory.store("delta question", {})
+
+        self.assertIsNone(memory.entries[1])
+        self.assertEqual(memory.get_context("beta"), [])
+        self.assertEqual(len(memory.get_context("question", limit=10)), 3)
+        memory.close()
+
+        reloaded = MemoryBank(str(self.path))
+        self.assertEqual([e["query"] for e in reloaded.entries if e is not None],
+                         ["alpha question", "gamma question", "delta question"])
+        archived = [r["query"] for _, seg in memory._archive.segments()
+                    for r in memory._archive._read_segment(seg)]
+        self.assertEqual(archived, ["beta question"])
+
+    def test_evictions_are_archived_off_the_store_path(self):
+        archive = Path(self.tmp.name) / "memory.archive"
+        policy = EvictionPolicy(max_entries=1, archive_path=str(archive))
+        memory = MemoryBank(str(self.path), eviction=policy,
+                            flush_every=1000, flush_interval_ms=60000)
+        on_disk = lambda: [r["query"] for _, seg in memory._archive.segments()
+                           for r in memory._archive._read_segment(seg)]
+        for word in ["alpha", "beta", "gamma"]:
+            memory.store(f"{word} question", {})
+        # Queued by store(), written by the archive's writer thread
+        self.assertEqual(on_disk(), [])
+        memory.flush()
+        self.assertEqual(on_disk(), ["alpha question", "beta question"])
+        memory.close()
+
+    def test_ttl_and_byte_budget(self):
+        memory = MemoryBank(":memory:", eviction=EvictionPolicy(ttl_seconds=3600))
+        memory.entries.append({"timestamp": "2020-01-01T00:00:00", "query": "stale",
+                               "result": {}, "access_count": 5})
+        memory.store("fresh", {})
+        self.assertEqual([e["query"] for e in memory.entries if e is not None], ["fresh"])
+
+        memory = MemoryBank(":memory:", eviction=EvictionPolicy(max_bytes=400))
+        for i in range(20):
+            memory.store(f"query {i}", {"content": "x" * 50})
+        live = [e for e in memory.entries if e is not None]
+        self.assertLess(len(live), 20)
+        self.assertEqual(live[-1]["query"], "query 19")
+        self.assertLessEqual(memory.eviction._bytes, 400)
+
+    def test_in_memory_bank_never_touches_disk(self):
+        memory = MemoryBank(":memory:")
+        memory.store("test query", {})
+        memory.close()
+        self.assertEqual(len(memory.get_context("test")), 1)
+
+    def test_columnar_entries_round_trip(self):
+        entries = [
+            {"timestamp": "2024-05-01T12:30:45.123456", "query": "héllo wörld",
+             "result": {"content": "a"}, "access_count": 3},
+            {"timestamp": "2024-05-01T12:30:45", "query": "", "result": None,
+             "access_count": 0},
+            {"timestamp": "2024-05-01T12:30:45+02:00", "query": "aware",
+             "result": [1], "access_count": 1},
+        ]
+        columns = EntryColumns(entries)
+        columns.drop(0)
+        for row, entry in enumerate(entries):
+            self.assertEqual({k: columns.field(row, k) for k in entry}, entry)
+        self.assertEqual(columns.timestamps.data.dtype.name, "int64")
+        self.assertEqual(columns.access_counts.data.dtype.name, "int32")
+
+        columns.delete(1)
+        columns.drop(2)
+        self.assertEqual(len(columns), 1)
+        self.assertEqual(columns.field(0, "timestamp"), "2024-05-01T12:30:45+02:00")
+        self.assertEqual(columns.query(0), "aware")
+
+    def test_entries_are_views_over_columns(self):
+        memory = MemoryBank(":memory:")
+        memory.store("python decorators", {"content": "a"})
+        view = memory.entries[0]
+        self.assertEqual(view["query"], "python decorators")
+        view["access_count"] = 5
+        self.assertEqual(memory.entries.access_count(0), 5)
+        with self.assertRaises(TypeError):
+            view["query"] = "changed"
+
+        context = memory.get_context("python")
+        self.assertIs(type(context[0]), dict)
+        self.assertEqual(context[0]["access_count"], 6)
+        self.assertEqual(view["access_count"], 6)
+
+    def test_access_counts_survive_rebase(self):
+        memory = MemoryBank(str(self.path), segment_records=2, compact_segments=100)
+        for i in range(4):
+            memory.store(f"question {i}", {"content": i})
+        memory.compact()
+        memory.get_context("question", limit=2)
+        memory.store("question 4", {"content": 4})
+        memory.get_context("question", limit=1)
+        counts = [memory.entries.access_count(i) for i in range(5)]
+        memory.compact()
+        self.assertEqual(memory.entries.head, 5)
+        self.assertEqual([memory.entries.access_count(i) for i in range(5)], counts)
+        memory.close()
+        reloaded = MemoryBank(str(self.path))
+        self.assertEqual([reloaded.entries.access_count(i) for i in range(5)], counts)
+
+    def test_from_config_reads_the_repo_memory_section(self):
+        from ai_core.config_manager import ConfigManager
+        config = dict(ConfigManager().get("memory"), storage_path=str(self.path))
+        config["eviction"] = dict(config["eviction"], archive_path=str(self.path) + ".archive")
+        memory = MemoryBank.from_config(config)
+        memory.store("hello", {"content": "world"})
+        self.assertEqual(memory.eviction.max_entries, config["eviction"]["max_entries"])
+        memory.close()
+
+class TestMemoryBankConcurrency(unittest.TestCase):
+    THREADS = 16
+    OPS = 300
+
+    def test_stress_store_and_get_context(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "memory.db")
+            memory = MemoryBank(path, segment_records=50, compact_segments=2, cache_size=32)
+            hits = [0] * self.THREADS
+            errors = []
+
+            def worker(n):
+                try:
+                    for i in range(self.OPS):
+                        memory.store(f"worker{n} item{i} shared", {"n": n, "i": i})
+                        ranking = "bm25" if i % 10 == 0 else "overlap"
+                        hits[n] += len(memory.get_context(f"item{i} other", limit=5,
+                                                          ranking=ranking))
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=worker, args=(n,)) for n in range(self.THREADS)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+
+            self.assertEqual(errors, [])
+            ops = 2 * self.THREADS * self.OPS
+            self.assertGreater(ops / elapsed, 500, f"{ops / elapsed:.0f} ops/s")
+            expected = {f"worker{n} item{i} shared"
+                        for n in range(self.THREADS) for i in range(self.OPS)}
+            for bank in (memory, None):
+                if bank is None:
+                    memory.close()
+                    bank = MemoryBank(path)
+                queries = [bank.entries.query(i) for i in range(len(bank.entries))]
+                self.assertEqual(len(queries), len(expected))
+                self.assertEqual(set(queries), expected)
+                total = sum(bank.entries.access_count(i) for i in range(len(bank.entries)))
+                self.assertEqual(total, sum(hits), "live" if bank is memory else "reloaded")
+
+class TestShardedMemoryBank(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / "shards"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_tenants_only_see_their_own_history(self):
+        memory = ShardedMemoryBank(str(self.root))
+        memory.store("python decorators", {"content": "alice"}, tenant="alice")
+        memory.store("python generators", {"content": "bob"}, tenant="bob")
+        memory.store("python basics", {"content": "anon"})
+
+        context = memory.get_context("python", limit=5, tenant="alice")
+        self.assertEqual([e["result"]["content"] for e in context], ["alice"])
+        self.assertEqual(len(memory.get_context("python", limit=5)), 1)
+        self.assertEqual(sorted(p.name for p in self.root.iterdir()),
+                         ["alice", "bob", "default"])
+        memory.close()
+
+    def test_idle_shards_are_closed_and_reopened(self):
+        memory = ShardedMemoryBank(str(self.root), max_open=2)
+        for tenant in ("a", "b", "c"):
+            memory.store(f"question for {tenant}", {}, tenant=tenant)
+        self.assertEqual(memory.open_shards, ["b", "c"])
+
+        memory.get_context("question", tenant="a")
+        self.assertEqual(memory.open_shards, ["c", "a"])
+        self.assertEqual(memory.get_context("question", tenant="a")[0]["access_count"], 2)
+        memory.close()
+
+        reloaded = ShardedMemoryBank(str(self.root))
+        self.assertEqual(reloaded.get_context("question", tenant="b")[0]["query"],
+                         "question for b")
+
+    def test_pinned_shard_is_not_closed(self):
+        memory = ShardedMemoryBank(str(self.root), max_open=1)
+        with memory.shard("a") as bank:
+            memory.store("other tenant", {}, tenant="b")
+            self.assertEqual(memory.open_shards, ["a"])
+            bank.store("still open", {})
+        self.assertEqual(memory.open_shards, ["a"])
+        memory.close()
+
+    def test_legacy_store_is_imported_into_the_default_shard_once(self):
+        legacy = Path(self.tmp.name) / "memory.db"
+        old = MemoryBank(str(legacy), segment_records=1)
+        old.store("python history", {"content": "compacted"})
+        old.compact()
+        old.store("python notes", {"content": "in a segment"})
+        old.flush()
+        old._log.close()
+        self.assertEqual(len(old._log.segments()), 1)
+
+        memory = ShardedMemoryBank(str(self.root), legacy_path=str(legacy))
+        self.assertEqual(len(memory.get_context("python", limit=5)), 2)
+        self.assertEqual(memory.get_context("python", tenant="alice"), [])
+        memory.store("python new", {})
+        memory.close()
+
+        reopened = ShardedMemoryBank(str(self.root), legacy_path=str(legacy))
+        self.assertEqual(len(reopened.get_context("python", limit=5)), 3)
+        self.assertTrue(legacy.exists())
+        self.assertEqual(sorted(p.name for p in self.root.iterdir()), ["alice", "default"])
+        reopened.close()
+
+    def test_legacy_import_does_not_block_other_tenants(self):
+        legacy = Path(self.tmp.name) / "memory.db"
+        old = MemoryBank(str(legacy))
+        old.store("python history", {})
+        old.close()
+
+        memory = ShardedMemoryBank(str(self.root), legacy_path=str(legacy))
+        copying, done = threading.Event(), threading.Event()
+        copy = memory._copy_legacy
+
+        def slow_copy(shard_dir):
+            copying.set()
+            done.wait(5)
+            copy(shard_dir)
+        memory._copy_legacy = slow_copy
+        anonymous = threading.Thread(target=memory.get_context, args=("python",))
+        anonymous.start()
+        copying.wait(5)
+        memory.store("python typing", {}, tenant="alice")
+        self.assertEqual(len(memory.get_context("python", tenant="alice")), 1)
+        self.assertTrue(anonymous.is_alive())
+        done.set()
+        anonymous.join(5)
+        self.assertEqual(len(memory.get_context("python")), 1)
+        memory.close()
+
+    def test_tenant_ids_cannot_escape_root(self):
+        name = ShardedMemoryBank.shard_name("../../etc")
+        self.assertRegex(name, r"^t-[0-9a-f]{32}$")
+        self.assertEqual(ShardedMemoryBank.shard_name(name), name)
+        self.assertEqual(ShardedMemoryBank.shard_name("user_42"), "user_42")
+
+    def test_from_config_applies_eviction_per_shard(self):
+        memory = ShardedMemoryBank.from_config({
+            "storage_path": "ignored.db",
+            "eviction": {"max_entries": 1, "archive_path": "data/memory.archive"},
+            "shards": {"root": str(self.root), "max_open": 4}
+        })
+        for tenant in ("a", "b"):
+            memory.store("first", {}, tenant=tenant)
+            memory.store("second", {}, tenant=tenant)
+        for tenant in ("a", "b"):
+            with memory.shard(tenant) as bank:
+                self.assertEqual([e["query"] for e in bank.entries if e is not None], ["second"])
+        memory.close()
+        self.assertTrue(list((self.root / "a").glob("memory.archive.*.seg")))
+
+class TestSQLiteMemoryBank(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name) / "memory.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fts_ranking_and_shape(self):
+        memory = SQLiteMemoryBank(self.path)
+        memory.store("what is the weather", {"content": "sunny"})
+        memory.store("quantum entanglement", {"content": "spooky action at a distance"})
+        context = memory.get_context("explain entanglement?", limit=3)
+        self.assertEqual(len(context), 1)
+        self.assertEqual(context[0]["query"], "quantum entanglement")
+        self.assertEqual(context[0]["result"], {"content": "spooky action at a distance"})
+        self.assertEqual(context[0]["access_count"], 1)
+        # Results are indexed too
+        self.assertEqual(memory.get_context("sunny")[0]["query"], "what is the weather")
+        self.assertEqual(memory.get_context("?"), [])
+        memory.close()
+
+    def test_rankings_match_memory_bank(self):
+        memory = SQLiteMemoryBank(self.path, batch_size=100)
+        bank = MemoryBank(":memory:")
+        for query in ["python", "python decorators python", "python typing"]:
+            memory.store(query, {})
+            bank.store(query, {})
+        for backend in (memory, bank):
+            backend.get_context("typing", limit=1, ranking="overlap")
+            overlap = backend.get_context("python", 2, "overlap")
+            self.assertEqual([c["query"] for c in overlap], ["python typing", "python"])
+            bm25 = backend.get_context("decorators python", limit=1, ranking="bm25")
+            self.assertEqual(bm25[0]["query"], "python decorators python")
+            with self.assertRaises(ValueError):
+                backend.get_context("python", ranking="popular")
+        memory.close()
+
+    def test_access_counts_are_batched_and_shared(self):
+        writer = SQLiteMemoryBank(self.path, batch_size=3)
+        writer.store("python decorators", {})
+        reader = SQLiteMemoryBank(self.path)
+        self.assertEqual(len(reader.get_context("python")), 1)
+
+        writer.get_context("python")
+        writer.get_context("python")
+        count = "SELECT access_count FROM memories"
+        self.assertEqual(reader.conn.execute(count).fetchone()[0], 0)
+        self.assertEqual(writer.get_context("python")[0]["access_count"], 3)
+        self.assertEqual(reader.conn.execute(count).fetchone()[0], 3)
+        reader.close()
+        writer.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+import unittest
+from engine.utils import ContextBuilder, ModelRegistry
+
+class TestModelRegistry(unittest.TestCase):
+    def test_models_load_once_on_first_use(self):
+        registry = ModelRegistry()
+        loads = []
+        key = registry.register("counter", lambda: loads.append(1) or object())
+        self.assertFalse(registry.is_loaded(key))
+        self.assertIs(registry.get(key), registry.get(key))
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(registry.stats()["registered"], ["counter"])
+
+    def test_failed_loads_are_not_retried(self):
+        registry = ModelRegistry()
+        attempts = []
+
+        def broken():
+            attempts.append(1)
+            raise OSError("model not installed")
+
+        registry.register("broken", broken)
+        registry.register("fine", object)
+        self.assertEqual(registry.warm_up(), ["broken"])
+        with self.assertRaises(OSError):
+            registry.get("broken")
+        self.assertEqual(len(attempts), 1)
+        self.assertTrue(registry.is_loaded("fine"))
+        self.assertEqual(registry.stats()["failed"], ["broken"])
+
+    def test_context_builder_loads_its_model_lazily(self):
+        builder = ContextBuilder({"model": "not-installed"})
+        self.assertFalse(builder._loaded)
+        self.assertEqual(builder._analyze_text("hello")["entities"], [])
+        self.assertTrue(builder._loaded)
+        self.assertIsNone(builder.nlp)
+
+    def test_importing_the_engine_skips_heavy_libraries(self):
+        code = ("import sys, engine, main; "
+                "print(sorted(m for m in ('pandas', 'sklearn', 'spacy', 'fastapi') if m in sys.modules))")
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip().splitlines()[-1], "[]")
+
+if __name__ == "__main__":
+    unittest.main()
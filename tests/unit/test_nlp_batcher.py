@@ -0,0 +1,72 @@
+import asyncio
+import tempfile
+import unittest
+import spacy
+from engine.subsystems import MemoryInterface
+from engine.utils import BatchAnalyzer, ContextBuilder
+from engine.utils.context_builder import linguistic_features
+from memory import MemoryBank
+
+def save_pipeline(path: str):
+    """Small stand-in for en_core_web_sm: tokenizer plus an entity ruler"""
+    nlp = spacy.blank("en")
+    nlp.add_pipe("entity_ruler").add_patterns([{"label": "LANG", "pattern": "Python"}])
+    nlp.to_disk(path)
+
+class TestBatchAnalyzer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.model = cls.tmp.name
+        save_pipeline(cls.model)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_concurrent_queries_share_a_batch(self):
+        builder = ContextBuilder({"model": self.model, "batching": {"max_wait_ms": 50}})
+        bank = MemoryBank(":memory:")
+        memory = MemoryInterface(bank)
+        queries = [f"is Python good for task {i}" for i in range(8)]
+
+        async def run():
+            return await asyncio.gather(*(builder.build_async(q, memory, {}) for q in queries))
+
+        try:
+            contexts = asyncio.run(run())
+            stats = builder.analyzer.stats()
+        finally:
+            builder.close()
+            bank.close()
+        self.assertEqual(contexts[3]["linguistic"]["entities"], [("Python", "LANG")])
+        self.assertEqual(stats["docs"], 8)
+        self.assertLess(stats["batches"], 8)
+
+    def test_batches_match_single_documents(self):
+        nlp = spacy.load(self.model)
+        analyzer = BatchAnalyzer(nlp, linguistic_features, max_wait_ms=20)
+        texts = ["Python lists", "no entities here", "Python and Python"]
+        try:
+            futures = [analyzer.submit(text) for text in texts]
+            results = [future.result(timeout=5) for future in futures]
+        finally:
+            analyzer.close()
+        self.assertEqual(results, [linguistic_features(nlp(text)) for text in texts])
+        self.assertEqual(analyzer.stats()["batches"], 1)
+
+    def test_worker_processes_load_the_model(self):
+        analyzer = BatchAnalyzer(None, linguistic_features, processes=1, model=self.model)
+        try:
+            result = analyzer.submit("Python workers").result(timeout=60)
+        finally:
+            analyzer.close()
+        self.assertEqual(result["entities"], [("Python", "LANG")])
+
+    def test_disabled_in_config(self):
+        builder = ContextBuilder({"model": self.model, "batching": {"enabled": False}})
+        self.assertIsNone(builder.analyzer)
+        self.assertEqual(builder._analyze_text("Python")["entities"], [("Python", "LANG")])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,322 @@
+import asyncio
+import time
+import unittest
+from ai_core.APIOrchestrator import APIOrchestrator
+from ai_core.providers.base_provider import BaseProvider
+from ai_core.providers.hedging import HedgedProvider
+from ai_core.providers.latency import LatencyHistogram
+from ai_core.utils.response_cache import ResponseCache
+
+class DelayedProvider(BaseProvider):
+    """Local stand-in for an upstream API answering after ``delay`` seconds"""
+
+    def __init__(self, name: str, delay: float, fail: bool = False):
+        super().__init__(name)
+        self.delay = delay
+        self.fail = fail
+        self.cancelled = False
+
+    def process(self, query, context=None):
+        time.sleep(self.delay)
+        return self._answer(query)
+
+    async def process_async(self, query, context=None):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self._answer(query)
+
+    def _answer(self, query):
+        if self.fail:
+            raise ConnectionError(f"{self.provider_name} unavailable")
+        return {"content": f"{self.provider_name}: {query}", "confidence": 0.8}
+
+class ScriptedProvider(DelayedProvider):
+    """Call n takes delays[n % len(delays)] seconds"""
+
+    def __init__(self, name: str, delays):
+        super().__init__(name, 0)
+        self.delays = delays
+        self.calls = 0
+
+    async def process_async(self, query, context=None):
+        self.delay = self.delays[self.calls % len(self.delays)]
+        self.calls += 1
+        return await super().process_async(query, context)
+
+class StreamingProvider(DelayedProvider):
+    """Streams its answer word by word, ``delay`` seconds per chunk"""
+
+    def __init__(self, name: str, delay: float):
+        super().__init__(name, delay)
+        self.closed = False
+
+    async def stream(self, query, context=None):
+        try:
+            for word in self._answer(query)["content"].split():
+                await asyncio.sleep(self.delay)
+                yield word + " "
+        finally:
+            self.closed = True
+
+class StallingProvider(StreamingProvider):
+    """Streams its first chunk, then stalls for ``delay`` seconds"""
+
+    async def stream(self, query, context=None):
+        yield "The answer is "
+        await asyncio.sleep(self.delay)
+        yield "42"
+
+class BlockingProvider(DelayedProvider):
+    """Synchronous client: goes through BaseProvider.process_async"""
+    process_async = BaseProvider.process_async
+
+class TestAPIOrchestrator(unittest.TestCase):
+    def orchestrator(self, primary, secondary, budget=1.0):
+        orchestrator = APIOrchestrator()
+        orchestrator.openai, orchestrator.deepseek = primary, secondary
+        orchestrator.timeouts = {}
+        orchestrator.latency_budget = budget
+        return orchestrator
+
+    def route(self, orchestrator, query="hello"):
+        start = time.perf_counter()
+        result = orchestrator.route_query(query)
+        return result, time.perf_counter() - start
+
+    def test_latency_tracks_the_slower_provider(self):
+        orchestrator = self.orchestrator(DelayedProvider("openai", 0.2),
+                                         DelayedProvider("deepseek", 0.3))
+        result, elapsed = self.route(orchestrator)
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["response"]["sources"], ["openai", "deepseek"])
+        self.assertLess(elapsed, 0.45)  # sequential calls would take 0.5s
+
+    def test_blocking_providers_run_concurrently(self):
+        orchestrator = self.orchestrator(BlockingProvider("openai", 0.2),
+                                         BlockingProvider("deepseek", 0.2))
+        result, elapsed = self.route(orchestrator)
+        self.assertEqual(result["answered"], ["openai", "deepseek"])
+        self.assertLess(elapsed, 0.35)
+
+    def test_falls_back_to_the_answer_within_budget(self):
+        slow = DelayedProvider("deepseek", 5)
+        orchestrator = self.orchestrator(DelayedProvider("openai", 0.05), slow, budget=0.3)
+        result, elapsed = self.route(orchestrator)
+        self.assertEqual(result["answered"], ["openai"])
+        self.assertEqual(result["response"]["content"], "openai: hello")
+        self.assertLess(elapsed, 0.5)
+        self.assertTrue(slow.cancelled)
+
+    def test_per_provider_timeout_and_failures(self):
+        orchestrator = self.orchestrator(DelayedProvider("openai", 0.3),
+                                         DelayedProvider("deepseek", 0.01, fail=True))
+        orchestrator.timeouts = {"openai": 0.1}
+        result, elapsed = self.route(orchestrator)
+        self.assertEqual(result["status"], "error")
+        self.assertLess(elapsed, 0.25)
+
+        orchestrator.timeouts = {}
+        result, _ = self.route(orchestrator)
+        self.assertEqual(result["answered"], ["openai"])
+
+    def test_stream_forwards_primary_chunks_before_the_secondary_answers(self):
+        slow = DelayedProvider("deepseek", 0.3)
+        orchestrator = self.orchestrator(StreamingProvider("openai", 0.01), slow)
+
+        async def run():
+            start = time.perf_counter()
+            events = []
+            async for event in orchestrator.route_query_stream("tell me more"):
+                events.append((time.perf_counter() - start, event))
+            return events
+
+        events = asyncio.run(run())
+        deltas = [event for _, event in events if event["type"] == "delta"]
+        self.assertEqual("".join(e["content"] for e in deltas), "openai: tell me more ")
+        self.assertLess(events[0][0], 0.1)  # first token, not the slower provider
+        final = events[-1][1]["result"]
+        self.assertEqual(final["answered"], ["openai", "deepseek"])
+        self.assertEqual(final["response"]["sources"], ["openai", "deepseek"])
+
+    def test_closing_a_stream_stops_both_providers(self):
+        primary, secondary = StreamingProvider("openai", 0.05), DelayedProvider("deepseek", 5)
+        orchestrator = self.orchestrator(primary, secondary)
+
+        async def run():
+            events = orchestrator.route_query_stream("tell me more")
+            first = await events.__anext__()
+            await events.aclose()
+            await asyncio.sleep(0)
+            return first
+
+        self.assertEqual(asyncio.run(run())["content"], "openai: ")
+        self.assertTrue(primary.closed)
+        self.assertTrue(secondary.cancelled)
+
+    def test_stream_falls_back_to_the_secondary(self):
+        primary = StreamingProvider("openai", 0.01)
+        primary.fail = True
+        orchestrator = self.orchestrator(primary, DelayedProvider("deepseek", 0.01))
+
+        async def run():
+            return [event async for event in orchestrator.route_query_stream("hi")]
+
+        events = asyncio.run(run())
+        self.assertEqual(events[0], {"type": "delta", "content": "deepseek: hi", "source": "deepseek"})
+        self.assertEqual(events[-1]["result"]["answered"], ["deepseek"])
+
+    def test_truncated_stream_is_neither_answered_nor_cached(self):
+        orchestrator = self.orchestrator(StallingProvider("openai", 5),
+                                         DelayedProvider("deepseek", 0.01))
+        orchestrator.timeouts = {"openai": 0.2}
+        orchestrator.cache = ResponseCache()
+
+        async def run():
+            return [event async for event in orchestrator.route_query_stream("hi")]
+
+        events = asyncio.run(run())
+        self.assertEqual(events[0]["content"], "The answer is ")
+        result = events[-1]["result"]
+        self.assertEqual(result["answered"], ["deepseek"])
+        self.assertEqual(result["response"]["content"], "deepseek: hi")
+        self.assertIsNone(orchestrator.cache.get("hi", "balanced", ("openai", "deepseek")))
+        self.assertEqual(len(orchestrator.cache), 0)
+
+class TestHedgedProvider(unittest.TestCase):
+    def test_histogram_percentiles_follow_recent_window(self):
+        histogram = LatencyHistogram(window=100)
+        for i in range(100):
+            histogram.record(0.010 if i < 90 else 0.500)
+        self.assertAlmostEqual(histogram.percentile(50), 0.010, delta=0.001)
+        self.assertAlmostEqual(histogram.percentile(95), 0.500, delta=0.05)
+        for _ in range(200):
+            histogram.record(0.020)
+        self.assertAlmostEqual(histogram.percentile(99), 0.020, delta=0.002)
+
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        primary = DelayedProvider("openai", 5)
+        backup = DelayedProvider("deepseek", 0.02)
+        hedged = HedgedProvider(primary, backup, initial_delay_ms=50, max_hedge_ratio=1)
+        start = time.perf_counter()
+        result = hedged.process("hello")
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(result["content"], "deepseek: hello")
+        self.assertTrue(primary.cancelled)
+        self.assertEqual((hedged.hedges, hedged.hedge_wins), (1, 1))
+
+    def test_fast_or_failed_primary(self):
+        hedged = HedgedProvider(DelayedProvider("openai", 0.01), DelayedProvider("deepseek", 0),
+                                initial_delay_ms=200, max_hedge_ratio=1)
+        self.assertEqual(hedged.process("hi")["content"], "openai: hi")
+        self.assertEqual(hedged.hedges, 0)
+
+        hedged.primary.fail = True
+        start = time.perf_counter()
+        self.assertEqual(hedged.process("hi")["content"], "deepseek: hi")
+        self.assertLess(time.perf_counter() - start, 0.15)  # no waiting out the delay
+
+    def test_delay_adapts_and_cuts_the_tail(self):
+        # Every 20th call stalls; a retry to the same provider is fast
+        provider = ScriptedProvider("openai", [0.5] + [0.01] * 19)
+        hedged = HedgedProvider(provider, percentile=90, initial_delay_ms=100,
+                                min_delay_ms=1, min_samples=10, max_hedge_ratio=0.2)
+
+        async def run():
+            latencies = []
+            for _ in range(60):
+                start = time.perf_counter()
+                await hedged.process_async("hello")
+                latencies.append(time.perf_counter() - start)
+            return latencies
+
+        latencies = asyncio.run(run())
+        self.assertLess(hedged.hedge_delay(), 0.05)
+        self.assertLess(max(latencies), 0.2)
+        self.assertLessEqual(hedged.hedges, 0.2 * hedged.requests)
+
+    def test_hedges_are_capped(self):
+        hedged = HedgedProvider(DelayedProvider("openai", 0.03), min_delay_ms=1,
+                                initial_delay_ms=1, max_hedge_ratio=0.1)
+        for _ in range(20):
+            hedged.process("hi")
+        self.assertEqual(hedged.hedges, 2)
+
+class TestResponseCache(unittest.TestCase):
+    def test_normalized_exact_hits_are_scoped(self):
+        cache = ResponseCache()
+        cache.put("How do I sort a list?", "balanced", ("openai", "deepseek"), "sorted")
+        self.assertEqual(cache.get("how do i  SORT a list", "balanced", ("openai", "deepseek")),
+                         "sorted")
+        self.assertIsNone(cache.get("how do i sort a list", "creative", ("openai", "deepseek")))
+        self.assertIsNone(cache.get("how do i sort a list", "balanced", ("deepseek", "openai")))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_near_duplicates_above_threshold(self):
+        cache = ResponseCache(similarity_threshold=0.8)
+        cache.put("explain python list comprehension syntax", "balanced", (), "lc")
+        cache.put("best pizza in naples", "balanced", (), "pizza")
+        self.assertEqual(cache.get("explain the python list comprehension syntax"), "lc")
+        self.assertIsNone(cache.get("explain python generator syntax"))
+        self.assertIsNone(ResponseCache().get("explain the python list comprehension syntax"))
+        self.assertEqual(cache.stats()["near_hits"], 1)
+
+    def test_negations_and_numbers_are_not_near_duplicates(self):
+        cache = ResponseCache(similarity_threshold=0.9)
+        cache.put("what is 2 plus 3", "balanced", (), "5")
+        cache.put("should I delete the file", "balanced", (), "yes")
+        self.assertIsNone(cache.get("what is 7 plus 9"))
+        self.assertIsNone(cache.get("should I not delete the file"))
+        self.assertEqual(cache.get("Should I delete the file?"), "yes")
+
+    def test_similarity_index_follows_evictions(self):
+        cache = ResponseCache(max_entries=1, similarity_threshold=0.5)
+        cache.put("python list comprehension", "balanced", (), "lc")
+        cache.put("best pizza in naples", "balanced", (), "pizza")
+        self.assertIsNone(cache.get("python list comprehensions"))
+        self.assertEqual(cache.get("the best pizza in naples"), "pizza")
+        index = cache._indexes[("balanced", ())]
+        self.assertEqual(list(index.queries), ["best pizza in naples"])
+        self.assertNotIn("python", index._df)
+
+    def test_ttl_lru_and_invalidation(self):
+        now = [0.0]
+        cache = ResponseCache(max_entries=2, ttl_s=10, clock=lambda: now[0])
+        cache.put("a", "balanced", (), 1)
+        cache.put("b", "balanced", (), 2)
+        cache.get("a")
+        cache.put("c", "balanced", (), 3)  # evicts b, the least recently used
+        self.assertIsNone(cache.get("b"))
+        now[0] = 11
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+        cache.put("a", "balanced", (), 1)
+        cache.put("a", "creative", (), 1)
+        self.assertEqual(cache.invalidate(mode="creative"), 1)
+        self.assertEqual(cache.invalidate("A!"), 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_orchestrator_serves_repeats_from_cache(self):
+        openai, deepseek = ScriptedProvider("openai", [0]), ScriptedProvider("deepseek", [0])
+        orchestrator = APIOrchestrator()
+        orchestrator.openai, orchestrator.deepseek = openai, deepseek
+        orchestrator.cache = ResponseCache()
+        first = orchestrator.route_query("hello there")
+        second = orchestrator.route_query("Hello there!")
+        self.assertEqual((openai.calls, deepseek.calls), (1, 1))
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["response"], first["response"])
+        self.assertEqual(second["query"], "Hello there!")
+
+        # Partial answers are not cached
+        deepseek.fail = True
+        orchestrator.route_query("something else")
+        orchestrator.route_query("something else")
+        self.assertEqual(openai.calls, 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from engine import SlickLogicEngine
+from engine.utils import AnalysisCache
+from memory import MemoryBank
+from memory.index import tokenize
+from shared.query_analysis import QueryAnalysis
+
+class RecordingMemory(MemoryBank):
+    """Remembers the tokens each lookup was given"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lookups = []
+
+    def get_context(self, query, limit=3, ranking="overlap", tokens=None):
+        self.lookups.append(tokens)
+        return super().get_context(query, limit, ranking, tokens)
+
+class TestQueryAnalysis(unittest.TestCase):
+    def test_fields_match_what_each_stage_computed(self):
+        query = "Why  does\tthe  Code fail?"
+        analysis = QueryAnalysis.of(query)
+        self.assertEqual(frozenset(analysis.tokens), tokenize(query))
+        self.assertEqual(analysis.key, AnalysisCache.key(query))
+        self.assertEqual(analysis.normalized, "Why does the Code fail?")
+        self.assertEqual(analysis.intent, "explanation")
+        self.assertTrue(analysis.features.has("routing", "technical"))
+
+    def test_immutable(self):
+        analysis = QueryAnalysis.of("hello world")
+        with self.assertRaises(AttributeError):
+            analysis.intent = "comparison"
+        with self.assertRaises(AttributeError):
+            analysis.extra = 1
+        with_entities = analysis.with_entities([["Paris", "GPE"]])
+        self.assertEqual(with_entities.entities, (("Paris", "GPE"),))
+        self.assertEqual(analysis.entities, ())
+        self.assertIs(with_entities.features, analysis.features)
+
+    def test_engine_analyzes_once_and_times_each_stage(self):
+        memory = RecordingMemory(":memory:")
+        engine = SlickLogicEngine(memory)
+        engine.process_query("Compare Tea vs coffee")
+        self.assertEqual(memory.lookups, [("compare", "tea", "vs", "coffee")])
+        stages = engine.monitor.stage_report()
+        self.assertEqual(list(stages), ["analysis", "context", "personality", "store"])
+        self.assertTrue(all(s["calls"] == 1 for s in stages.values()))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import random
+import unittest
+from ai_core.APIOrchestrator import APIOrchestrator
+from cognitive.InterestEnhancer import InterestEnhancer
+from shared.query_analysis import QueryAnalysis
+from shared.query_features import KeywordMatcher, query_features
+
+class TestQueryFeatures(unittest.TestCase):
+    def test_labels_follow_table_priority(self):
+        features = query_features("Why does my CODE fail? Compare it vs the tutorial")
+        self.assertEqual(features.labels("intent"), ("instruction", "explanation", "comparison"))
+        self.assertEqual(features.first("intent"), "instruction")
+        self.assertTrue(features.has("routing", "technical"))
+        self.assertEqual(features.first("interest", "general"), "technology")
+        self.assertEqual(query_features("hello").first("interest", "general"), "general")
+
+    def test_same_keywords_as_substring_checks(self):
+        # Overlapping and nested keywords, which a single regex scan misses
+        tables = {"g": {"a": ("ab", "bc", "abcd", "cde", "b", "xyzab")}}
+        keywords = [k for table in tables["g"].values() for k in table]
+        matcher = KeywordMatcher(tables)
+        rng = random.Random(7)
+        for _ in range(2000):
+            text = "".join(rng.choice("abcdexyz") for _ in range(rng.randint(0, 20)))
+            self.assertEqual(matcher.scan(text).keywords, {k for k in keywords if k in text}, text)
+        self.assertEqual(query_features("techomer").keywords, {"tech", "homer"})
+
+    def test_stages_read_the_shared_scan(self):
+        query_analysis = QueryAnalysis.of("how to paint a joke")
+        self.assertEqual(query_analysis.intent, "instruction")
+        self.assertEqual(InterestEnhancer()._detect_interest("", query_analysis), "art")
+        orchestrator = APIOrchestrator.__new__(APIOrchestrator)
+        orchestrator.openai, orchestrator.deepseek = "openai", "deepseek"
+        self.assertEqual(orchestrator._select_providers("debug this", {"query_analysis": query_analysis}),
+                         ("openai", "deepseek"))
+        self.assertEqual(orchestrator._select_providers("debug this"), ("deepseek", "openai"))
+
+if __name__ == "__main__":
+    unittest.main()
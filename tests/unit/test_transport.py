@@ -0,0 +1,169 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ai_core.providers import DeepSeekProvider, HedgedProvider, OpenAIProvider, ProviderTransport
+
+class StandInUpstream(ThreadingHTTPServer):
+    """Local OpenAI-compatible chat completions API on a free port"""
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0, status: int = 200):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.delay = delay
+        self.status = status
+        self.requests = []
+        self.connections = set()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.connections.add(self.client_address)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(server.delay)
+        with server.lock:
+            server.requests.append((self.path, self.headers["Authorization"], body))
+            server.active -= 1
+        if server.status != 200:
+            # Client errors are not retried, so the provider fails at once
+            self.send_response(server.status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        content = f"upstream: {body['messages'][-1]['content']}"
+        if body.get("stream"):
+            reply = "".join(
+                f"data: {json.dumps({'choices': [{'delta': {'content': word + ' '}}]})}\n\n"
+                for word in content.split()
+            ).encode() + b"data: [DONE]\n\n"
+            content_type = "text/event-stream"
+        else:
+            reply = json.dumps({
+                "id": "resp-1", "model": body["model"],
+                "choices": [{"message": {"content": content}}],
+                "usage": {"total_tokens": 7}
+            }).encode()
+            content_type = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+class TestProviderTransport(unittest.TestCase):
+    def setUp(self):
+        self.upstream = StandInUpstream()
+        self.transport = ProviderTransport()
+
+    def tearDown(self):
+        self.transport.close()
+        self.upstream.shutdown()
+        self.upstream.server_close()
+
+    def provider(self, cls=OpenAIProvider, **config):
+        config = {"api_key": "test-key", "base_url": self.upstream.base_url, **config}
+        return cls(config, transport=self.transport)
+
+    def test_blocking_calls_reuse_one_connection(self):
+        openai = self.provider()
+        deepseek = self.provider(DeepSeekProvider)
+        for i in range(5):
+            self.assertEqual(openai.process(f"q{i}")["content"], f"upstream: q{i}")
+        self.assertEqual(deepseek.process("code")["content"], "upstream: code")
+
+        self.assertEqual(len(self.upstream.requests), 6)
+        path, auth, body = self.upstream.requests[0]
+        self.assertEqual((path, auth), ("/v1/chat/completions", "Bearer test-key"))
+        self.assertEqual(body["model"], "gpt-4-turbo")
+        # Both providers share the pool for this upstream
+        self.assertEqual(len(self.upstream.connections), 1)
+
+    def test_async_calls_use_the_started_loop_pool(self):
+        self.upstream.delay = 0.05
+        transport = self.transport = ProviderTransport(max_connections=2)
+        openai = self.provider()
+
+        async def run():
+            await transport.start()
+            try:
+                results = await asyncio.gather(*(openai.process_async(f"q{i}") for i in range(6)))
+                self.assertIsNotNone(transport.async_client(openai.base_url))
+            finally:
+                await transport.aclose()
+            return results
+
+        results = asyncio.run(run())
+        self.assertEqual([r["content"] for r in results], [f"upstream: q{i}" for i in range(6)])
+        self.assertEqual(self.upstream.max_active, 2)  # pool limit
+        self.assertEqual(len(self.upstream.connections), 2)
+
+    def test_streamed_completion_chunks(self):
+        openai = self.provider()
+
+        async def run():
+            await self.transport.start()
+            try:
+                return [chunk async for chunk in openai.stream("stream this")]
+            finally:
+                await self.transport.aclose()
+
+        self.assertEqual(asyncio.run(run()), ["upstream: ", "stream ", "this "])
+        self.assertTrue(self.upstream.requests[0][2]["stream"])
+
+    def test_other_loops_fall_back_to_the_blocking_pool(self):
+        openai = self.provider()
+
+        async def call(i):
+            self.assertIsNone(self.transport.async_client(openai.base_url))
+            return await openai.process_async(f"q{i}")
+
+        for i in range(3):
+            asyncio.run(call(i))
+        self.assertEqual(len(self.upstream.requests), 3)
+        self.assertEqual(len(self.upstream.connections), 1)
+
+    def test_without_api_key_the_upstream_is_not_called(self):
+        openai = OpenAIProvider({"base_url": self.upstream.base_url}, transport=self.transport)
+        self.assertEqual(openai.process("hi")["content"], "OpenAI(gpt-4-turbo): hi")
+        self.assertEqual(self.upstream.requests, [])
+
+    def test_failed_answers_are_hedged_at_once(self):
+        broken = StandInUpstream(status=400)
+        self.addCleanup(broken.server_close)
+        self.addCleanup(broken.shutdown)
+        for cls in (OpenAIProvider, DeepSeekProvider):
+            primary = cls({"api_key": "test-key", "base_url": broken.base_url},
+                          transport=self.transport)
+            hedged = HedgedProvider(primary, self.provider(), initial_delay_ms=2000, max_hedge_ratio=1)
+            start = time.perf_counter()
+            result = hedged.process("hi")
+            self.assertLess(time.perf_counter() - start, 1, cls.__name__)
+            self.assertEqual(result["content"], "upstream: hi", cls.__name__)
+            self.assertEqual((hedged.hedges, hedged.hedge_wins), (1, 1))
+
+        # Both broken: the failure is returned, not a success
+        both = HedgedProvider(self.provider(DeepSeekProvider, base_url=broken.base_url),
+                              self.provider(DeepSeekProvider, base_url=broken.base_url),
+                              max_hedge_ratio=1)
+        self.assertIn("error", both.process("hi"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import os
 import httpx
 from typing import Optional, Literal
+from shared.query_features import query_features
 
 AIModel = Literal['gpt-4', 'deepseek-coder', 'hybrid']
 
@@ -24,8 +25,7 @@ class AIConnector:
         return await self._openai_request(prompt, model)
     
     def _is_code_request(self, prompt: str) -> bool:
-        code_keywords = {'code', 'debug', 'syntax', 'algorithm'}
-        return any(kw in prompt.lower() for kw in code_keywords)
+        return query_features(prompt).has('code_request', 'code')
     
     async def _openai_request(self, prompt: str, model: str) -> str:
         response = await self.clients['openai'].chat.completions.create(
@@ -53,6 +53,16 @@ class AIIntegration:
         self.config = config
         self.knowledge_base = self._load_knowledge_base()
         self.sessions = {}  # {session_id: [messages]}
+        # One keep-alive pool per upstream instead of a client per call
+        self.clients = {
+            'openai': httpx.AsyncClient(base_url="https://api.openai.com/v1", http2=True),
+            'deepseek': httpx.AsyncClient(base_url="https://api.deepseek.com/v1", http2=True)
+        }
+        
+    async def aclose(self):
+        """Close the upstream connection pools"""
+        for client in self.clients.values():
+            await client.aclose()
         
     def _load_knowledge_base(self):
         try:
@@ -78,18 +88,17 @@ class AIIntegration:
         if context:
             messages.insert(0, {"role": "system", "content": context})
             
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json={
-                    "model": model,
-                    "messages": messages,
-                    "max_tokens": 500,
-                    "temperature": 0.7
-                }
-            )
-            return response.json()["choices"][0]["message"]["content"]
+        response = await self.clients['openai'].post(
+            "/chat/completions",
+            headers=headers,
+            json={
+                "model": model,
+                "messages": messages,
+                "max_tokens": 500,
+                "temperature": 0.7
+            }
+        )
+        return response.json()["choices"][0]["message"]["content"]
             
     async def query_deepseek(self, prompt, context=None, model="deepseek-coder"):
         if not self.config.settings['DEEPSEEK_API_KEY']:
@@ -105,18 +114,17 @@ class AIIntegration:
             full_prompt += f"Context: {context}\n\n"
         full_prompt += f"Question: {prompt}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.deepseek.com/v1/chat/completions",
-                headers=headers,
-                json={
-                    "model": model,
-                    "messages": [{"role": "user", "content": full_prompt}],
-                    "max_tokens": 500,
-                    "temperature": 0.7
-                }
-            )
-            return response.json()["choices"][0]["message"]["content"]
+        response = await self.clients['deepseek'].post(
+            "/chat/completions",
+            headers=headers,
+            json={
+                "model": model,
+                "messages": [{"role": "user", "content": full_prompt}],
+                "max_tokens": 500,
+                "temperature": 0.7
+            }
+        )
+        return response.json()["choices"][0]["message"]["content"]
             
     async def query(self, prompt, model="hybrid", session_id=None):
         """Unified query interface"""
@@ -211,6 +219,7 @@ class WebService:
         
         # Initialize FastAPI
         self.fastapi_app = FastAPI()
+        self.fastapi_app.add_event_handler("shutdown", self.ai.aclose)
         self.api_router = APIRouter()
         self._setup_fastapi_routes()
         